@@ -9,8 +9,42 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync              import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+from board.async_view          import AsyncStreamingHttpResponse
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'board.settings')
 
+class BoardASGIHandler(ASGIHandler):
+    # async 뷰로 연결된 URL 설정(board.asgi_urls)은 board.middleware.asgi_urlconf_middleware 가 요청마다 지정함
+    # AsyncStreamingHttpResponse 는 본문을 이벤트 루프에서 async for 로 꺼내 보냄 (그 밖의 응답은 Django 기본 처리)
+    async def send_response(self, response, send):
+        if not isinstance(response, AsyncStreamingHttpResponse):
+            return await super().send_response(response, send)
+
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            response_headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            response_headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+
+        await send({'type' : 'http.response.start', 'status' : response.status_code, 'headers' : response_headers})
+        try:
+            async for part in response:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type' : 'http.response.body', 'body' : chunk, 'more_body' : True})
+            await send({'type' : 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return BoardASGIHandler()
+
 application = get_asgi_application()
@@ -0,0 +1,10 @@
+"""board URL Configuration for the ASGI entry point (board/asgi.py)
+
+Same routes as board/urls.py, served by the async views.
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('users', include('users.async_urls')),
+    path('boards', include('boards.async_urls')),
+]
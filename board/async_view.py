@@ -0,0 +1,66 @@
+import asyncio
+import functools
+
+from asgiref.sync         import sync_to_async
+from django.db            import close_old_connections
+from django.http.response import StreamingHttpResponse
+from django.views         import View
+
+# ASGI(board/asgi.py)로 띄울 때 쓰는 async 뷰의 공통 부분 (users, boards 가 같이 씀)
+
+class AsyncView(View):
+    # Django 3.2 의 View.as_view() 는 async 핸들러(async def get)를 지원하지 않으므로
+    # 핸들러가 돌려준 코루틴을 기다리는 async 함수로 감싸서 async 뷰로 인식되게 함
+    # 동기 뷰를 함께 상속하면 그 동기 핸들러(로그인 확인, 예외 처리 포함)를 run_in_thread 로 이벤트 루프 밖에서 실행
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        functools.update_wrapper(async_view, view)
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() in self.http_method_names:
+            handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+        else:
+            handler = self.http_method_not_allowed
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(request, *args, **kwargs)
+        return await run_in_thread(handler)(request, *args, **kwargs)
+
+def run_in_thread(func):
+    # 동기 뷰와 같이 쓰는 처리 함수(bcrypt, S3, DB 를 차례로 기다림)를 이벤트 루프 밖에서 실행하는 async 함수로 감쌈
+    # Django 3.2 는 thread_sensitive 호출을 모든 요청이 스레드 하나에서 차례로 실행하므로 별도 스레드 풀에서 돌리고,
+    # 그 스레드의 DB 연결은 동기 요청의 시작/끝처럼 close_old_connections 로 정리함
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+async def iterate_in_thread(iterator):
+    # 동기 이터레이터를 sync_to_async 로 한 조각씩 꺼내는 async 이터레이터 (조각을 만들며 DB 를 읽어도 이벤트 루프를 막지 않음)
+    next_chunk = sync_to_async(next)
+    done       = object()
+    while True:
+        chunk = await next_chunk(iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+class AsyncStreamingHttpResponse(StreamingHttpResponse):
+    # 본문을 async 이터레이터로 받는 스트리밍 응답 (Django 3.2 의 StreamingHttpResponse 는 동기 이터레이터만 받아
+    # ASGI 핸들러가 이벤트 루프에서 그대로 돌리므로 DB 를 읽으며 보낼 수 없음)
+    # board.asgi 의 핸들러가 async for 로 꺼내 보내고, 읽을 때마다 필요한 DB 조회는 이터레이터가 sync_to_async 로 기다림
+    def __init__(self, streaming_content, *args, **kwargs):
+        super().__init__((), *args, **kwargs)
+        self.async_streaming_content = streaming_content
+
+    async def __aiter__(self):
+        async for chunk in self.async_streaming_content:
+            yield self.make_bytes(chunk)
@@ -0,0 +1,22 @@
+import asyncio
+
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators   import sync_and_async_middleware
+
+ASGI_URLCONF = 'board.asgi_urls'
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    # ASGI 로 들어온 요청은 S3/bcrypt 를 기다리는 뷰를 async 뷰로 바꾼 board.asgi_urls 로 연결
+    # (같은 설정 모듈로 WSGI 와 ASGI 를 함께 띄울 수 있도록 ROOT_URLCONF 대신 요청마다 request.urlconf 로 지정)
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            if isinstance(request, ASGIRequest):
+                request.urlconf = ASGI_URLCONF
+            return await get_response(request)
+    else:
+        def middleware(request):
+            if isinstance(request, ASGIRequest):
+                request.urlconf = ASGI_URLCONF
+            return get_response(request)
+    return middleware
@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # ASGI 요청은 async 뷰로 연결된 board.asgi_urls 로 보냄
+    'board.middleware.asgi_urlconf_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +84,25 @@ WSGI_APPLICATION = 'board.wsgi.application'
 DATABASES = my_settings.DATABASES
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# 기본은 워커 로컬 메모리(테스트/단일 워커용)
+# 워커가 여러 개면 목록 캐시 세대 번호를 공유해야 하므로 my_settings.CACHES 에 공유 캐시를 지정
+#   CACHES = {'default': {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': '127.0.0.1:11211'}}
+
+CACHES = getattr(my_settings, 'CACHES', {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+})
+
+# 게시글 상세 응답 캐시 유지 시간(초)
+POST_DETAIL_CACHE_TIMEOUT = 300
+
+# 게시판 목록 페이지 캐시 유지 시간(초), 글이 바뀌면 세대 번호로 즉시 무효화되고 조회수 오차만 이 시간 안에서 생김
+POST_LIST_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -125,6 +146,43 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+#VIEW_COUNT
+# 게시글 조회수는 워커 메모리에 모았다가 워커마다 백그라운드 스레드가 이 주기(초)마다 한 번에 DB에 반영 (None 이면 flush() 를 직접 부를 때만)
+VIEW_COUNT_FLUSH_INTERVAL = 5
+
+#REPLY
+# 답글 작성 트랜잭션이 데드락/락 대기 시간 초과로 실패했을 때 최대 시도 횟수
+REPLY_MAX_ATTEMPTS = 3
+
+#S3
+# 첨부 파일을 동시에 업로드할 최대 스레드 수
+S3_UPLOAD_MAX_WORKERS = 4
+# 프로세스 공용 S3 클라이언트의 연결 풀 크기, 재시도 정책
+S3_MAX_POOL_CONNECTIONS = 20
+S3_RETRY_MAX_ATTEMPTS   = 3
+S3_RETRY_MODE           = 'standard'
+# presigned 업로드 URL 유효 시간(초)
+S3_PRESIGNED_EXPIRES    = 600
+# 큰 첨부 파일의 멀티파트 업로드 기준 크기, 파트 크기(최소 5MB), 파일 하나당 동시에 올리는 파트 수
+S3_MULTIPART_THRESHOLD       = 8 * 1024 * 1024
+S3_MULTIPART_CHUNKSIZE       = 8 * 1024 * 1024
+S3_MULTIPART_MAX_CONCURRENCY = 4
+# file_delete_outbox 의 한 객체를 삭제 시도할 최대 횟수
+FILE_DELETE_MAX_ATTEMPTS = 5
+
+#AUTH
+# 로그인 토큰 유효 시간(초)
+JWT_EXPIRES_SECONDS = 60 * 60 * 24
+# login_required 가 캐시에 둔 사용자 정보 유지 시간(초), 사용자 정보가 바뀌면 시그널로 즉시 지움
+USER_CACHE_TIMEOUT  = 300
+# 비밀번호 bcrypt cost (2^n 회 반복), 바꾸면 기존 회원은 다음 로그인 때 새 cost 로 다시 해시됨
+BCRYPT_ROUNDS       = 12
+# bcrypt 계산 위치 : 'inline'(요청 스레드) 또는 'process'(프로세스 풀)
+# process 모드의 풀 크기(기본 CPU 수)와 워커 프로세스당 풀에 맡길 수 있는 최대 해시 수(기본 풀 크기의 2배)
+PASSWORD_HASHER_MODE        = getattr(my_settings, 'PASSWORD_HASHER_MODE', 'inline')
+PASSWORD_HASHER_WORKERS     = None
+PASSWORD_HASHER_MAX_PENDING = None
+
 #REMOVE_APPEND_SLASH_WARNING
 APPEND_SLASH = False
 
@@ -0,0 +1,24 @@
+from django.urls    import path
+
+from .views         import (
+    BoardListView, BoardDetailView, BoardSearchView, TrendingTagsView, CacheStatsView, FileUploadUrlView,
+)
+from .async_views   import (
+    AsyncBoardWriteView, AsyncBoardRewriteView, AsyncBoardDeleteView,
+    AsyncBoardReplyView, AsyncBoardThreadView,
+)
+
+# ASGI 용 URL : S3/bcrypt 를 기다리는 뷰와 DB 스트리밍 뷰만 async 로 교체, 나머지는 boards/urls.py 와 같은 동기 뷰
+urlpatterns = [
+    path('/board-write', AsyncBoardWriteView.as_view()),
+    path('/board-rewrite', AsyncBoardRewriteView.as_view()),
+    path('/board-delete', AsyncBoardDeleteView.as_view()),
+    path('/board-list', BoardListView.as_view()),
+    path('/search', BoardSearchView.as_view()),
+    path('/trending-tags', TrendingTagsView.as_view()),
+    path('/<int:post_id>', BoardDetailView.as_view()),
+    path('/board-reply', AsyncBoardReplyView.as_view()),
+    path('/threads/<int:group_id>', AsyncBoardThreadView.as_view()),
+    path('/cache-stats', CacheStatsView.as_view()),
+    path('/upload-urls', FileUploadUrlView.as_view())
+]
@@ -0,0 +1,41 @@
+from asgiref.sync         import sync_to_async
+from django.http.response import JsonResponse
+
+from board.async_view     import AsyncView, AsyncStreamingHttpResponse, iterate_in_thread
+from .views               import (
+    BoardWriteView, BoardRewriteView, BoardDeleteView, BoardReplyView,
+    THREAD_FIELDS, THREAD_PAGE_SIZE, thread_page, thread_chunks,
+)
+
+# ASGI(board/asgi.py)로 띄울 때 쓰는 글 작성/수정/삭제/답글/묶음 조회 뷰
+# 작성/수정/삭제/답글은 동기 뷰의 처리를 그대로 쓰고, 요청마다 별도 스레드에서 실행해 S3/bcrypt 를 기다리는 동안 이벤트 루프를 막지 않음
+# (로그인 확인은 동기 뷰의 login_required, 비밀번호는 동기 뷰와 같은 hash_password / check_password 를 그 스레드에서 씀)
+# 목록/상세처럼 DB 와 캐시만 쓰는 뷰는 동기 뷰를 그대로 씀 (Django 가 sync_to_async 로 감쌈)
+
+class AsyncBoardWriteView(AsyncView, BoardWriteView):
+    pass
+
+class AsyncBoardRewriteView(AsyncView, BoardRewriteView):
+    pass
+
+class AsyncBoardDeleteView(AsyncView, BoardDeleteView):
+    pass
+
+class AsyncBoardReplyView(AsyncView, BoardReplyView):
+    pass
+
+class AsyncBoardThreadView(AsyncView):
+    async def get(self, request, group_id=None):
+        # 동기 뷰와 같은 thread_chunks 로 THREAD_PAGE_SIZE 개씩 (thread_path, id) 다음 구간을 읽으며 스트리밍
+        # 배치를 읽는 짧은 쿼리는 sync_to_async 로 기다리므로 이벤트 루프에서 DB 를 읽지 않음
+        include_content = request.GET.get('include_content', '').lower() in ('1', 'true')
+
+        fields     = THREAD_FIELDS + (('content',) if include_content else ())
+        first_page = await sync_to_async(thread_page)(group_id, fields, limit=THREAD_PAGE_SIZE)
+
+        if not first_page:
+            return JsonResponse({'message' : 'INVALID_GROUP_ID'}, status=401)
+
+        return AsyncStreamingHttpResponse(
+            iterate_in_thread(thread_chunks(group_id, fields, first_page, include_content)), content_type='application/json', status=200
+        )
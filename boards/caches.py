@@ -0,0 +1,78 @@
+import time
+import hashlib
+
+from django.conf          import settings
+from django.core.cache    import cache
+
+# 캐시 적중/실패 횟수는 캐시 백엔드에 같이 쌓아서 워커 전체 합계를 볼 수 있게 함
+STAT_NAMES = ('detail_hit', 'detail_miss', 'list_hit', 'list_miss')
+
+def _stat_key(name):
+    return f'boards:stats:{name}'
+
+def _incr(key, initial=0):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial, timeout=None)
+        return cache.incr(key)
+
+def _incr_stat(name):
+    _incr(_stat_key(name))
+
+def cache_stats():
+    values = cache.get_many([_stat_key(name) for name in STAT_NAMES])
+    return {name : values.get(_stat_key(name), 0) for name in STAT_NAMES}
+
+def _detail_key(post_id):
+    return f'boards:detail:{post_id}'
+
+def get_post_detail(post_id):
+    post_info = cache.get(_detail_key(post_id))
+    _incr_stat('detail_hit' if post_info is not None else 'detail_miss')
+    return post_info
+
+def set_post_detail(post_id, post_info):
+    cache.set(_detail_key(post_id), post_info, timeout=getattr(settings, 'POST_DETAIL_CACHE_TIMEOUT', 300))
+
+def invalidate_post_detail(*post_ids):
+    cache.delete_many([_detail_key(post_id) for post_id in post_ids])
+
+# 목록 페이지 캐시: 게시판마다 세대 번호를 두고 키에 포함시킴
+# 글이 바뀌면 세대 번호만 올리면 되므로 이전 페이지 키를 찾아 지울 필요가 없음 (이전 키는 TTL로 소멸)
+# 세대 번호 키가 캐시에서 밀려나도 예전 번호로 되돌아가지 않도록 초기값은 현재 시각(ms)으로 잡음
+ALL_BOARDS = 'all'
+
+def _initial_generation():
+    return int(time.time() * 1000)
+
+def _list_generation_key(board_category_id):
+    return f'boards:list-gen:{board_category_id or ALL_BOARDS}'
+
+def _list_key(board_category_id, generation, page_key):
+    digest = hashlib.md5(page_key.encode('UTF-8')).hexdigest()
+    return f'boards:list:{board_category_id or ALL_BOARDS}:{generation}:{digest}'
+
+def list_generation(board_category_id):
+    key        = _list_generation_key(board_category_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = _initial_generation()
+        if not cache.add(key, generation, timeout=None):
+            generation = cache.get(key, generation)
+    return generation
+
+def get_list_page(board_category_id, page_key):
+    # DB를 읽기 전에 세대 번호를 먼저 읽어야, 읽는 도중 쓰기가 일어나도 오래된 페이지가 새 세대로 저장되지 않음
+    generation = list_generation(board_category_id)
+    page       = cache.get(_list_key(board_category_id, generation, page_key))
+    _incr_stat('list_hit' if page is not None else 'list_miss')
+    return page, generation
+
+def set_list_page(board_category_id, generation, page_key, page):
+    cache.set(_list_key(board_category_id, generation, page_key), page, timeout=getattr(settings, 'POST_LIST_CACHE_TIMEOUT', 60))
+
+def bump_list_generation(*board_category_ids):
+    # 전체 목록은 어느 게시판의 글이 바뀌어도 함께 무효화
+    for board_category_id in {None, *board_category_ids}:
+        _incr(_list_generation_key(board_category_id), initial=_initial_generation())
@@ -0,0 +1,91 @@
+import os
+import atexit
+import logging
+import threading
+import time
+from collections          import defaultdict
+
+from django.conf          import settings
+from django.db            import close_old_connections
+from django.db.models     import F
+
+from .models              import Post
+
+logger = logging.getLogger(__name__)
+
+class ViewCountBuffer:
+    # 조회수 증가분을 워커 메모리에 모았다가 views 컬럼만 갱신하는 UPDATE로 묶어서 반영
+    # 여러 워커가 각자 버퍼를 가져도 증가분끼리 더해지므로 합계는 맞음
+    def __init__(self):
+        self._lock        = threading.Lock()
+        self._pending     = defaultdict(int)
+        self._flusher_pid = None
+
+    def incr(self, post_id, amount=1):
+        # 요청 처리 중에는 버퍼에 더하기만 하고 DB 반영은 백그라운드 스레드가 맡음 (조회 요청이 UPDATE 실패로 500 이 되지 않도록)
+        with self._lock:
+            self._pending[post_id] += amount
+            # 주기가 None 이면 스레드 없이 flush() 를 직접 부를 때만 반영 (테스트 등)
+            start = getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 5) is not None and self._flusher_pid != os.getpid()
+            if start:
+                self._flusher_pid = os.getpid()
+
+        # fork 된 워커에는 부모의 스레드가 없으므로 프로세스마다 처음 들어온 요청이 스레드를 띄움
+        if start:
+            threading.Thread(target=self._run_flusher, name='view-count-flusher', daemon=True).start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 5) or 5)
+            try:
+                self.flush()
+            except Exception:
+                # 반영하지 못한 증가분은 flush 가 버퍼로 되돌려 두었으므로 다음 주기에 다시 시도
+                logger.exception('view count flush failed')
+            finally:
+                close_old_connections()
+
+    def pending(self, post_ids):
+        with self._lock:
+            return {post_id : self._pending[post_id] for post_id in post_ids if post_id in self._pending}
+
+    def flush(self):
+        with self._lock:
+            pending          = self._pending
+            self._pending    = defaultdict(int)
+
+        if not pending:
+            return 0
+
+        # 같은 증가분을 가진 글끼리 묶어 UPDATE 횟수를 줄임
+        by_delta = defaultdict(list)
+        for post_id, delta in pending.items():
+            by_delta[delta].append(post_id)
+
+        applied = set()
+        try:
+            for delta, post_ids in by_delta.items():
+                Post.objects.filter(id__in=post_ids).update(views=F('views')+delta)
+                applied.update(post_ids)
+        except Exception:
+            # 반영하지 못한 증가분은 버퍼로 되돌려 다음 주기에 다시 시도
+            with self._lock:
+                for post_id, delta in pending.items():
+                    if post_id not in applied:
+                        self._pending[post_id] += delta
+            raise
+        return len(pending)
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+
+view_counts = ViewCountBuffer()
+
+def _flush_at_exit():
+    try:
+        view_counts.flush()
+    except Exception:
+        pass
+
+atexit.register(_flush_at_exit)
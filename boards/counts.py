@@ -0,0 +1,50 @@
+# 게시판별 글 수 (board_post_counts)
+# InnoDB 의 COUNT(*) 는 인덱스 전체를 훑으므로 목록 응답의 전체 글 수는 이 표에서 읽음
+# 글 작성/답글/삭제 트랜잭션의 마지막에 증감을 기록 (게시판 행 락을 커밋 직전까지만 잡도록)
+# 게시판 밖으로 옮겨진 글(게시판 삭제로 board_category 가 NULL)은 세지 않음
+from collections                import Counter
+
+from django.db.models           import F, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils               import timezone
+
+from .models                    import Post, BoardCategory, BoardPostCount
+from .modules                   import add_count
+
+def record_post_counts(board_category_ids, delta=1):
+    # board_category_ids : 작성(delta=1)/삭제(delta=-1)된 글마다의 게시판 id
+    deltas = Counter(board_category_id for board_category_id in board_category_ids if board_category_id is not None)
+    # 잠금 순서를 맞춰 교착을 피함
+    for board_category_id, count in sorted(deltas.items()):
+        add_count(BoardPostCount, {'board_category_id' : board_category_id}, count * delta)
+
+def post_count(board_category_id=None):
+    # 게시판 하나 또는 (None 이면) 모든 게시판의 글 수
+    if board_category_id is not None:
+        return BoardPostCount.objects.filter(board_category_id=board_category_id).values_list('count', flat=True).first() or 0
+    return sum(BoardPostCount.objects.values_list('count', flat=True))
+
+def reconcile_post_counts(post_model=Post, board_model=BoardCategory, count_model=BoardPostCount):
+    # 게시판마다 저장된 값과 실제 글 수를 SELECT 한 번으로 함께 읽은 뒤 (posts_board_list_order_idx 에서 그 게시판 구간만 셈)
+    # 차이만큼을 짧은 UPDATE 한 번으로 더함 (잠그지 않는 읽기라 세는 동안 글 작성/삭제가 기다리지 않음)
+    # Django 의 MySQL 연결은 READ COMMITTED 라 읽기마다 새 스냅샷을 보므로 두 값을 따로 읽으면 그 사이에 커밋된 글이
+    # 실제 값에만 들어가 차이에 한 번 더 더해짐 -> 한 문장 안의 읽기는 같은 스냅샷을 보므로 두 값을 한 쿼리로 읽음
+    # 증감은 글 변경과 같은 트랜잭션에서 기록되므로 그 스냅샷 이후의 증감은 차이에 섞이지 않고 그대로 남음
+    # 반환값 : 값이 달랐던 게시판의 {id : (저장돼 있던 값, 실제 값)}
+    fixed = {}
+    for board_category_id in board_model.objects.order_by('id').values_list('id', flat=True):
+        count_model.objects.get_or_create(board_category_id=board_category_id)
+        actual_count   = post_model.objects.filter(
+            board_category_id = OuterRef('board_category_id'),
+        ).order_by().values('board_category_id').annotate(count=Count('id')).values('count')
+        stored, actual = count_model.objects.filter(board_category_id=board_category_id).annotate(
+            actual = Coalesce(Subquery(actual_count), Value(0)),
+        ).values_list('count', 'actual').get()
+
+        if stored != actual:
+            fixed[board_category_id] = (stored, actual)
+        count_model.objects.filter(board_category_id=board_category_id).update(
+            count         = F('count') + (actual - stored),
+            reconciled_at = timezone.now(),
+        )
+    return fixed
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from boards.models import Post
+from boards.posts  import backfill_notice_flag
+
+class Command(BaseCommand):
+    help = 'posts.is_notice 값을 post_category 기준으로 pk 구간 단위 배치 백필'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0, help='배치 사이 대기 시간(초)')
+
+    def handle(self, *args, **options):
+        updated = backfill_notice_flag(
+            Post,
+            batch_size = options['batch_size'],
+            pause      = options['pause'],
+        )
+        self.stdout.write(f'updated rows : {updated}')
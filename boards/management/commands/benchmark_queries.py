@@ -0,0 +1,147 @@
+import json
+import math
+import time
+import random
+import itertools
+
+from django.core.cache           import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db                   import connection, transaction
+from django.db.models            import Min, Max
+from django.test                 import Client
+from django.test.utils           import CaptureQueriesContext, override_settings
+
+from boards.counters             import view_counts
+from boards.models               import Post, BoardPostCount
+from boards.modules              import encode_cursor
+from users.views                 import issue_token
+
+LIST_LIMIT = 15
+
+class Command(BaseCommand):
+    help = ('현재 DB(seed_boards 로 만든 데이터 등)에 목록(앞/깊은 페이지, offset/cursor), 상세, 답글 작성, 묶음 조회 요청을 보내 '
+            'p50/p99 응답 시간과 요청당 쿼리 수를 JSON 으로 출력')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board-category-id', type=int, help='기본값은 글이 가장 많은 게시판')
+        parser.add_argument('--repeat', type=int, default=50, help='항목별 요청 수')
+        parser.add_argument('--deep-page', type=int, default=200, help='깊은 페이지 번호 (게시판 페이지 수를 넘으면 마지막 페이지)')
+        parser.add_argument('--warm', action='store_true', help='목록/상세 캐시를 비우지 않고 측정 (기본은 매 요청 캐시 없이 DB 경로)')
+        parser.add_argument('--rounds', type=int, default=4, help='답글 작성 시 bcrypt cost (DB 작업만 보려면 낮게)')
+        parser.add_argument('--output', help='결과 JSON 을 저장할 파일 (기본은 표준 출력)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        board_category_id = options['board_category_id'] or BoardPostCount.objects.order_by('-count').values_list(
+            'board_category_id', flat=True
+        ).first()
+        board_posts       = Post.objects.filter(board_category_id=board_category_id)
+        if board_category_id is None or not board_posts.exists():
+            raise CommandError('글이 있는 게시판이 없습니다. seed_boards 로 데이터를 먼저 만들어주세요')
+
+        self.rng     = random.Random(options['seed'])
+        self.client  = Client()
+        self.warm    = options['warm']
+        token        = issue_token(board_posts.values_list('user_id', flat=True).first())
+
+        total_count  = BoardPostCount.objects.get(board_category_id=board_category_id).count
+        deep_page    = max(1, min(options['deep_page'], math.ceil(total_count / LIST_LIMIT)))
+        deep_cursor  = self.cursor_before(board_posts, deep_page)
+        id_range     = board_posts.aggregate(low=Min('id'), high=Max('id'))
+        # 측정 시간에 섞이지 않도록 상세/답글 대상 글을 미리 골라둠
+        post_ids     = itertools.cycle([self.random_post_id(board_posts, id_range) for _ in range(options['repeat'])])
+        group_ids    = list(board_posts.filter(group_depth__gt=0).values_list('group_id', flat=True).distinct()[:1000]) or \
+                       list(board_posts.values_list('group_id', flat=True)[:1000])
+
+        list_path    = '/boards/board-list'
+        scenarios    = {
+            'list_first_page'  : lambda: self.client.get(list_path, {'board_category_id' : board_category_id, 'page' : 1}),
+            'list_deep_offset' : lambda: self.client.get(list_path, {'board_category_id' : board_category_id, 'page' : deep_page}),
+            'list_deep_cursor' : lambda: self.client.get(list_path, {'board_category_id' : board_category_id, 'cursor' : deep_cursor}),
+            'detail'           : lambda: self.client.get(f'/boards/{next(post_ids)}'),
+            'thread'           : lambda: self.client.get(f'/boards/threads/{self.rng.choice(group_ids)}'),
+            'reply'            : lambda: self.reply(next(post_ids), token),
+        }
+
+        # 운영 캐시를 건드리지 않도록 이 프로세스 전용 메모리 캐시를 씀
+        # 상세 조회의 조회수는 버퍼에만 쌓고(반영 스레드를 띄우지 않음) 끝나면 버림 (측정 중인 DB 에 views UPDATE 를 쓰지 않도록)
+        try:
+            with override_settings(
+                CACHES                    = {'default' : {'BACKEND' : 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION' : 'benchmark-queries'}},
+                BCRYPT_ROUNDS             = options['rounds'],
+                VIEW_COUNT_FLUSH_INTERVAL = None,
+            ):
+                results = {name : self.measure(request, options['repeat']) for name, request in scenarios.items()}
+        finally:
+            view_counts.clear()
+
+        report = json.dumps({
+            'database'          : connection.vendor,
+            'board_category_id' : board_category_id,
+            'board_posts'       : total_count,
+            'deep_page'         : deep_page,
+            'cache'             : 'warm' if self.warm else 'cold',
+            'repeat'            : options['repeat'],
+            'results'           : results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='UTF-8') as output:
+                output.write(report + '\n')
+        self.stdout.write(report)
+
+    def cursor_before(self, board_posts, page):
+        # 깊은 페이지 바로 앞 글의 정렬 키 (offset 과 같은 페이지를 cursor 로 읽기 위함), 첫 페이지면 빈 커서
+        if page == 1:
+            return ''
+        values = board_posts.order_by('-is_notice', '-group_id', 'thread_path', 'id').values_list(
+            'is_notice', 'group_id', 'thread_path', 'id'
+        )[(page - 1) * LIST_LIMIT - 1]
+        return encode_cursor(list(values))
+
+    def random_post_id(self, board_posts, id_range):
+        # 게시판 id 구간에서 임의의 값 이상인 첫 글 (ORDER BY RAND() 없이)
+        post_id = self.rng.randint(id_range['low'], id_range['high'])
+        return board_posts.filter(id__gte=post_id).order_by('id').values_list('id', flat=True).first()
+
+    def reply(self, post_id, token):
+        # 답글 작성 뷰를 그대로 거치되 측정이 끝나면 되돌려 데이터가 늘어나지 않게 함
+        with transaction.atomic():
+            response = self.client.post('/boards/board-reply', {'json' : json.dumps({
+                'post_id'  : post_id,
+                'title'    : 'benchmark reply',
+                'content'  : 'benchmark reply',
+                'password' : 'benchmark',
+            })}, HTTP_AUTHORIZATION=token)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, request, repeat):
+        samples  = []
+        queries  = []
+        statuses = {}
+        for _ in range(repeat):
+            if not self.warm:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started  = time.perf_counter()
+                response = request()
+                if response.streaming:
+                    # 묶음 조회는 스트리밍 응답이라 본문을 다 읽어야 DB 조회가 끝남
+                    b''.join(response.streaming_content)
+                samples.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        return {
+            'p50_ms'      : round(percentile(samples, 50), 2),
+            'p99_ms'      : round(percentile(samples, 99), 2),
+            'max_ms'      : round(max(samples), 2),
+            'queries_p50' : percentile(queries, 50),
+            'queries_max' : max(queries),
+            'statuses'    : statuses,
+        }
+
+def percentile(values, percent):
+    # nearest-rank 백분위수
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
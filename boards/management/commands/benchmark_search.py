@@ -0,0 +1,99 @@
+import json
+import time
+import random
+
+from django.core.management.base import BaseCommand
+from django.db                   import connection
+from django.db.models            import Q
+from django.test.utils           import setup_databases, teardown_databases
+
+from boards.models               import Post, BoardCategory, PostCategory
+from boards.posts                import insert_posts
+from boards.search               import query_tokens, search_posts
+from users.models                import User
+
+WORDS = (
+    '배송', '문의', '드립니다', '상품', '교환', '환불', '주문', '취소', '결제', '쿠폰', '적립금', '사이즈',
+    '색상', '재고', '입고', '예정일', '언제', '가능한가요', '감사합니다', '확인', '부탁드립니다', '택배',
+    '반품', '불량', '포장', '회원', '등급', '이벤트', '당첨', '후기', 'delivery', 'refund', 'order', 'size',
+)
+
+class Command(BaseCommand):
+    help = '가짜 글 N개(기본 100만)를 테스트 DB에 넣고 post_tokens 검색과 LIKE 전체 검색의 응답 시간을 비교 (흔한 단어/드문 단어 검색어)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--queries', nargs='+', default=['배송 예정일', '환불 문의', 'refund'])
+        parser.add_argument('--rare-words', type=int, default=50000, help='글마다 2개씩 섞어 넣는 드문 단어(상품명 등) 수')
+        parser.add_argument('--rare-queries', type=int, default=3, help='드문 단어로 만든 검색어 수')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng        = random.Random(options['seed'])
+        rare_words = [self.rare_word(rng) for _ in range(options['rare_words'])]
+        queries    = options['queries'] + rng.sample(rare_words, options['rare_queries'])
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            loaded  = self.load(options['posts'], options['batch_size'], rng, rare_words)
+            results = [self.measure(query, options['repeat']) for query in queries]
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM post_tokens')
+                token_rows = cursor.fetchone()[0]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        self.stdout.write(json.dumps({'posts' : options['posts'], 'token_rows' : token_rows, 'load' : loaded, 'queries' : results}, indent=2, ensure_ascii=False))
+
+    def rare_word(self, rng):
+        # 한글 음절 3개로 만든 임의의 단어
+        return ''.join(chr(0xAC00 + rng.randrange(11172)) for _ in range(3))
+
+    def load(self, count, batch_size, rng, rare_words):
+        User.objects.create(id=1, name='bench', email='bench@example.com', password='-', nickname='bench')
+        BoardCategory.objects.create(id=1, name='bench')
+        PostCategory.objects.create(id=1, name='일반 글')
+
+        started = time.monotonic()
+        for start in range(0, count, batch_size):
+            insert_posts([(Post(
+                board_category_id = 1,
+                user_id           = 1,
+                post_category_id  = 1,
+                title             = ' '.join(rng.choices(WORDS, k=4)),
+                content           = ' '.join(rng.choices(WORDS, k=20) + rng.choices(rare_words, k=2)),
+                password          = '-',
+            ), []) for _ in range(min(batch_size, count - start))], batch_size=batch_size)
+        elapsed = time.monotonic() - started
+        return {'seconds' : round(elapsed, 1), 'posts_per_sec' : round(count / elapsed)}
+
+    def measure(self, query, repeat):
+        tokens = query_tokens(query)
+        words  = query.split()
+
+        def indexed():
+            return search_posts(tokens, limit=15)
+
+        def like():
+            # 운영에서 쓰던 방식 : 단어마다 제목 또는 본문 LIKE '%단어%' 전체 스캔
+            condition = Q()
+            for word in words:
+                condition &= Q(title__contains=word) | Q(content__contains=word)
+            return list(Post.objects.filter(condition).order_by('-id').values_list('id', flat=True)[:15])
+
+        return {
+            'query'      : query,
+            'indexed_ms' : self.timed(indexed, repeat),
+            'like_ms'    : self.timed(like, repeat),
+            'matches'    : len(indexed()),
+        }
+
+    def timed(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.monotonic()
+            func()
+            samples.append((time.monotonic() - started) * 1000)
+        return round(sorted(samples)[len(samples) // 2], 1)
@@ -0,0 +1,106 @@
+import io
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.http.multipartparser import MultiPartParser
+
+from boards.modules import S3StreamingUploadHandler, MB
+
+BOUNDARY = 'BenchmarkBoundary'
+
+class GeneratedBody(io.RawIOBase):
+    # 디스크/메모리에 올리지 않고 읽는 만큼 만들어내는 multipart 요청 본문
+    def __init__(self, file_size):
+        self.head      = (
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="filename"; filename="large.bin"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode('UTF-8')
+        self.tail      = f'\r\n--{BOUNDARY}--\r\n'.encode('UTF-8')
+        self.file_size = file_size
+        self.length    = len(self.head) + file_size + len(self.tail)
+        self.position  = 0
+        self.pattern   = bytes(range(256)) * 256
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self.position
+        chunks = []
+        while size > 0 and self.position < self.length:
+            if self.position < len(self.head):
+                chunk = self.head[self.position:self.position+size]
+            elif self.position < len(self.head) + self.file_size:
+                offset = (self.position - len(self.head)) % len(self.pattern)
+                chunk  = self.pattern[offset:offset+min(size, len(self.head) + self.file_size - self.position)]
+            else:
+                offset = self.position - len(self.head) - self.file_size
+                chunk  = self.tail[offset:offset+size]
+            chunks.append(chunk)
+            self.position += len(chunk)
+            size          -= len(chunk)
+        return b''.join(chunks)
+
+class DiscardS3Client:
+    # 받은 파트 크기만 세고 버리는 S3 대역 (네트워크 비용 없이 업로드 경로의 메모리만 측정)
+    def __init__(self, samples, sample_every):
+        self.received     = 0
+        self.samples      = samples
+        self.sample_every = sample_every
+
+    def create_multipart_upload(self, **kwargs):
+        return {'UploadId' : 'benchmark'}
+
+    def upload_part(self, PartNumber, Body, **kwargs):
+        self.received += len(Body)
+        if self.received // self.sample_every > len(self.samples):
+            self.samples.append({'received_mb' : self.received // MB, 'traced_mb' : round(tracemalloc.get_traced_memory()[0] / MB, 1)})
+        return {'ETag' : str(PartNumber)}
+
+    def complete_multipart_upload(self, **kwargs):
+        pass
+
+    def abort_multipart_upload(self, **kwargs):
+        pass
+
+    def put_object(self, Body, **kwargs):
+        self.received += len(Body)
+
+class Command(BaseCommand):
+    help = '스트리밍 업로드 핸들러로 큰 파일을 받을 때 메모리 사용량이 파일 크기와 무관하게 일정한지 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=1024)
+        parser.add_argument('--sample-mb', type=int, default=64)
+
+    def handle(self, *args, **options):
+        file_size = options['size_mb'] * MB
+        body      = GeneratedBody(file_size)
+        samples   = []
+        s3_client = DiscardS3Client(samples, options['sample_mb'] * MB)
+        meta      = {
+            'CONTENT_TYPE'   : f'multipart/form-data; boundary={BOUNDARY}',
+            'CONTENT_LENGTH' : str(body.length),
+        }
+
+        tracemalloc.start()
+        started   = time.monotonic()
+        parser    = MultiPartParser(meta, body, [S3StreamingUploadHandler(None, s3_client)], 'UTF-8')
+        _, files  = parser.parse()
+        elapsed   = time.monotonic() - started
+        _, peak   = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(json.dumps({
+            'file_mb'         : options['size_mb'],
+            'uploaded_mb'     : s3_client.received // MB,
+            'seconds'         : round(elapsed, 2),
+            'throughput_mbps' : round(options['size_mb'] / elapsed, 1),
+            'peak_traced_mb'  : round(peak / MB, 1),
+            'samples'         : samples,
+            'uploaded_file'   : files['filename'].key,
+        }, indent=2))
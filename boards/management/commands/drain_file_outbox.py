@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boards.outbox import drain_file_outbox
+
+class Command(BaseCommand):
+    help = 'file_delete_outbox 에 쌓인 S3 객체를 배치 단위로 삭제 (실패 시 재시도)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-attempts', type=int)
+        parser.add_argument('--loop', action='store_true', help='큐가 비어도 종료하지 않고 계속 처리')
+        parser.add_argument('--interval', type=float, default=5, help='--loop 에서 큐가 비었을 때 대기 시간(초)')
+
+    def handle(self, *args, **options):
+        total_deleted = 0
+        total_failed  = 0
+        while True:
+            deleted, failed = drain_file_outbox(
+                batch_size   = options['batch_size'],
+                max_attempts = options['max_attempts']
+            )
+            total_deleted  += deleted
+            total_failed   += failed
+
+            if deleted + failed == 0:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(f'deleted : {total_deleted}, failed : {total_failed}')
@@ -0,0 +1,65 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.models  import Post
+from boards.posts   import insert_posts
+from boards.caches  import bump_list_generation
+from users.hashers  import hash_password
+
+class Command(BaseCommand):
+    help = 'JSON Lines 파일의 원글을 배치 단위로 일괄 등록 (배치마다 id 예약 1번 + posts/file_uploads bulk_create)'
+
+    def add_arguments(self, parser):
+        # 한 줄에 글 하나 : {"board_category_id", "post_category_id", "user_id", "title", "content",
+        #                    "password_hash" 또는 "password", "tag", "ip_address", "files" : [url, ...]}
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started   = time.monotonic()
+        imported  = 0
+        board_ids = set()
+        batch     = []
+
+        with open(options['path'], encoding='UTF-8') as lines:
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(self.build_entry(json.loads(line)))
+                except (KeyError, json.JSONDecodeError) as error:
+                    raise CommandError(f'line {line_number} : {error!r} (imported posts : {imported})')
+
+                if len(batch) >= options['batch_size']:
+                    imported += self.flush(batch, board_ids)
+            imported += self.flush(batch, board_ids)
+
+        bump_list_generation(*board_ids)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'imported posts : {imported} ({imported / elapsed if elapsed else 0:.0f} posts/s)')
+
+    def build_entry(self, data):
+        # 평문 비밀번호의 bcrypt 해시가 가져오기 시간 대부분을 차지하므로 가능하면 password_hash 로 넘김
+        password_hash = data.get('password_hash') or hash_password(data['password'])
+        post          = Post(
+            board_category_id = data['board_category_id'],
+            user_id           = data['user_id'],
+            post_category_id  = data['post_category_id'],
+            title             = data['title'],
+            content           = data['content'],
+            ip_address        = data.get('ip_address', '192.168.0.1'),
+            password          = password_hash,
+            tag               = data.get('tag'),
+        )
+        return post, data.get('files', [])
+
+    def flush(self, batch, board_ids):
+        if not batch:
+            return 0
+        posts = insert_posts(batch, batch_size=len(batch))
+        board_ids.update(post.board_category_id for post in posts)
+        batch.clear()
+        return len(posts)
@@ -0,0 +1,140 @@
+import io
+import os
+import json
+import tempfile
+import time
+import asyncio
+from collections                 import Counter
+from concurrent.futures          import ThreadPoolExecutor
+from unittest.mock               import patch
+
+import jwt
+from django.core.management.base import BaseCommand
+from django.db                   import connection
+from django.test                 import Client
+from django.test.client          import encode_multipart, BOUNDARY, MULTIPART_CONTENT
+from django.test.utils           import setup_databases, teardown_databases, override_settings
+
+from board.asgi                  import BoardASGIHandler
+from boards.models               import BoardCategory, PostCategory
+from users.models                import User
+import my_settings
+
+class SlowS3Client:
+    # 업로드마다 지정한 시간만큼 기다리는 S3 대역 (워커가 S3 응답을 기다리는 동안 다른 요청을 받을 수 있는지 측정)
+    def __init__(self, latency):
+        self.latency = latency
+
+    def upload_fileobj(self, *args, **kwargs):
+        time.sleep(self.latency)
+
+    def delete_objects(self, **kwargs):
+        return {}
+
+class Command(BaseCommand):
+    help = '워커 프로세스 하나에서 WSGI(동기 뷰)와 ASGI(async 뷰) 경로의 글 작성 처리량 비교 (테스트 DB 사용, S3 는 지연만 흉내냄)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=40)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--wsgi-threads', type=int, default=1)
+        parser.add_argument('--s3-latency', type=float, default=0.2)
+        parser.add_argument('--rounds', type=int, default=4)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            # async 뷰는 요청마다 별도 스레드(별도 DB 연결)에서 글을 쓰는데, sqlite 메모리 DB 는 연결 사이의 테이블 잠금을
+            # 기다리지 않고 바로 실패하므로 잠금을 기다리는 임시 파일 DB 로 측정
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'load_test_views.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            User.objects.create(id=1, name='loadtest', email='loadtest@example.com', password='-', nickname='loadtest')
+            BoardCategory.objects.create(id=1, name='load test')
+            PostCategory.objects.create(id=1, name='일반 글')
+            self.token = jwt.encode({"user_id" : 1}, my_settings.SECRET['secret'], algorithm="HS256")
+
+            s3_client  = SlowS3Client(options['s3_latency'])
+            with patch('boards.views.create_s3_client', return_value=s3_client), \
+                 override_settings(BCRYPT_ROUNDS=options['rounds']):
+                results = [
+                    self.run_wsgi(options['requests'], options['wsgi_threads']),
+                    self.run_asgi(options['requests'], options['concurrency']),
+                ]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        for result in results:
+            result['requests_per_sec'] = round(options['requests'] / result['seconds'], 1)
+        self.stdout.write(json.dumps({'s3_latency' : options['s3_latency'], 'results' : results}, indent=2))
+
+    def form(self, index):
+        body = {
+            "board_category_id" : 1,
+            "post_category_id"  : 1,
+            "title"             : f'load test {index}',
+            "content"           : 'load test',
+            "password"          : 'password',
+        }
+        attachment      = io.BytesIO(b'x' * 1024)
+        attachment.name = f'load-test-{index}.txt'
+        return {"json" : json.dumps(body), "filename" : attachment}
+
+    def run_wsgi(self, requests, threads):
+        # 동기 워커 : 스레드 하나가 요청 하나를 끝까지 처리 (gthread 워커면 --wsgi-threads 만큼)
+        def send(index):
+            return Client().post('/boards/board-write', self.form(index), HTTP_AUTHORIZATION=self.token).status_code
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(send, range(requests)))
+        return {
+            'path'     : 'wsgi',
+            'threads'  : threads,
+            'seconds'  : round(time.monotonic() - started, 2),
+            'statuses' : dict(Counter(statuses)),
+        }
+
+    def run_asgi(self, requests, concurrency):
+        # async 워커 : 이벤트 루프 하나에 동시에 concurrency 개의 요청을 넣음 (board/asgi.py 와 같은 핸들러, URL 설정은 미들웨어가 지정)
+        application = BoardASGIHandler()
+
+        async def send(index, limit):
+            body  = encode_multipart(BOUNDARY, self.form(index))
+            scope = {
+                'type'         : 'http',
+                'method'       : 'POST',
+                'path'         : '/boards/board-write',
+                'query_string' : b'',
+                'headers'      : [
+                    (b'content-type', MULTIPART_CONTENT.encode('latin1')),
+                    (b'content-length', str(len(body)).encode('latin1')),
+                    (b'authorization', self.token.encode('latin1')),
+                ],
+                'client'       : ('127.0.0.1', 0),
+                'server'       : ('testserver', 80),
+            }
+            status = {}
+
+            async def receive():
+                return {'type' : 'http.request', 'body' : body, 'more_body' : False}
+
+            async def respond(message):
+                if message['type'] == 'http.response.start':
+                    status['code'] = message['status']
+
+            async with limit:
+                await application(scope, receive, respond)
+            return status.get('code')
+
+        async def run():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*[send(index, limit) for index in range(requests)])
+
+        started = time.monotonic()
+        statuses = asyncio.run(run())
+        return {
+            'path'        : 'asgi',
+            'concurrency' : concurrency,
+            'seconds'     : round(time.monotonic() - started, 2),
+            'statuses'    : dict(Counter(statuses)),
+        }
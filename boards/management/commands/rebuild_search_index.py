@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db                   import transaction
+
+from boards.models  import Post
+from boards.search  import index_posts
+
+class Command(BaseCommand):
+    help = 'post_tokens 검색 색인을 id 순 배치 단위로 다시 만듦 (색인 도입 전에 있던 글, 색인 규칙 변경 시)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--start-id', type=int, default=0, help='중단된 작업을 이어서 할 때 시작 id')
+        parser.add_argument('--pause', type=float, default=0, help='배치 사이 대기 시간(초)')
+
+    def handle(self, *args, **options):
+        last_id = options['start_id'] - 1
+        indexed = 0
+        while True:
+            posts = list(Post.objects.filter(id__gt=last_id).order_by('id').only('id', 'title', 'content')[:options['batch_size']])
+            if not posts:
+                break
+
+            with transaction.atomic():
+                index_posts(posts)
+            indexed += len(posts)
+            last_id  = posts[-1].id
+            self.stdout.write(f'indexed posts : {indexed} (last id {last_id})')
+
+            if options['pause']:
+                time.sleep(options['pause'])
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from boards.trending import rebuild_tag_counts
+
+class Command(BaseCommand):
+    help = '인기 태그 집계(tag_count_buckets, trending_tags)를 post_tags 에서 다시 계산 (집계 도입 전에 있던 글, 집계가 어긋났을 때)'
+
+    def handle(self, *args, **options):
+        buckets = rebuild_tag_counts()
+        self.stdout.write(f'rebuilt tag count buckets : {buckets}')
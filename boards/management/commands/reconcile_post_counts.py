@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from boards.counts import reconcile_post_counts
+
+class Command(BaseCommand):
+    help = '게시판별 글 수(board_post_counts)를 실제 글 수와 맞춤 (cron 등으로 주기 실행)'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_post_counts()
+        for board_category_id, (stored, actual) in fixed.items():
+            self.stdout.write(f'board {board_category_id} : {stored} -> {actual}')
+        self.stdout.write(f'reconciled boards : {len(fixed)}')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django.db      import transaction
+
+from boards.models   import Post, FileUpload
+from boards.modules  import file_key_from_url
+from boards.outbox   import enqueue_file_deletes
+from boards.caches   import invalidate_post_detail, bump_list_generation
+from boards.trending import record_tag_changes, removed_tag_changes
+from boards.counts   import record_post_counts
+
+class Command(BaseCommand):
+    help = '게시글을 일괄 삭제 (첨부 파일은 outbox 에 기록되어 drain_file_outbox 가 S3에서 삭제)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+')
+        parser.add_argument('--user-id', type=int)
+        parser.add_argument('--board-category-id', type=int)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not (options['ids'] or options['user_id'] or options['board_category_id']):
+            raise CommandError('--ids, --user-id, --board-category-id 중 하나 이상을 지정하세요')
+
+        post_list = Post.objects.all()
+        if options['ids']:
+            post_list = post_list.filter(id__in=options['ids'])
+        if options['user_id']:
+            post_list = post_list.filter(user_id=options['user_id'])
+        if options['board_category_id']:
+            post_list = post_list.filter(board_category_id=options['board_category_id'])
+
+        removed  = 0
+        while True:
+            posts = list(post_list.order_by('id').values_list('id', 'board_category_id')[:options['batch_size']])
+            if not posts:
+                break
+            post_ids = [post_id for post_id, _ in posts]
+
+            with transaction.atomic():
+                enqueue_file_deletes([
+                    file_key_from_url(path) for path in FileUpload.objects.filter(post_id__in=post_ids).values_list('path', flat=True)
+                ])
+                record_tag_changes(removed_tag_changes(post_ids))
+                removed += Post.objects.filter(id__in=post_ids).delete()[1].get('boards.Post', 0)
+                record_post_counts([board_category_id for _, board_category_id in posts], delta=-1)
+            invalidate_post_detail(*post_ids)
+            bump_list_generation(*{board_category_id for _, board_category_id in posts})
+
+        self.stdout.write(f'removed posts : {removed}')
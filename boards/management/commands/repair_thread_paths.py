@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from boards.threads import repair_thread_paths
+
+class Command(BaseCommand):
+    help = '배포 중 이전 버전 서버가 thread_path 없이 쓴 답글(group_depth > 0, thread_path = \'\')의 경로를 group_order 로 찾아 채움 (배포 뒤 필수, 여러 번 실행해도 됨)'
+
+    def handle(self, *args, **options):
+        repaired = repair_thread_paths()
+        self.stdout.write(f'repaired replies : {repaired}')
@@ -0,0 +1,147 @@
+import json
+import time
+import random
+import itertools
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.models               import Post, FileUpload, BoardCategory, PostCategory, NOTICE_POST_CATEGORY_ID
+from boards.modules              import file_url
+from boards.posts                import reserve_post_ids, write_posts
+from boards.threads              import child_path
+from boards.caches               import bump_list_generation
+from boards.management.commands.benchmark_search import WORDS
+from users.models                import User
+from users.hashers               import hash_password
+
+REPLY_POST_CATEGORY_ID = 2
+
+class Command(BaseCommand):
+    help = '로컬에서 운영 규모를 재현하기 위한 가짜 사용자/게시판/글 묶음(답글 트리)/태그/첨부 파일을 bulk insert 로 생성 (설정된 DB에 기록)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--boards', type=int, default=5)
+        parser.add_argument('--threads', type=int, default=100000, help='원글 수 (답글은 별도)')
+        parser.add_argument('--reply-depth', type=int, default=3, help='답글 트리의 최대 깊이')
+        parser.add_argument('--fan-out', type=int, default=3, help='글 하나에 달리는 답글 수의 최댓값')
+        parser.add_argument('--reply-probability', type=float, default=0.4, help='글에 답글이 달릴 확률')
+        parser.add_argument('--notice-ratio', type=float, default=0.002)
+        parser.add_argument('--tags', type=int, default=500, help='태그 종류 수 (앞쪽 태그일수록 자주 쓰임)')
+        parser.add_argument('--tags-per-post', type=int, default=3)
+        parser.add_argument('--attachments', type=int, default=2, help='글 하나의 첨부 파일 수 최댓값')
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 트랜잭션에 넣는 원글 수')
+        parser.add_argument('--prefix', default='seed', help='생성하는 사용자/게시판 이름 앞에 붙는 문자열')
+        parser.add_argument('--password', default='seed-password1!', help='사용자와 글의 비밀번호 (해시는 한 번만 계산)')
+        parser.add_argument('--skip-search-index', action='store_true', help='검색 색인을 만들지 않음 (생성 시간의 대부분, 나중에 rebuild_search_index 로 만듦)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(name__startswith=options['prefix']).exists():
+            raise CommandError(f"'{options['prefix']}' 로 시작하는 사용자가 이미 있습니다. --prefix 를 바꿔주세요")
+
+        rng              = random.Random(options['seed'])
+        started          = time.monotonic()
+        # bcrypt 가 생성 시간 대부분을 차지하지 않도록 모든 사용자/글이 같은 해시를 씀
+        self.password    = hash_password(options['password'])
+        self.user_ids    = self.create_users(options['users'], options['prefix'])
+        self.board_ids   = self.create_boards(options['boards'], options['prefix'])
+        # 태그 사용 빈도는 순위에 반비례 (몇몇 태그에 글이 몰림)
+        self.tag_names   = [f'태그{i}' for i in range(options['tags'])]
+        self.tag_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(options['tags'])))
+
+        posts            = 0
+        file_uploads     = 0
+        for start in range(0, options['threads'], options['batch_size']):
+            count         = min(options['batch_size'], options['threads'] - start)
+            batch_posts, batch_files = self.insert_threads(rng, count, options)
+            posts        += batch_posts
+            file_uploads += batch_files
+            self.stderr.write(f'threads : {start + count} / posts : {posts}')
+
+        bump_list_generation(*self.board_ids)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(json.dumps({
+            'users'         : len(self.user_ids),
+            'boards'        : self.board_ids,
+            'threads'       : options['threads'],
+            'posts'         : posts,
+            'file_uploads'  : file_uploads,
+            'seconds'       : round(elapsed, 1),
+            'posts_per_sec' : round(posts / elapsed) if elapsed else None,
+        }, indent=2, ensure_ascii=False))
+
+    def create_users(self, count, prefix):
+        User.objects.bulk_create([User(
+            name     = f'{prefix}{i}',
+            password = self.password,
+            email    = f'{prefix}{i}@example.com',
+            nickname = f'{prefix}{i}',
+        ) for i in range(count)], batch_size=1000)
+        # MySQL 의 bulk_create 는 pk 를 채워주지 않으므로 다시 읽음
+        return list(User.objects.filter(name__startswith=prefix).values_list('id', flat=True))
+
+    def create_boards(self, count, prefix):
+        for post_category_id, name in ((1, '일반 글'), (REPLY_POST_CATEGORY_ID, '답글'), (NOTICE_POST_CATEGORY_ID, '공지')):
+            PostCategory.objects.get_or_create(id=post_category_id, defaults={'name' : name})
+        return [BoardCategory.objects.create(name=f'{prefix} 게시판 {i}').id for i in range(count)]
+
+    def thread_shape(self, rng, options):
+        # 원글 아래 답글 트리를 너비 우선으로 만듦, 반환 : [(부모 위치, 깊이)] (원글은 (None, 0))
+        nodes  = [(None, 0)]
+        cursor = 0
+        while cursor < len(nodes):
+            _, depth = nodes[cursor]
+            if depth < options['reply_depth'] and rng.random() < options['reply_probability']:
+                nodes += [(cursor, depth + 1)] * rng.randint(1, options['fan_out'])
+            cursor  += 1
+        return nodes
+
+    def insert_threads(self, rng, count, options):
+        shapes       = [self.thread_shape(rng, options) for _ in range(count)]
+        post_ids     = iter(reserve_post_ids(sum(len(shape) for shape in shapes)))
+
+        posts        = []
+        file_uploads = []
+        for shape in shapes:
+            board_id    = rng.choice(self.board_ids)
+            thread      = []
+            newest      = {}
+            for parent, depth in shape:
+                post_id = next(post_ids)
+                if parent is None:
+                    group_id         = post_id
+                    thread_path      = ''
+                    post_category_id = NOTICE_POST_CATEGORY_ID if rng.random() < options['notice_ratio'] else 1
+                else:
+                    # 먼저 달린 답글부터 child_path 로 경로를 받으므로 insert_reply 로 하나씩 단 것과 같은 경로
+                    parent_path      = thread[parent].thread_path
+                    thread_path      = child_path(parent_path, newest.get(parent))
+                    newest[parent]   = thread_path
+                    post_category_id = REPLY_POST_CATEGORY_ID
+
+                thread.append(Post(
+                    id                = post_id,
+                    board_category_id = board_id,
+                    user_id           = rng.choice(self.user_ids),
+                    post_category_id  = post_category_id,
+                    title             = ' '.join(rng.choices(WORDS, k=rng.randint(2, 6))),
+                    content           = ' '.join(rng.choices(WORDS, k=rng.randint(10, 80))),
+                    ip_address        = f'10.0.{rng.randrange(256)}.{rng.randrange(256)}',
+                    password          = self.password,
+                    group_id          = group_id,
+                    thread_path       = thread_path,
+                    group_depth       = depth,
+                    tag               = ', '.join(dict.fromkeys(rng.choices(
+                        self.tag_names, cum_weights=self.tag_weights, k=rng.randint(0, options['tags_per_post'])
+                    ))) if self.tag_names else None,
+                ))
+                file_uploads += [
+                    FileUpload(post_id=post_id, path=file_url(f'seed/{post_id}-{i}.jpg'))
+                    for i in range(rng.randint(0, options['attachments']))
+                ]
+            posts += thread
+
+        write_posts(posts, file_uploads, batch_size=options['batch_size'], search_index=not options['skip_search_index'])
+        return len(posts), len(file_uploads)
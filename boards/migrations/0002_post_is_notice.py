@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_notice',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-is_notice', '-group_id', 'group_order', 'id'], name='posts_list_order_idx'),
+        ),
+    ]
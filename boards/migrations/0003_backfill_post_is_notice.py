@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Min, Max
+
+NOTICE_POST_CATEGORY_ID = 3
+
+
+def forwards(apps, schema_editor):
+    # boards.posts.backfill_notice_flag 를 그대로 옮겨둔 것 (이후 코드가 바뀌어도 이 마이그레이션은 그대로 동작하도록)
+    # 트랜잭션 없이 실행하므로 배치마다 UPDATE 가 바로 커밋되어 행 락을 오래 잡지 않음
+    Post   = apps.get_model('boards', 'Post')
+    bounds = Post.objects.aggregate(min_id=Min('id'), max_id=Max('id'))
+    if bounds['min_id'] is None:
+        return
+
+    batch_size = 1000
+    start_id   = bounds['min_id']
+    while start_id <= bounds['max_id']:
+        batch = Post.objects.filter(id__gte=start_id, id__lt=start_id+batch_size)
+        batch.filter(post_category_id=NOTICE_POST_CATEGORY_ID, is_notice=False).update(is_notice=True)
+        batch.exclude(post_category_id=NOTICE_POST_CATEGORY_ID).filter(is_notice=True).update(is_notice=False)
+        start_id += batch_size
+
+
+class Migration(migrations.Migration):
+    # MySQL 은 DDL 을 되돌릴 수 없어 RunPython 하나를 통째로 트랜잭션으로 감싸므로 atomic=False 로 배치마다 커밋
+    atomic = False
+
+    dependencies = [
+        ('boards', '0002_post_is_notice'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop, atomic=False),
+    ]
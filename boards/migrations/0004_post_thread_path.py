@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_backfill_post_is_notice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thread_path',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group_id', 'thread_path'], name='posts_thread_path_idx'),
+        ),
+    ]
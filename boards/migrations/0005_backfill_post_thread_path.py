@@ -0,0 +1,86 @@
+from django.db import migrations
+
+# boards.threads 의 경로 계산을 그대로 옮겨둔 것 (이후 코드가 바뀌어도 이 마이그레이션은 그대로 동작하도록)
+SEGMENT_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+SEGMENT_WIDTH  = 4
+SEGMENT_MAX    = len(SEGMENT_DIGITS) ** SEGMENT_WIDTH - 1
+
+
+def encode_segment(value):
+    digits = []
+    for _ in range(SEGMENT_WIDTH):
+        value, remainder = divmod(value, len(SEGMENT_DIGITS))
+        digits.append(SEGMENT_DIGITS[remainder])
+    return ''.join(reversed(digits))
+
+
+def build_thread_paths(rows):
+    # rows: group_order 순으로 정렬된 (id, group_depth) 목록, 반환: {id: thread_path}
+    parents  = {}
+    children = {}
+    stack    = []
+    for post_id, depth in rows:
+        while stack and stack[-1][1] >= depth:
+            stack.pop()
+        parent_id         = stack[-1][0] if stack else None
+        parents[post_id]  = parent_id
+        children.setdefault(parent_id, []).append(post_id)
+        stack.append((post_id, depth))
+
+    positions = {}
+    for siblings in children.values():
+        for position, post_id in enumerate(siblings):
+            positions[post_id] = position
+
+    paths = {}
+    for post_id, _ in rows:
+        parent_id = parents[post_id]
+        if parent_id is None:
+            paths[post_id] = ''
+            continue
+        value          = SEGMENT_MAX - (len(children[parent_id]) - 1) + positions[post_id]
+        paths[post_id] = paths[parent_id] + encode_segment(value)
+    return paths
+
+
+def forwards(apps, schema_editor):
+    # 묶음(group_id) 단위로 나눠 기존 group_order 순서를 그대로 내는 thread_path 를 채움
+    # 트랜잭션 없이 실행하므로 배치마다 바로 커밋되어 행 락을 오래 잡지 않음
+    Post          = apps.get_model('boards', 'Post')
+    batch_size    = 500
+    last_group_id = None
+
+    while True:
+        group_ids = Post.objects.exclude(group_id=None)
+        if last_group_id is not None:
+            group_ids = group_ids.filter(group_id__gt=last_group_id)
+        group_ids = list(group_ids.order_by('group_id').values_list('group_id', flat=True).distinct()[:batch_size])
+        if not group_ids:
+            break
+
+        rows = {}
+        for post_id, group_id, depth in Post.objects.filter(group_id__in=group_ids).order_by(
+            'group_id', 'group_order', 'id'
+        ).values_list('id', 'group_id', 'group_depth'):
+            rows.setdefault(group_id, []).append((post_id, depth))
+
+        posts = []
+        for group_rows in rows.values():
+            for post_id, thread_path in build_thread_paths(group_rows).items():
+                posts.append(Post(id=post_id, thread_path=thread_path))
+        Post.objects.bulk_update(posts, ['thread_path'], batch_size=batch_size)
+
+        last_group_id = group_ids[-1]
+
+
+class Migration(migrations.Migration):
+    # MySQL 은 RunPython 하나를 통째로 트랜잭션으로 감싸므로 atomic=False 로 배치마다 커밋
+    atomic = False
+
+    dependencies = [
+        ('boards', '0004_post_thread_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop, atomic=False),
+    ]
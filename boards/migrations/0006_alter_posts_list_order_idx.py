@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # group_order 컬럼은 이전 버전 서버가 배포 중에 계속 쓰므로 여기서 지우지 않고 다음 배포의 마이그레이션에서 지움
+
+    dependencies = [
+        ('boards', '0005_backfill_post_thread_path'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_list_order_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-is_notice', '-group_id', 'thread_path', 'id'], name='posts_list_order_idx'),
+        ),
+    ]
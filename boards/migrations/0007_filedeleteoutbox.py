@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0006_alter_posts_list_order_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileDeleteOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.CharField(max_length=200, null=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'file_delete_outbox',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='filedeleteoutbox',
+            index=models.Index(fields=['available_at', 'id'], name='file_delete_outbox_due_idx'),
+        ),
+    ]
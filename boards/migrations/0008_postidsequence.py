@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0007_filedeleteoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostIdSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=45, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'post_id_sequences',
+            },
+        ),
+    ]
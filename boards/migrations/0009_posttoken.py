@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0008_postidsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=10)),
+                ('weight', models.IntegerField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.post')),
+            ],
+            options={
+                'db_table': 'post_tokens',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='posttoken',
+            index=models.Index(fields=['token', 'post', 'weight'], name='post_tokens_lookup_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0009_posttoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=45, unique=True)),
+            ],
+            options={
+                'db_table': 'tags',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_notice', models.BooleanField(default=False)),
+                ('group_id', models.BigIntegerField(null=True)),
+                ('thread_path', models.CharField(default='', max_length=255)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.post')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.tag')),
+            ],
+            options={
+                'db_table': 'post_tags',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='tags',
+            field=models.ManyToManyField(related_name='posts', through='boards.PostTag', to='boards.Tag'),
+        ),
+        migrations.AddIndex(
+            model_name='posttag',
+            index=models.Index(fields=['tag', '-is_notice', '-group_id', 'thread_path', 'post'], name='post_tags_list_order_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='posttag',
+            constraint=models.UniqueConstraint(fields=('post', 'tag'), name='post_tags_post_tag_uniq'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations, transaction
+
+# boards.tags 의 태그 파싱/기록을 그대로 옮겨둔 것 (이후 코드가 바뀌어도 이 마이그레이션은 그대로 동작하도록)
+TAG_NAME_MAX_LENGTH = 45
+
+
+def parse_tag_names(tag_string):
+    names = []
+    for name in (tag_string or '').replace(' ', '').split(','):
+        name = name.lower()[:TAG_NAME_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def set_post_tags(posts, Tag, PostTag, batch_size):
+    tag_names = {post.id : parse_tag_names(post.tag) for post in posts}
+    all_names = {name for names in tag_names.values() for name in names}
+
+    tag_ids   = {}
+    if all_names:
+        Tag.objects.bulk_create([Tag(name=name) for name in all_names], ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(name__in=all_names).values_list('name', 'id'))
+
+    # 중간에 멈췄다 다시 실행해도 중복되지 않도록 배치의 기존 연결을 지우고 다시 기록
+    PostTag.objects.filter(post_id__in=list(tag_names)).delete()
+    PostTag.objects.bulk_create([
+        PostTag(
+            post_id     = post.id,
+            tag_id      = tag_ids[name],
+            is_notice   = post.is_notice,
+            group_id    = post.group_id,
+            thread_path = post.thread_path,
+        )
+        for post in posts for name in tag_names[post.id]
+    ], batch_size=batch_size)
+
+
+def forwards(apps, schema_editor):
+    # 기존 글의 tag 문자열을 pk 구간 단위 배치로 옮김 (태그가 없는 글은 건너뜀)
+    # 마이그레이션 전체가 아니라 배치 하나씩 트랜잭션으로 묶어 행 락을 오래 잡지 않음
+    Post       = apps.get_model('boards', 'Post')
+    Tag        = apps.get_model('boards', 'Tag')
+    PostTag    = apps.get_model('boards', 'PostTag')
+    batch_size = 1000
+    last_id    = 0
+    while True:
+        posts = list(Post.objects.filter(id__gt=last_id).exclude(tag=None).exclude(tag='').order_by('id').only(
+            'id', 'tag', 'is_notice', 'group_id', 'thread_path'
+        )[:batch_size])
+        if not posts:
+            return
+        with transaction.atomic():
+            set_post_tags(posts, Tag, PostTag, batch_size)
+        last_id = posts[-1].id
+
+
+class Migration(migrations.Migration):
+    # MySQL 은 RunPython 하나를 통째로 트랜잭션으로 감싸므로 atomic=False 로 배치마다 커밋
+    atomic = False
+
+    dependencies = [
+        ('boards', '0010_tag'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop, atomic=False),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0011_backfill_post_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=8, unique=True)),
+                ('expired_before', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'trending_windows',
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=8)),
+                ('count', models.IntegerField(default=0)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.tag')),
+            ],
+            options={
+                'db_table': 'trending_tags',
+            },
+        ),
+        migrations.CreateModel(
+            name='TagCountBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.tag')),
+            ],
+            options={
+                'db_table': 'tag_count_buckets',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingtag',
+            index=models.Index(fields=['window', '-count', 'tag'], name='trending_tags_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendingtag',
+            constraint=models.UniqueConstraint(fields=('window', 'tag'), name='trending_tags_window_tag_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='tagcountbucket',
+            index=models.Index(fields=['bucket_start', 'tag'], name='tag_count_buckets_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagcountbucket',
+            constraint=models.UniqueConstraint(fields=('tag', 'bucket_start'), name='tag_count_buckets_tag_bucket_uniq'),
+        ),
+    ]
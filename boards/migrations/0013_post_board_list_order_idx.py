@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0012_trending_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['board_category', '-is_notice', '-group_id', 'thread_path', 'id'], name='posts_board_list_order_idx'),
+        ),
+    ]
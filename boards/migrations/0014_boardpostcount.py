@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0013_post_board_list_order_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardPostCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(null=True)),
+                ('board_category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='boards.boardcategory')),
+            ],
+            options={
+                'db_table': 'board_post_counts',
+            },
+        ),
+    ]
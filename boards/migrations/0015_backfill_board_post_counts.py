@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import F, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def forwards(apps, schema_editor):
+    # boards.counts.reconcile_post_counts 를 그대로 옮겨둔 것 (이후 코드가 바뀌어도 이 마이그레이션은 그대로 동작하도록)
+    # 게시판마다 잠그지 않고 저장된 값과 실제 글 수를 한 쿼리(한 스냅샷)로 읽고, 차이만 짧은 UPDATE 로 더함
+    Post           = apps.get_model('boards', 'Post')
+    BoardCategory  = apps.get_model('boards', 'BoardCategory')
+    BoardPostCount = apps.get_model('boards', 'BoardPostCount')
+    for board_category_id in BoardCategory.objects.order_by('id').values_list('id', flat=True):
+        BoardPostCount.objects.get_or_create(board_category_id=board_category_id)
+        actual_count   = Post.objects.filter(
+            board_category_id = OuterRef('board_category_id'),
+        ).order_by().values('board_category_id').annotate(count=Count('id')).values('count')
+        stored, actual = BoardPostCount.objects.filter(board_category_id=board_category_id).annotate(
+            actual = Coalesce(Subquery(actual_count), Value(0)),
+        ).values_list('count', 'actual').get()
+
+        BoardPostCount.objects.filter(board_category_id=board_category_id).update(
+            count         = F('count') + (actual - stored),
+            reconciled_at = timezone.now(),
+        )
+
+
+class Migration(migrations.Migration):
+    # MySQL 은 RunPython 하나를 통째로 트랜잭션으로 감싸므로 atomic=False 로 게시판마다 커밋
+    atomic = False
+
+    dependencies = [
+        ('boards', '0014_boardpostcount'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop, atomic=False),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0015_backfill_board_post_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fileupload',
+            index=models.Index(fields=['path'], name='file_uploads_path_idx'),
+        ),
+    ]
@@ -1,4 +1,8 @@
 from django.db             import models
+from django.utils          import timezone
+
+# 목록 최상단에 고정되는 공지 글의 post_category id
+NOTICE_POST_CATEGORY_ID = 3
 
 # Create your models here.
 class BoardCategory(models.Model):
@@ -23,18 +27,158 @@ class Post(models.Model):
     ip_address     = models.GenericIPAddressField(default='192.168.0.1')
     password       = models.CharField(max_length=200)
     group_id       = models.BigIntegerField(null=True)
-    group_order    = models.IntegerField(default=0)
+    thread_path    = models.CharField(max_length=255, default='')
     group_depth    = models.IntegerField(default=0)
+    # thread_path 로 대체되어 더 이상 읽지 않음, 배포 중 이전 버전 서버가 쓰고 있으므로 다음 배포에서 컬럼을 지움
+    # (그 서버들이 쓴 답글의 경로는 배포 뒤 repair_thread_paths 명령이 이 값으로 부모를 찾아 채움)
+    group_order    = models.IntegerField(default=0)
     tag            = models.CharField(max_length=200, null=True)
+    tags           = models.ManyToManyField('Tag', through='PostTag', related_name='posts')
+    is_notice      = models.BooleanField(default=False)
     created_at     = models.DateTimeField(auto_now_add=True)
     updated_at     = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'posts'
+        indexes  = [
+            # 목록 정렬(공지 우선, 최신 글 묶음 우선, 묶음 내 순서)을 그대로 읽을 수 있는 인덱스
+            models.Index(fields=['-is_notice', '-group_id', 'thread_path', 'id'], name='posts_list_order_idx'),
+            # 게시판별 목록(?board_category_id=)용, 게시판을 앞에 둬 한 게시판의 정렬 구간만 읽음
+            models.Index(fields=['board_category', '-is_notice', '-group_id', 'thread_path', 'id'], name='posts_board_list_order_idx'),
+            # 답글 작성 시 부모 바로 다음 행 탐색, 묶음 전체 조회에 사용
+            models.Index(fields=['group_id', 'thread_path'], name='posts_thread_path_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # id 없이 저장하는 글(objects.create 등)도 auto increment 대신 post_id_sequences 에서 id 를 받음
+        # (시퀀스로 미리 예약해둔 id 를 auto increment 가 먼저 써버려 충돌하지 않도록)
+        # 시퀀스 행 락은 바깥 트랜잭션이 끝날 때까지 유지되므로 요청 경로에서는 트랜잭션 밖에서 reserve_post_ids 로 받아둠
+        if self.pk is None:
+            from .posts import reserve_post_ids
+            self.id = reserve_post_ids(1)[0]
+        # 정렬용 공지 플래그는 post_category로부터 항상 다시 계산
+        self.is_notice = self.post_category_id == NOTICE_POST_CATEGORY_ID
+        update_fields  = kwargs.get('update_fields')
+        if update_fields is not None and {'post_category', 'post_category_id'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'is_notice'}
+        super().save(*args, **kwargs)
 
 class FileUpload(models.Model):
     post          = models.ForeignKey('Post', on_delete=models.CASCADE)
     path          = models.FileField(max_length=200, null=True)
     
     class Meta:
-        db_table = 'file_uploads'
\ No newline at end of file
+        db_table = 'file_uploads'
+        indexes  = [
+            # drain_file_outbox 가 지우려는 객체를 아직 쓰는 첨부 파일이 있는지 확인할 때 사용
+            models.Index(fields=['path'], name='file_uploads_path_idx'),
+        ]
+
+class FileDeleteOutbox(models.Model):
+    # 글 변경과 같은 트랜잭션에 기록해두고 drain_file_outbox 명령이 나중에 S3에서 지우는 객체 key
+    key           = models.CharField(max_length=200)
+    attempts      = models.IntegerField(default=0)
+    last_error    = models.CharField(max_length=200, null=True)
+    available_at  = models.DateTimeField(default=timezone.now)
+    created_at    = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'file_delete_outbox'
+        indexes  = [
+            models.Index(fields=['available_at', 'id'], name='file_delete_outbox_due_idx'),
+        ]
+class PostIdSequence(models.Model):
+    # 글 id 를 INSERT 전에 미리 받아오기 위한 시퀀스 (group_id = id 를 INSERT 한 번으로 기록하기 위함)
+    name          = models.CharField(max_length=45, unique=True)
+    last_id       = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'post_id_sequences'
+
+class PostToken(models.Model):
+    # 검색용 역색인 : 제목/본문을 2글자 단위(ngram)로 자른 토큰마다 글과 가중치(제목 등장 횟수 x3 + 본문 등장 횟수)를 기록
+    token         = models.CharField(max_length=10)
+    post          = models.ForeignKey('Post', on_delete=models.CASCADE)
+    weight        = models.IntegerField()
+
+    class Meta:
+        db_table = 'post_tokens'
+        indexes  = [
+            # 토큰으로 찾아서 글별 가중치 합을 테이블을 거치지 않고 인덱스만으로 계산
+            models.Index(fields=['token', 'post', 'weight'], name='post_tokens_lookup_idx'),
+        ]
+
+class Tag(models.Model):
+    # 글 작성 시 받은 tag_names 를 쉼표로 나눈 태그 (공백 제거, 소문자)
+    name          = models.CharField(max_length=45, unique=True)
+
+    class Meta:
+        db_table = 'tags'
+
+class PostTag(models.Model):
+    # 글-태그 연결, 태그별 목록을 posts 를 정렬하지 않고 이 테이블의 인덱스 순서대로 읽도록 목록 정렬 키를 같이 저장
+    # (is_notice 는 post_category 로, group_id/thread_path 는 작성 시 정해지고 바뀌지 않음)
+    post          = models.ForeignKey('Post', on_delete=models.CASCADE)
+    tag           = models.ForeignKey('Tag', on_delete=models.CASCADE)
+    is_notice     = models.BooleanField(default=False)
+    group_id      = models.BigIntegerField(null=True)
+    thread_path   = models.CharField(max_length=255, default='')
+
+    class Meta:
+        db_table    = 'post_tags'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='post_tags_post_tag_uniq'),
+        ]
+        indexes     = [
+            # ?tag= 목록 : 태그 하나의 글을 목록 정렬(공지 우선, 최신 묶음 우선, 묶음 내 순서) 그대로 읽음
+            models.Index(fields=['tag', '-is_notice', '-group_id', 'thread_path', 'post'], name='post_tags_list_order_idx'),
+        ]
+
+class TagCountBucket(models.Model):
+    # 태그별, 시간(1시간) 구간별로 그 구간에 작성된 글 수 (trending 집계의 원본)
+    tag           = models.ForeignKey('Tag', on_delete=models.CASCADE)
+    bucket_start  = models.DateTimeField()
+    count         = models.IntegerField(default=0)
+
+    class Meta:
+        db_table    = 'tag_count_buckets'
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'bucket_start'], name='tag_count_buckets_tag_bucket_uniq'),
+        ]
+        indexes     = [
+            # 집계 구간에서 빠지는 시간 구간의 합을 구할 때 사용
+            models.Index(fields=['bucket_start', 'tag'], name='tag_count_buckets_bucket_idx'),
+        ]
+
+class TrendingTag(models.Model):
+    # 집계 구간(24h, 7d)별 태그 글 수 합계, 상위 N개를 (window, -count) 인덱스에서 바로 읽음
+    window        = models.CharField(max_length=8)
+    tag           = models.ForeignKey('Tag', on_delete=models.CASCADE)
+    count         = models.IntegerField(default=0)
+
+    class Meta:
+        db_table    = 'trending_tags'
+        constraints = [
+            models.UniqueConstraint(fields=['window', 'tag'], name='trending_tags_window_tag_uniq'),
+        ]
+        indexes     = [
+            models.Index(fields=['window', '-count', 'tag'], name='trending_tags_top_idx'),
+        ]
+
+class TrendingWindow(models.Model):
+    # 집계 구간별로 합계에서 이미 빼낸 시간 구간의 경계 (bucket_start 가 expired_before 보다 이른 구간은 합계에 없음)
+    name           = models.CharField(max_length=8, unique=True)
+    expired_before = models.DateTimeField()
+
+    class Meta:
+        db_table = 'trending_windows'
+
+class BoardPostCount(models.Model):
+    # 게시판별 글 수 : 목록의 전체 글 수/페이지 수를 COUNT(*) 없이 보여주기 위해 글 작성/답글/삭제 트랜잭션에서 함께 갱신
+    # 어긋난 값은 reconcile_post_counts 명령이 주기적으로 맞춤
+    board_category = models.OneToOneField('BoardCategory', on_delete=models.CASCADE)
+    count          = models.BigIntegerField(default=0)
+    reconciled_at  = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'board_post_counts'
@@ -1,6 +1,40 @@
+import os
+import time
+import logging
+import json
+import base64
+import random
+import re
+import uuid
+import threading
+import functools
+from collections        import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from boto3.s3.transfer               import TransferConfig
+from botocore.config                 import Config
+from django.conf                     import settings
+from django.core.files.uploadedfile  import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db                       import transaction, OperationalError, IntegrityError
+from django.db.models                import F
+
 import my_settings
 
+logger = logging.getLogger(__name__)
+
+MB     = 1024 * 1024
+
+class InvalidCursorError(Exception):
+    pass
+
+class FileUploadError(Exception):
+    pass
+
+class UploadedFileNotFoundError(FileUploadError):
+    pass
+
 def get_client_ip(self, request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
@@ -10,10 +44,387 @@ def get_client_ip(self, request):
     return ip
 
 
+# S3 클라이언트는 프로세스 전체에서 하나를 만들어 재사용 (boto3 client 는 스레드 안전)
+# 세션 생성, 엔드포인트 조회, TLS 연결 풀 생성 비용을 요청마다 치르지 않도록 함
+_s3_client      = None
+_s3_client_lock = threading.Lock()
+
 def create_s3_client():
-    s3_client = boto3.client(
-        's3',                                                 # 사용할 서비스 이름
-        aws_access_key_id = my_settings.ACESSS_KEY_ID,        # 액세스 ID
-        aws_secret_access_key = my_settings.SECRET_ACCESS_KEY # 비밀 멕세스 키
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = boto3.session.Session().client(
+                    's3',                                                 # 사용할 서비스 이름
+                    aws_access_key_id = my_settings.ACESSS_KEY_ID,        # 액세스 ID
+                    aws_secret_access_key = my_settings.SECRET_ACCESS_KEY,# 비밀 멕세스 키
+                    config = Config(
+                        max_pool_connections = getattr(settings, 'S3_MAX_POOL_CONNECTIONS', 10),
+                        retries              = {
+                            'max_attempts' : getattr(settings, 'S3_RETRY_MAX_ATTEMPTS', 3),
+                            'mode'         : getattr(settings, 'S3_RETRY_MODE', 'standard'),
+                        }
+                    )
+                )
+    return _s3_client
+
+def reset_s3_client():
+    # fork 된 자식 프로세스는 부모의 연결 풀/락을 물려받으면 안 되므로 새로 만들게 함
+    global _s3_client, _s3_client_lock
+    _s3_client      = None
+    _s3_client_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_s3_client)
+
+
+def file_key(file_name):
+    return 'board_file/' + file_name
+
+def file_url(file_name):
+    bucket_name   = my_settings.BUCKET_NAME                   # AWS s3 버킷 이름
+    aws_region    = my_settings.AWS_REGION                    # AWS s3 리전 
+    file_endpoint = file_name.replace(" ", "")
+    return f'https://{bucket_name}.s3.{aws_region}.amazonaws.com/board_file/{file_endpoint}'
+
+# presigned URL 로 올리는 파일의 key : board_file/<사용자 id>/<무작위 32자리>/<파일 이름>
+# 사용자마다 경로를 나누고 무작위 구간을 붙이므로 다른 사람(다른 글)의 같은 이름 파일을 덮어쓸 수 없고,
+# 자기 경로 밖의 key 는 그 사용자에게 발급된 적이 없으므로 uploaded_files 에서 거절함
+UPLOAD_TOKEN_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+def upload_key(user_id, file_name):
+    return file_key(f'{user_id}/{uuid.uuid4().hex}/{file_name}')
+
+def key_url(key):
+    return f'https://{my_settings.BUCKET_NAME}.s3.{my_settings.AWS_REGION}.amazonaws.com/{key}'
+
+def s3_transfer_config():
+    # 큰 파일은 멀티파트로 나눠 여러 스레드에서 동시에 올림
+    return TransferConfig(
+        multipart_threshold = getattr(settings, 'S3_MULTIPART_THRESHOLD', 8 * MB),
+        multipart_chunksize = getattr(settings, 'S3_MULTIPART_CHUNKSIZE', 8 * MB),
+        max_concurrency     = getattr(settings, 'S3_MULTIPART_MAX_CONCURRENCY', 4)
     )
-    return s3_client
\ No newline at end of file
+
+def upload_files(files, s3_client=None, max_workers=None):
+    # 첨부 파일들을 스레드 풀에서 동시에 올리고 입력 순서대로 URL을 돌려줌
+    # 하나라도 실패하면 이미 올라간 객체를 지우고 FileUploadError 를 던짐
+    s3_client   = s3_client or create_s3_client()
+    bucket_name = my_settings.BUCKET_NAME
+    max_workers = max_workers or getattr(settings, 'S3_UPLOAD_MAX_WORKERS', 4)
+
+    def upload(file):
+        # 스트리밍 업로드 핸들러가 요청을 받는 동안 이미 S3에 올린 파일은 건너뜀
+        if isinstance(file, S3UploadedFile):
+            return file.key
+
+        s3_client.upload_fileobj(
+            file,
+            bucket_name,
+            file_key(file.name),
+            ExtraArgs={
+                "ContentType": file.content_type
+            },
+            Config=s3_transfer_config()
+        )
+        return file_key(file.name)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as executor:
+        futures = [executor.submit(upload, file) for file in files]
+
+    uploaded_keys = []
+    errors        = []
+    for future in futures:
+        try:
+            uploaded_keys.append(future.result())
+        except Exception as e:
+            errors.append(e)
+
+    if errors:
+        delete_files(uploaded_keys, s3_client)
+        raise FileUploadError(errors[0]) from errors[0]
+
+    return [key_url(file.key) if isinstance(file, S3UploadedFile) else file_url(file.name) for file in files]
+
+class S3UploadedFile(UploadedFile):
+    # S3StreamingUploadHandler 가 요청 본문을 읽으면서 이미 S3에 올린 파일 (내용은 들고 있지 않음)
+    def __init__(self, key, name, content_type, size, charset=None, content_type_extra=None):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.key = key
+
+class S3StreamingUploadHandler(FileUploadHandler):
+    # 업로드 본문을 임시 파일/메모리에 모으지 않고 파트 크기만큼 찰 때마다 S3 멀티파트 업로드로 바로 넘김
+    # 동시에 올리는 파트 수를 제한하므로 파일 크기와 관계없이 메모리는 (동시 파트 수 + 1) * 파트 크기 안에서 유지됨
+    # 본문을 읽는 시점은 글 비밀번호/원글 확인 전이므로 key 는 요청한 사용자 경로 아래 새 key 로 만들어 다른 객체를 덮어쓰지 않고,
+    # 요청이 성공하지 못하면 discard_streamed_files 가 uploaded_keys 를 지움
+    def __init__(self, request=None, s3_client=None):
+        super().__init__(request)
+        self.s3_client       = s3_client or create_s3_client()
+        self.bucket_name     = my_settings.BUCKET_NAME
+        self.part_size       = max(5 * MB, getattr(settings, 'S3_MULTIPART_CHUNKSIZE', 8 * MB))
+        self.max_concurrency = getattr(settings, 'S3_MULTIPART_MAX_CONCURRENCY', 4)
+        self.upload_id       = None
+        self.user_id         = getattr(getattr(request, 'user', None), 'id', None) or 'anonymous'
+        self.uploaded_keys   = []
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.key         = upload_key(self.user_id, self.file_name.replace(" ", ""))
+        self.buffer      = bytearray()
+        self.parts       = []
+        self.in_flight   = deque()
+        self.executor    = None
+        self.upload_id   = None
+
+    def _upload_part(self, body):
+        if self.upload_id is None:
+            self.upload_id = self.s3_client.create_multipart_upload(
+                Bucket      = self.bucket_name,
+                Key         = self.key,
+                ContentType = self.content_type
+            )['UploadId']
+            self.executor  = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+        # 올리는 중인 파트가 가득 차면 가장 오래된 파트가 끝날 때까지 요청 본문 읽기를 멈춤
+        if len(self.in_flight) >= self.max_concurrency:
+            self.parts.append(self.in_flight.popleft().result())
+
+        part_number = len(self.parts) + len(self.in_flight) + 1
+        self.in_flight.append(self.executor.submit(self._send_part, part_number, body))
+
+    def _send_part(self, part_number, body):
+        response = self.s3_client.upload_part(
+            Bucket     = self.bucket_name,
+            Key        = self.key,
+            UploadId   = self.upload_id,
+            PartNumber = part_number,
+            Body       = body
+        )
+        return {'PartNumber' : part_number, 'ETag' : response['ETag']}
+
+    def receive_data_chunk(self, raw_data, start):
+        try:
+            self.buffer += raw_data
+            while len(self.buffer) >= self.part_size:
+                self._upload_part(bytes(self.buffer[:self.part_size]))
+                del self.buffer[:self.part_size]
+        except Exception as e:
+            self.upload_interrupted()
+            raise FileUploadError(e) from e
+        return None
+
+    def file_complete(self, file_size):
+        try:
+            if self.upload_id is None:
+                # 파트 하나보다 작은 파일은 멀티파트 없이 한 번에 올림
+                self.s3_client.put_object(
+                    Bucket      = self.bucket_name,
+                    Key         = self.key,
+                    Body        = bytes(self.buffer),
+                    ContentType = self.content_type
+                )
+            else:
+                if self.buffer:
+                    self._upload_part(bytes(self.buffer))
+                while self.in_flight:
+                    self.parts.append(self.in_flight.popleft().result())
+                self.executor.shutdown()
+
+                self.s3_client.complete_multipart_upload(
+                    Bucket          = self.bucket_name,
+                    Key             = self.key,
+                    UploadId        = self.upload_id,
+                    MultipartUpload = {'Parts' : sorted(self.parts, key=lambda part: part['PartNumber'])}
+                )
+        except Exception as e:
+            self.upload_interrupted()
+            raise FileUploadError(e) from e
+
+        self.buffer = bytearray()
+        self.uploaded_keys.append(self.key)
+        return S3UploadedFile(self.key, self.file_name, self.content_type, file_size, self.charset, self.content_type_extra)
+
+    def upload_interrupted(self):
+        if self.upload_id is None:
+            return
+        for future in self.in_flight:
+            future.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id)
+        self.upload_id = None
+
+def use_streaming_upload(request, client_factory=None):
+    # ?upload_mode=stream 요청은 첨부 파일을 받는 즉시 S3로 흘려보냄 (request.POST/FILES 를 읽기 전에 호출해야 함)
+    if request.GET.get('upload_mode') == 'stream':
+        request.upload_handlers = [S3StreamingUploadHandler(request, (client_factory or create_s3_client)())]
+
+def discard_streamed_files(request):
+    # 본문을 읽으며 이미 S3에 올린 파일을 지움 (폼 파싱 도중 실패해 request.FILES 가 없는 경우도 포함)
+    for handler in getattr(request, '_upload_handlers', []):
+        if isinstance(handler, S3StreamingUploadHandler) and handler.uploaded_keys:
+            delete_files(handler.uploaded_keys, handler.s3_client)
+            handler.uploaded_keys = []
+
+def discard_streamed_files_on_error(func):
+    # 응답이 성공(2xx)이 아니거나 예외가 나면 스트리밍으로 올린 파일을 지움 (login_required 안쪽에 붙임)
+    @functools.wraps(func)
+    def decorator(self, request, *args, **kwargs):
+        try:
+            response = func(self, request, *args, **kwargs)
+        except Exception:
+            discard_streamed_files(request)
+            raise
+        if response.status_code >= 300:
+            discard_streamed_files(request)
+        return response
+    return decorator
+
+def file_key_from_url(path):
+    return str(path).split('amazonaws.com/')[-1]
+
+# delete_objects 한 번에 지울 수 있는 최대 key 개수
+DELETE_BATCH_SIZE = 1000
+
+def delete_files(keys, s3_client=None):
+    # 객체를 delete_objects 로 1000개씩 묶어서 지우고, 지우지 못한 key 별 실패 내역을 돌려줌
+    # 반환: [{'key': key, 'code': 오류 코드, 'message': 오류 메시지}]
+    s3_client   = s3_client or create_s3_client()
+    bucket_name = my_settings.BUCKET_NAME
+    keys        = list(dict.fromkeys(keys))
+
+    failures    = []
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start:start+DELETE_BATCH_SIZE]
+        try:
+            response = s3_client.delete_objects(
+                Bucket = bucket_name,
+                Delete = {
+                    'Objects' : [{'Key' : key} for key in batch],
+                    'Quiet'   : True
+                }
+            )
+        except Exception as e:
+            failures += [{'key' : key, 'code' : type(e).__name__, 'message' : str(e)} for key in batch]
+            continue
+
+        failures += [{
+            'key'     : error['Key'],
+            'code'    : error.get('Code'),
+            'message' : error.get('Message')
+        } for error in response.get('Errors', [])]
+
+    if failures:
+        logger.warning('S3 delete failed for %d of %d keys: %s', len(failures), len(keys), failures[:10])
+    return failures
+
+def create_upload_urls(files, user_id, s3_client=None):
+    # 브라우저가 Django 워커를 거치지 않고 S3로 바로 올릴 수 있도록 presigned PUT URL 발급
+    # files: [{'name': 파일 이름, 'content_type': MIME 타입}], key 는 요청한 사용자의 경로 아래에 새로 만듦
+    s3_client   = s3_client or create_s3_client()
+    bucket_name = my_settings.BUCKET_NAME
+    expires_in  = getattr(settings, 'S3_PRESIGNED_EXPIRES', 600)
+
+    upload_urls = []
+    for file in files:
+        name = os.path.basename(file['name']).replace(" ", "")
+        if not name:
+            raise FileUploadError(file['name'])
+
+        key  = upload_key(user_id, name)
+        upload_urls.append({
+            'name'       : file['name'],
+            'key'        : key,
+            'upload_url' : s3_client.generate_presigned_url(
+                'put_object',
+                Params     = {
+                    'Bucket'      : bucket_name,
+                    'Key'         : key,
+                    'ContentType' : file['content_type']
+                },
+                ExpiresIn  = expires_in
+            ),
+            'file_url'   : key_url(key)
+        })
+    return upload_urls
+
+def verify_uploaded_files(keys, user_id, s3_client=None, max_workers=None):
+    # user_id 에게 발급된 key(그 사용자 경로 아래)만 받고, 실제로 올라왔는지 확인해 입력 순서대로 URL을 돌려줌
+    s3_client   = s3_client or create_s3_client()
+    bucket_name = my_settings.BUCKET_NAME
+    max_workers = max_workers or getattr(settings, 'S3_UPLOAD_MAX_WORKERS', 4)
+    user_prefix = file_key(f'{user_id}/')
+
+    for key in keys:
+        if not isinstance(key, str) or not key.startswith(user_prefix):
+            raise UploadedFileNotFoundError(key)
+        token, _, name = key[len(user_prefix):].partition('/')
+        if not UPLOAD_TOKEN_PATTERN.match(token) or not name or '/' in name:
+            raise UploadedFileNotFoundError(key)
+
+    def verify(key):
+        s3_client.head_object(Bucket=bucket_name, Key=key)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as executor:
+        futures = [executor.submit(verify, key) for key in keys]
+
+    for key, future in zip(keys, futures):
+        if future.exception() is not None:
+            raise UploadedFileNotFoundError(key) from future.exception()
+
+    return [key_url(key) for key in keys]
+
+
+# 목록 커서: 정렬 키 값을 JSON으로 직렬화한 뒤 URL-safe base64로 감싼 불투명 문자열
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode('UTF-8')
+    return base64.urlsafe_b64encode(raw).decode('UTF-8').rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values  = json.loads(base64.urlsafe_b64decode(cursor + padding).decode('UTF-8'))
+    except (ValueError, TypeError):
+        raise InvalidCursorError(cursor)
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursorError(cursor)
+
+    for value, value_type in zip(values, types):
+        if type(value) is not value_type:
+            raise InvalidCursorError(cursor)
+    return values
+
+
+# 데드락/락 대기 시간 초과로 실패한 트랜잭션은 정해진 횟수까지 처음부터 다시 실행
+RETRYABLE_MYSQL_ERRORS = (1205, 1213)   # lock wait timeout, deadlock
+
+def is_retryable_db_error(error):
+    if error.args and error.args[0] in RETRYABLE_MYSQL_ERRORS:
+        return True
+    return 'database is locked' in str(error) or 'database table is locked' in str(error)
+
+def atomic_with_retry(func, max_attempts=3, backoff=0.05):
+    # 바깥 트랜잭션 안에서 불린 경우 데드락이 바깥 트랜잭션 전체를 되돌리므로 여기서 재시도하지 않음
+    if transaction.get_connection().in_atomic_block:
+        max_attempts = 1
+
+    for attempt in range(1, max_attempts+1):
+        try:
+            with transaction.atomic():
+                return func()
+        except OperationalError as e:
+            if attempt == max_attempts or not is_retryable_db_error(e):
+                raise
+            time.sleep(backoff * attempt * (1 + random.random()))
+
+def add_count(model, lookup, delta):
+    # 집계 행이 있으면 count 에 더하고 없으면 만듦 (동시에 만들면 unique 제약에 걸린 쪽이 다시 더함)
+    if model.objects.filter(**lookup).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(count=F('count') + delta)
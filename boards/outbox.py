@@ -0,0 +1,54 @@
+from datetime             import timedelta
+
+from django.conf          import settings
+from django.db            import transaction
+from django.db.models     import F
+from django.utils         import timezone
+
+from .models              import FileDeleteOutbox, FileUpload
+from .modules             import delete_files, key_url, file_key_from_url
+
+def enqueue_file_deletes(keys):
+    # 호출한 쪽의 transaction.atomic() 안에서 불려야 글 변경과 함께 커밋/롤백됨
+    FileDeleteOutbox.objects.bulk_create([FileDeleteOutbox(key=key) for key in dict.fromkeys(keys)])
+
+def drain_file_outbox(batch_size=500, max_attempts=None, lease_seconds=60, s3_client=None):
+    # 1. 처리할 행을 잠그고 lease 시간만큼 미뤄둔 뒤 바로 커밋 (S3 호출 동안 DB 락을 잡고 있지 않음)
+    # 2. delete_objects 로 묶어서 삭제
+    # 3. 성공한 행은 지우고, 실패한 행은 시도 횟수에 비례해 다음 시도 시각을 미룸
+    # max_attempts 를 넘긴 행은 남겨두고 더 이상 가져가지 않음
+    # 다른 첨부 파일 행이 아직 같은 key 를 쓰고 있으면 S3 객체는 지우지 않고 outbox 행만 지움
+    max_attempts = max_attempts or getattr(settings, 'FILE_DELETE_MAX_ATTEMPTS', 5)
+    now          = timezone.now()
+
+    with transaction.atomic():
+        rows = list(FileDeleteOutbox.objects.select_for_update(skip_locked=True).filter(
+            available_at__lte=now, attempts__lt=max_attempts
+        ).order_by('available_at', 'id')[:batch_size])
+        if not rows:
+            return 0, 0
+
+        FileDeleteOutbox.objects.filter(id__in=[row.id for row in rows]).update(
+            attempts     = F('attempts')+1,
+            available_at = now + timedelta(seconds=lease_seconds)
+        )
+
+    keys       = [row.key for row in rows]
+    in_use     = {
+        file_key_from_url(path)
+        for path in FileUpload.objects.filter(path__in=[key_url(key) for key in keys]).values_list('path', flat=True)
+    }
+    unused     = [key for key in keys if key not in in_use]
+    failures   = {failure['key'] : failure for failure in delete_files(unused, s3_client)} if unused else {}
+    failed_ids = []
+    for row in rows:
+        if row.key not in failures:
+            continue
+        failed_ids.append(row.id)
+        FileDeleteOutbox.objects.filter(id=row.id).update(
+            last_error   = f"{failures[row.key]['code']} {failures[row.key]['message']}"[:200],
+            available_at = timezone.now() + timedelta(seconds=30 * (row.attempts + 1))
+        )
+
+    FileDeleteOutbox.objects.filter(id__in=[row.id for row in rows if row.id not in failed_ids]).delete()
+    return len(rows) - len(failed_ids), len(failed_ids)
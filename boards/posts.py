@@ -0,0 +1,125 @@
+# 새 글(답글이 아닌 원글) INSERT 경로
+# 원글은 group_id 가 자기 id 이므로 예전에는 INSERT 후 id 를 받아 다시 UPDATE 했음
+# post_id_sequences 에서 id 를 먼저 받아두면 id/group_id 를 채운 채로 INSERT 한 번에 기록할 수 있고,
+# 여러 글을 bulk_create 로 한꺼번에 넣을 수도 있음 (첨부 파일 행도 bulk_create 한 번)
+# 글 수정/삭제 트랜잭션도 여기에 둠 (async 뷰는 동기 뷰를 상속해 같은 함수를 씀)
+# 기존 글의 공지 플래그(is_notice) 백필도 is_notice 를 계산하는 write_posts 와 함께 여기에 둠
+import time
+
+from django.db                  import transaction
+from django.db.models           import F, Value, Subquery, Min, Max
+from django.db.models.functions import Coalesce, Greatest
+
+from .models                    import Post, FileUpload, PostIdSequence, NOTICE_POST_CATEGORY_ID
+from .modules                   import file_key_from_url
+from .outbox                    import enqueue_file_deletes
+from .search                    import index_posts
+from .tags                      import set_post_tags
+from .trending                  import record_tag_changes, removed_tag_changes
+from .counts                    import record_post_counts
+
+POST_SEQUENCE_NAME = 'posts'
+
+def reserve_post_ids(count):
+    # count 개의 연속된 글 id 를 예약해 range 로 반환
+    # 시퀀스 값이 posts 의 최대 id 보다 뒤처져 있으면(시퀀스를 거치지 않은 INSERT) 최대 id 다음부터 예약함
+    # 롤백된 요청이 예약한 id 는 auto increment 와 마찬가지로 비어 있는 채로 남음
+    # 시퀀스 행 락을 짧게 잡도록 가능하면 바깥 transaction.atomic() 밖에서 호출
+    # 시퀀스로 받은 id 와 auto increment id 가 겹치지 않도록 글을 INSERT 하는 모든 경로가 이 함수를 거쳐야 함
+    # (Post.save() 는 id 가 없으면 여기서 받으므로 id 없이 bulk_create 하는 경우만 직접 챙기면 됨)
+    if count <= 0:
+        return range(0)
+
+    max_post_id = Coalesce(Subquery(Post.objects.order_by('-id').values('id')[:1]), Value(0))
+    with transaction.atomic():
+        updated = PostIdSequence.objects.filter(name=POST_SEQUENCE_NAME).update(
+            last_id = Greatest(F('last_id'), max_post_id) + count
+        )
+        if not updated:
+            # 처음 사용할 때 시퀀스 행 생성 (동시에 만들어도 unique 제약으로 한 행만 남음)
+            PostIdSequence.objects.get_or_create(name=POST_SEQUENCE_NAME)
+            PostIdSequence.objects.filter(name=POST_SEQUENCE_NAME).update(
+                last_id = Greatest(F('last_id'), max_post_id) + count
+            )
+        last_id = PostIdSequence.objects.get(name=POST_SEQUENCE_NAME).last_id
+
+    return range(last_id - count + 1, last_id + 1)
+
+def insert_posts(entries, batch_size=500):
+    # entries : (저장 전 Post, 첨부 파일 URL 목록) 의 리스트
+    # 원글 id 를 예약해 group_id 까지 채운 뒤 write_posts 로 한꺼번에 기록
+    entries      = list(entries)
+    post_ids     = reserve_post_ids(len(entries))
+
+    posts        = []
+    file_uploads = []
+    for post_id, (post, file_urls) in zip(post_ids, entries):
+        post.id          = post_id
+        post.group_id    = post_id
+        post.thread_path = ''
+        post.group_depth = 0
+        posts.append(post)
+        file_uploads    += [FileUpload(post_id=post_id, path=file_url) for file_url in file_urls]
+
+    return write_posts(posts, file_uploads, batch_size)
+
+def write_posts(posts, file_uploads, batch_size=500, search_index=True):
+    # id/group_id/thread_path 까지 정해진 글(답글 포함)들을 posts / file_uploads 에 각각 bulk_create 하고
+    # 검색 색인, 태그, 인기 태그/게시판 글 수 집계를 같은 트랜잭션에서 갱신
+    # search_index=False 는 대량 생성 후 rebuild_search_index 로 색인을 따로 만들 때만 씀
+    # bulk_create 는 Post.save() 를 거치지 않으므로 is_notice 도 여기서 계산함
+    for post in posts:
+        post.is_notice = post.post_category_id == NOTICE_POST_CATEGORY_ID
+
+    with transaction.atomic():
+        Post.objects.bulk_create(posts, batch_size=batch_size)
+        FileUpload.objects.bulk_create(file_uploads, batch_size=batch_size)
+        if search_index:
+            index_posts(posts, batch_size=batch_size)
+        record_tag_changes(set_post_tags(posts, batch_size=batch_size))
+        record_post_counts(post.board_category_id for post in posts)
+    return posts
+
+def update_post(post, file_urls, **fields):
+    # 기존 첨부 파일은 outbox 에 기록만 하고 drain_file_outbox 가 나중에 삭제 (같은 이름으로 새로 올린 파일은 제외)
+    with transaction.atomic():
+        fileupload_list = post.fileupload_set.all()
+        new_keys        = {file_key_from_url(file_url) for file_url in file_urls}
+        enqueue_file_deletes([
+            file_key_from_url(obj.path) for obj in fileupload_list if file_key_from_url(obj.path) not in new_keys
+        ])
+        fileupload_list.delete()
+
+        for name, value in fields.items():
+            setattr(post, name, value)
+        post.save()
+        index_posts([post])
+        record_tag_changes(set_post_tags([post]))
+
+        FileUpload.objects.bulk_create([FileUpload(post_id=post.id, path=file_url) for file_url in file_urls])
+
+def delete_post(post):
+    # 첨부 파일은 outbox 에 기록만 하고 drain_file_outbox 가 나중에 삭제 (응답은 S3를 기다리지 않음)
+    with transaction.atomic():
+        enqueue_file_deletes([file_key_from_url(path) for path in post.fileupload_set.values_list('path', flat=True)])
+        record_tag_changes(removed_tag_changes([post.id]))
+        if post.delete()[1].get('boards.Post'):
+            record_post_counts([post.board_category_id], delta=-1)
+
+# 공지 플래그 백필: pk 구간 단위로 나눠 짧은 UPDATE를 반복하므로 운영 중인 큰 테이블에서도 락이 오래 잡히지 않음
+def backfill_notice_flag(post_model, batch_size=1000, pause=0, notice_category_id=NOTICE_POST_CATEGORY_ID):
+    bounds = post_model.objects.aggregate(min_id=Min('id'), max_id=Max('id'))
+    if bounds['min_id'] is None:
+        return 0
+
+    updated  = 0
+    start_id = bounds['min_id']
+    while start_id <= bounds['max_id']:
+        batch    = post_model.objects.filter(id__gte=start_id, id__lt=start_id+batch_size)
+        updated += batch.filter(post_category_id=notice_category_id, is_notice=False).update(is_notice=True)
+        updated += batch.exclude(post_category_id=notice_category_id).filter(is_notice=True).update(is_notice=False)
+        start_id += batch_size
+
+        if pause:
+            time.sleep(pause)
+    return updated
@@ -0,0 +1,60 @@
+# 제목/본문 검색용 역색인 (post_tokens)
+# 한국어는 띄어쓰기 단위로 나누면 조사/어미가 붙어 검색이 안 되므로 MySQL ngram 파서처럼 단어를 2글자씩 겹쳐 자름
+#   '배송문의' -> '배송', '송문', '문의'  (2글자 이하 단어는 그대로 토큰)
+# 검색어의 토큰을 모두 가진 글만 찾고, 토큰 가중치 합(제목 등장 x3 + 본문 등장)이 큰 순으로 정렬
+# 글 작성/수정/답글은 boards.posts, boards.threads 에서 같은 트랜잭션 안에 색인을 갱신하고 삭제는 FK CASCADE 로 지워짐
+import re
+from collections      import Counter
+
+from django.db.models import Sum, Count, Q
+
+from .models          import PostToken
+
+NGRAM_SIZE    = 2
+TITLE_WEIGHT  = 3
+MAX_QUERY_LEN = 100
+WORD_PATTERN  = re.compile(r'\w+')
+
+def tokenize(text):
+    tokens = Counter()
+    for word in WORD_PATTERN.findall((text or '').lower()):
+        if len(word) <= NGRAM_SIZE:
+            tokens[word] += 1
+            continue
+        for start in range(len(word) - NGRAM_SIZE + 1):
+            tokens[word[start:start+NGRAM_SIZE]] += 1
+    return tokens
+
+def query_tokens(query):
+    return sorted(tokenize(query[:MAX_QUERY_LEN]))
+
+def post_tokens(post):
+    weights = Counter()
+    for token, count in tokenize(post.title).items():
+        weights[token] += count * TITLE_WEIGHT
+    for token, count in tokenize(post.content).items():
+        weights[token] += count
+    return weights
+
+def index_posts(posts, batch_size=1000):
+    # 글의 기존 토큰을 지우고 다시 기록 (호출한 쪽의 transaction.atomic() 안에서 불려야 글 변경과 함께 커밋/롤백됨)
+    posts = list(posts)
+    PostToken.objects.filter(post_id__in=[post.id for post in posts]).delete()
+    PostToken.objects.bulk_create([
+        PostToken(token=token, post_id=post.id, weight=weight)
+        for post in posts for token, weight in post_tokens(post).items()
+    ], batch_size=batch_size)
+
+def search_posts(tokens, cursor_values=None, limit=15):
+    # 모든 토큰을 가진 글의 (post_id, score) 를 점수 내림차순, id 내림차순으로 limit 개 반환
+    # cursor_values : 직전 페이지 마지막 글의 (score, post_id)
+    matches = PostToken.objects.filter(token__in=tokens).values('post_id').annotate(
+        score   = Sum('weight'),
+        matched = Count('id'),
+    ).filter(matched=len(tokens))
+
+    if cursor_values:
+        score, post_id = cursor_values
+        matches        = matches.filter(Q(score__lt=score) | Q(score=score, post_id__lt=post_id))
+
+    return [(match['post_id'], match['score']) for match in matches.order_by('-score', '-post_id')[:limit]]
@@ -0,0 +1,63 @@
+# 태그 정규화 : 글의 tag 문자열(tag_names 그대로, 상세 응답에 사용)을 쉼표로 나눠 tags / post_tags 에 기록
+# 태그별 목록(?tag=)은 post_tags 만 읽으므로 LIKE 로 tag 문자열을 훑지 않음
+from .models import Tag, PostTag
+
+def parse_tag_names(tag_string):
+    # 상세 응답과 같은 규칙(공백 제거 후 쉼표로 나눔)으로 자르고, 대소문자 구분 없이 중복 제거
+    names = []
+    for name in (tag_string or '').replace(' ', '').split(','):
+        name = name.lower()[:Tag._meta.get_field('name').max_length]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def set_post_tags(posts, tag_model=Tag, post_tag_model=PostTag, batch_size=1000):
+    # 글들의 태그 연결을 tag 문자열 기준으로 다시 기록 (호출한 쪽의 transaction.atomic() 안에서 불려야 함)
+    # 마이그레이션에서는 과거 모델을 넘겨 씀
+    # 반환값 : 새로 붙거나(+1) 떨어진(-1) 태그의 (tag_id, 글 작성 시각, 증감) 목록 (trending 집계 갱신용)
+    posts     = list(posts)
+    tag_names = {post.id : parse_tag_names(post.tag) for post in posts}
+    all_names = {name for names in tag_names.values() for name in names}
+
+    tag_ids   = {}
+    if all_names:
+        tag_model.objects.bulk_create([tag_model(name=name) for name in all_names], ignore_conflicts=True)
+        tag_ids = dict(tag_model.objects.filter(name__in=all_names).values_list('name', 'id'))
+
+    old_tag_ids = {post.id : set() for post in posts}
+    for post_id, tag_id in post_tag_model.objects.filter(post_id__in=list(tag_names)).values_list('post_id', 'tag_id'):
+        old_tag_ids[post_id].add(tag_id)
+
+    changes   = []
+    for post in posts:
+        new_tag_ids = {tag_ids[name] for name in tag_names[post.id]}
+        changes    += [(tag_id, post.created_at, 1) for tag_id in new_tag_ids - old_tag_ids[post.id]]
+        changes    += [(tag_id, post.created_at, -1) for tag_id in old_tag_ids[post.id] - new_tag_ids]
+
+    post_tag_model.objects.filter(post_id__in=list(tag_names)).delete()
+    post_tag_model.objects.bulk_create([
+        post_tag_model(
+            post_id     = post.id,
+            tag_id      = tag_ids[name],
+            is_notice   = post.is_notice,
+            group_id    = post.group_id,
+            thread_path = post.thread_path,
+        )
+        for post in posts for name in tag_names[post.id]
+    ], batch_size=batch_size)
+    return changes
+
+def backfill_post_tags(post_model, tag_model, post_tag_model, batch_size=1000):
+    # 기존 글의 tag 문자열을 pk 구간 단위 배치로 옮김 (태그가 없는 글은 건너뜀)
+    last_id  = 0
+    migrated = 0
+    while True:
+        posts = list(post_model.objects.filter(id__gt=last_id).exclude(tag=None).exclude(tag='').order_by('id').only(
+            'id', 'tag', 'is_notice', 'group_id', 'thread_path', 'created_at'
+        )[:batch_size])
+        if not posts:
+            return migrated
+
+        set_post_tags(posts, tag_model, post_tag_model, batch_size)
+        migrated += len(posts)
+        last_id   = posts[-1].id
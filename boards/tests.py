@@ -1,19 +1,165 @@
 from os import path
 import unittest
+import threading
+import time
 import bcrypt
 import jwt
 import json
-
-from django.test   import Client, TestCase
-from unittest.mock import MagicMock, patch
-
-from users.models  import User
-from .models       import (
+import io
+import os
+import tempfile
+from datetime           import timedelta
+
+from django.test        import Client, AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.db          import connection, DatabaseError
+from django.test.utils  import CaptureQueriesContext
+from django.db.models   import F
+from django.core.management import call_command
+from django.core.cache  import cache
+from django.utils       import timezone
+from django.core.files.uploadedfile import SimpleUploadedFile
+from unittest.mock      import MagicMock, patch
+from asgiref.sync       import sync_to_async
+
+from board.asgi         import BoardASGIHandler
+from board.async_view   import AsyncStreamingHttpResponse
+from users.models       import User
+from .models            import (
     BoardCategory, Post, PostCategory,
-    FileUpload
+    FileUpload, FileDeleteOutbox, PostToken,
+    Tag, PostTag, TrendingTag, TagCountBucket,
 )    
+from .modules           import (
+    upload_files, FileUploadError, file_key_from_url,
+    create_s3_client, reset_s3_client, delete_files, key_url,
+)
+from .counters          import view_counts
+from .outbox            import drain_file_outbox, enqueue_file_deletes
+from .caches            import cache_stats
+from .posts             import reserve_post_ids, insert_posts, update_post, delete_post, backfill_notice_flag
+from .search            import query_tokens
+from .tags              import backfill_post_tags
+from .counts            import reconcile_post_counts, post_count
+from .trending          import top_tags, rebuild_tag_counts
+from .threads           import (
+    build_thread_paths, insert_reply, decode_segment, repair_thread_paths,
+    SEGMENT_WIDTH, SEGMENT_MAX,
+)
 import my_settings
 
+class FakeS3Client:
+    # 로컬 S3 대역: 올라간 객체를 dict 에 보관하고, 지정한 키는 업로드 실패를 흉내냄
+    def __init__(self, fail_keys=(), latency=0):
+        self.objects   = {}
+        self.fail_keys = set(fail_keys)
+        self.latency   = latency
+        self.lock      = threading.Lock()
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        time.sleep(self.latency)
+        if key in self.fail_keys:
+            raise IOError(key)
+        with self.lock:
+            self.objects[key] = fileobj.read()
+
+    def delete_object(self, Bucket, Key):
+        with self.lock:
+            self.objects.pop(Key, None)
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_calls = getattr(self, 'delete_calls', 0) + 1
+        errors            = []
+        with self.lock:
+            for obj in Delete['Objects']:
+                if obj['Key'] in self.fail_keys:
+                    errors.append({'Key' : obj['Key'], 'Code' : 'AccessDenied', 'Message' : 'Access Denied'})
+                else:
+                    self.objects.pop(obj['Key'], None)
+        return {'Errors' : errors} if errors else {}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        with self.lock:
+            self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        self.parts = {}
+        return {'UploadId' : 'upload-1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self.lock:
+            self.parts[PartNumber] = Body
+        return {'ETag' : f'etag-{PartNumber}'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        with self.lock:
+            self.objects[Key] = b''.join(self.parts[part['PartNumber']] for part in MultipartUpload['Parts'])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.parts = {}
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        return f'https://s3.local/{Params["Bucket"]}/{Params["Key"]}?method={ClientMethod}&expires={ExpiresIn}'
+
+    def head_object(self, Bucket, Key):
+        with self.lock:
+            if Key not in self.objects:
+                raise IOError(Key)
+            return {'ContentLength' : len(self.objects[Key])}
+
+class UploadFilesTest(unittest.TestCase):
+    def test_upload_files_keeps_input_order(self):
+        s3_client = FakeS3Client(latency=0.05)
+        files     = [SimpleUploadedFile(f'file {i}.txt', b'data', content_type='text/plain') for i in range(8)]
+
+        started   = time.monotonic()
+        file_urls = upload_files(files, s3_client, max_workers=8)
+
+        self.assertLess(time.monotonic() - started, 0.05 * 8)
+        self.assertEqual([url.split('/board_file/')[-1] for url in file_urls], [f'file{i}.txt' for i in range(8)])
+        self.assertEqual(len(s3_client.objects), 8)
+
+    def test_upload_files_rolls_back_on_failure(self):
+        s3_client = FakeS3Client(fail_keys=['board_file/file 3.txt'])
+        files     = [SimpleUploadedFile(f'file {i}.txt', b'data', content_type='text/plain') for i in range(5)]
+
+        with self.assertRaises(FileUploadError):
+            upload_files(files, s3_client)
+
+        self.assertEqual(s3_client.objects, {})
+
+class DeleteFilesTest(unittest.TestCase):
+    def test_delete_files_batches_and_reports_failures(self):
+        s3_client         = FakeS3Client(fail_keys=['board_file/3.jpg'])
+        keys              = [f'board_file/{i}.jpg' for i in range(2500)]
+        s3_client.objects = {key : b'image' for key in keys}
+
+        failures          = delete_files(keys, s3_client)
+
+        self.assertEqual(s3_client.delete_calls, 3)
+        self.assertEqual(list(s3_client.objects), ['board_file/3.jpg'])
+        self.assertEqual(failures, [{'key' : 'board_file/3.jpg', 'code' : 'AccessDenied', 'message' : 'Access Denied'}])
+
+class S3ClientTest(unittest.TestCase):
+    def tearDown(self):
+        reset_s3_client()
+
+    @override_settings(S3_MAX_POOL_CONNECTIONS=7, S3_RETRY_MAX_ATTEMPTS=5)
+    def test_create_s3_client_is_shared(self):
+        reset_s3_client()
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(create_s3_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        self.assertEqual(clients[0].meta.config.max_pool_connections, 7)
+        self.assertEqual(clients[0].meta.config.retries['mode'], 'standard')
+
+        reset_s3_client()
+        self.assertIsNot(create_s3_client(), clients[0])
+
 class BoardWriteTest(TestCase): 
     def setUp(self):
         password          = '1234'
@@ -106,6 +252,263 @@ class BoardWriteTest(TestCase):
 
         self.assertContains(response=response, text='SUCCESS', status_code=200)
 
+    def test_board_write_with_files(self):
+        c        = Client()
+        user     = User.objects.filter(name='fcfargo').first()
+        token    = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header   = {'HTTP_Authorization' : token} 
+        body     = {
+            "board_category_id": 1,
+            "post_category_id": 1,
+            "title": "문의 드립니다.",
+            "content": "상품 배송 예정일은 언제인가요?",
+            "password": "gns7201ok!",
+        }
+        files    = [SimpleUploadedFile(f'{i}.jpg', b'image', content_type='image/jpeg') for i in range(3)]
+
+        with patch('boards.views.create_s3_client', return_value=FakeS3Client()):
+            response = c.post('/boards/board-write', {"json":json.dumps(body), "filename": files}, **header)
+
+        self.assertContains(response=response, text='SUCCESS', status_code=200)
+        self.assertEqual(
+            [str(obj.path).split('/board_file/')[-1] for obj in FileUpload.objects.order_by('id')],
+            ['0.jpg', '1.jpg', '2.jpg']
+        )
+
+    def test_board_write_with_presigned_uploads(self):
+        c         = Client()
+        s3_client = FakeS3Client()
+        user      = User.objects.filter(name='fcfargo').first()
+        token     = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header    = {'HTTP_Authorization' : token} 
+
+        with patch('boards.views.create_s3_client', return_value=s3_client):
+            response = c.post(
+                '/boards/upload-urls',
+                json.dumps({"files" : [{"name" : "배송 사진.jpg", "content_type" : "image/jpeg"}]}),
+                content_type='application/json',
+                **header
+            )
+            upload   = response.json()['result'][0]
+
+            body     = {
+                "board_category_id": 1,
+                "post_category_id": 1,
+                "title": "문의 드립니다.",
+                "content": "상품 배송 예정일은 언제인가요?",
+                "password": "gns7201ok!",
+                "uploaded_files": [upload['key']]
+            }
+
+            # 아직 S3에 올라가지 않은 key 는 거부
+            response = c.post('/boards/board-write', {"json":json.dumps(body)}, **header)
+            self.assertContains(response=response, text='UPLOADED_FILE_NOT_FOUND', status_code=400)
+
+            # 다른 사용자에게 발급된 key 는 S3에 있어도 거부 (남의 첨부 파일을 자기 글에 걸었다가 지우는 것을 막음)
+            other_key = f'board_file/{user.id + 1}/{"0" * 32}/배송사진.jpg'
+            s3_client.objects[other_key] = b'image'
+            response  = c.post('/boards/board-write', {"json":json.dumps(dict(body, uploaded_files=[other_key]))}, **header)
+            self.assertContains(response=response, text='UPLOADED_FILE_NOT_FOUND', status_code=400)
+
+            # 브라우저가 presigned URL 로 직접 올린 뒤 글 작성
+            s3_client.objects[upload['key']] = b'image'
+            response = c.post('/boards/board-write', {"json":json.dumps(body)}, **header)
+
+        # 같은 이름으로 다시 받아도 key 가 겹치지 않음
+        self.assertRegex(upload['key'], rf'^board_file/{user.id}/[0-9a-f]{{32}}/배송사진\.jpg$')
+        self.assertContains(response=response, text='SUCCESS', status_code=200)
+        self.assertEqual([str(obj.path) for obj in FileUpload.objects.all()], [upload['file_url']])
+
+    @override_settings(S3_MULTIPART_CHUNKSIZE=5 * 1024 * 1024)
+    def test_board_write_streaming_upload(self):
+        c         = Client()
+        s3_client = FakeS3Client()
+        user      = User.objects.filter(name='fcfargo').first()
+        token     = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header    = {'HTTP_Authorization' : token} 
+        body      = {
+            "board_category_id": 1,
+            "post_category_id": 1,
+            "title": "문의 드립니다.",
+            "content": "상품 배송 예정일은 언제인가요?",
+            "password": "gns7201ok!",
+        }
+        content   = bytes(range(256)) * (12 * 1024 * 4)
+        files     = [
+            SimpleUploadedFile('big.bin', content, content_type='application/octet-stream'),
+            SimpleUploadedFile('small.txt', b'small', content_type='text/plain')
+        ]
+
+        with patch('boards.views.create_s3_client', return_value=s3_client), \
+             patch.object(s3_client, 'upload_fileobj', side_effect=AssertionError):
+            response = c.post('/boards/board-write?upload_mode=stream', {"json":json.dumps(body), "filename": files}, **header)
+
+        self.assertContains(response=response, text='SUCCESS', status_code=200)
+        self.assertEqual(len(s3_client.parts), 3)
+        keys      = [file_key_from_url(obj.path) for obj in FileUpload.objects.order_by('id')]
+        self.assertEqual([key.rsplit('/', 1)[-1] for key in keys], ['big.bin', 'small.txt'])
+        self.assertTrue(all(key.startswith(f'board_file/{user.id}/') for key in keys))
+        self.assertEqual(s3_client.objects[keys[0]], content)
+        self.assertEqual(s3_client.objects[keys[1]], b'small')
+
+    def test_streaming_upload_discarded_on_error(self):
+        # 글 비밀번호/원글 확인 전에 스트리밍으로 올라간 파일은 요청이 실패하면 지워지고 기존 객체를 덮어쓰지 않음
+        c         = Client()
+        s3_client = FakeS3Client()
+        user      = User.objects.filter(name='fcfargo').first()
+        token     = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header    = {'HTTP_Authorization' : token}
+        post,     = insert_posts([(Post(
+            board_category_id = 1,
+            user_id           = user.id,
+            post_category_id  = 1,
+            title             = '문의',
+            content           = '문의',
+            password          = bcrypt.hashpw(b'right-password', bcrypt.gensalt(4)).decode('UTF-8'),
+        ), [])])
+        s3_client.objects['board_file/photo.jpg'] = b'original'
+
+        with patch('boards.views.create_s3_client', return_value=s3_client):
+            for path, body in (
+                ('/boards/board-rewrite', {"post_id": post.id, "title": "t", "content": "c", "password": "wrong-password"}),
+                ('/boards/board-reply', {"post_id": post.id + 100, "title": "t", "content": "c", "password": "password"}),
+                ('/boards/board-write', {"title": "t"}),
+            ):
+                file     = SimpleUploadedFile('photo.jpg', b'attacker', content_type='image/jpeg')
+                response = c.post(f'{path}?upload_mode=stream', {"json":json.dumps(body), "filename": [file]}, **header)
+                self.assertGreaterEqual(response.status_code, 400)
+
+        self.assertEqual(s3_client.objects, {'board_file/photo.jpg' : b'original'})
+        self.assertFalse(FileUpload.objects.exists())
+
+    def test_board_write_single_insert(self):
+        c         = Client()
+        s3_client = FakeS3Client()
+        user      = User.objects.filter(name='fcfargo').first()
+        token     = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header    = {'HTTP_Authorization' : token} 
+        body      = {
+            "board_category_id": 1,
+            "post_category_id": 1,
+            "title": "문의 드립니다.",
+            "content": "상품 배송 예정일은 언제인가요?",
+            "password": "gns7201ok!",
+        }
+        files     = [SimpleUploadedFile(f'{i}.txt', b'file', content_type='text/plain') for i in range(3)]
+
+        with patch('boards.views.create_s3_client', return_value=s3_client), \
+             CaptureQueriesContext(connection) as queries:
+            response = c.post('/boards/board-write', {"json":json.dumps(body), "filename": files}, **header)
+
+        self.assertContains(response=response, text='SUCCESS', status_code=200)
+        post = Post.objects.get()
+        self.assertEqual(post.group_id, post.id)
+        self.assertEqual(FileUpload.objects.filter(post_id=post.id).count(), 3)
+
+        # 글은 INSERT 한 번, UPDATE 없음 / 첨부 파일 3개는 INSERT 한 번
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "posts"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "posts"')]), 0)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "file_uploads"')]), 1)
+
+class PostInsertTest(TestCase):
+    def setUp(self):
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = '1234',
+            nickname      = '침착맨'
+           )
+        BoardCategory.objects.create(id=1, name='고객 문의 게시판')
+        for i, name in enumerate(['일반 글', '답글', '공지'], 1):
+            PostCategory.objects.create(id=i, name=name)
+
+    def test_reserve_post_ids_skips_existing_ids(self):
+        # 시퀀스를 거치지 않고 들어간 글이 있어도 그 다음 id 부터 예약
+        Post.objects.create(id=41, board_category_id=1, user_id=1, post_category_id=1, title='t', content='c', password='p', group_id=41)
+
+        self.assertEqual(list(reserve_post_ids(3)), [42, 43, 44])
+        self.assertEqual(list(reserve_post_ids(2)), [45, 46])
+
+    def test_post_save_reserves_id(self):
+        # id 없이 저장한 글도 시퀀스에서 id 를 받으므로 먼저 예약해둔 id 와 겹치지 않음
+        reserved = reserve_post_ids(2)
+        post     = Post.objects.create(board_category_id=1, user_id=1, post_category_id=1, title='t', content='c', password='p')
+        self.assertEqual(post.id, reserved[-1] + 1)
+
+        Post.objects.create(id=reserved[0], board_category_id=1, user_id=1, post_category_id=1, title='t', content='c', password='p')
+        self.assertEqual(list(reserve_post_ids(1)), [post.id + 1])
+
+    def test_insert_posts_bulk(self):
+        entries = [
+            (Post(board_category_id=1, user_id=1, post_category_id=(3 if i == 0 else 1), title=f'{i}', content='c', password='p'), [f'https://bucket/{i}-{j}' for j in range(2)])
+            for i in range(50)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            insert_posts(entries)
+
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "posts"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "file_uploads"')]), 1)
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertEqual(FileUpload.objects.count(), 100)
+        self.assertFalse(Post.objects.exclude(group_id=F('id')).exists())
+        self.assertEqual(list(Post.objects.filter(is_notice=True).values_list('title', flat=True)), ['0'])
+
+    def test_import_posts_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='UTF-8', delete=False) as lines:
+            for i in range(25):
+                lines.write(json.dumps({
+                    "board_category_id" : 1, "post_category_id" : 1, "user_id" : 1,
+                    "title" : f'{i}', "content" : 'c', "password_hash" : 'hash', "files" : [f'https://bucket/{i}'],
+                }) + '\n')
+
+        try:
+            call_command('import_posts', lines.name, '--batch-size', '10', stdout=io.StringIO())
+        finally:
+            os.remove(lines.name)
+
+        self.assertEqual(Post.objects.count(), 25)
+        self.assertEqual(FileUpload.objects.count(), 25)
+        self.assertFalse(Post.objects.exclude(group_id=F('id')).exists())
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=None)
+    def test_seed_and_benchmark_commands(self):
+        output = io.StringIO()
+        call_command(
+            'seed_boards', '--users', '5', '--boards', '2', '--threads', '30', '--batch-size', '10',
+            '--reply-probability', '1', '--reply-depth', '2', '--fan-out', '2',
+            stdout=output, stderr=io.StringIO()
+        )
+        seeded = json.loads(output.getvalue())
+
+        self.assertEqual(Post.objects.filter(board_category_id__in=seeded['boards']).count(), seeded['posts'])
+        self.assertGreater(seeded['posts'], 30)
+        # 집계와 답글 경로가 글 작성 경로로 만든 것과 같음
+        self.assertEqual(reconcile_post_counts(), {})
+        parent = Post.objects.filter(board_category_id__in=seeded['boards'], group_depth=1).first()
+        reply  = insert_reply(parent.id, user_id=1, post_category_id=2, title='답글', content='답글', password='p')
+        self.assertEqual(
+            Post.objects.filter(group_id=parent.group_id, thread_path__startswith=parent.thread_path, group_depth=2).order_by('thread_path').first().id,
+            reply.id
+        )
+
+        output = io.StringIO()
+        call_command('benchmark_queries', '--repeat', '3', '--deep-page', '2', stdout=output)
+        report = json.loads(output.getvalue())
+        # 상세 조회로 쌓인 조회수는 측정 DB 에 반영하지 않고 버림
+        self.assertEqual(view_counts.pending(Post.objects.values_list('id', flat=True)), {})
+        self.assertEqual(
+            set(report['results']),
+            {'list_first_page', 'list_deep_offset', 'list_deep_cursor', 'detail', 'thread', 'reply'}
+        )
+        for result in report['results'].values():
+            self.assertEqual(result['statuses'], {'200' : 3})
+        # 답글 측정은 되돌림
+        self.assertEqual(Post.objects.filter(title='benchmark reply').count(), 0)
+
 class BoardRewriteTest(TestCase): 
     def setUp(self):
         password          = '1234'
@@ -371,8 +774,49 @@ class BoardDeleteTest(TestCase):
         if not Post.objects.filter(id=1).exists():
             self.assertContains(response=response, text='SUCCESS', status_code=200)
 
+    def test_board_delete_defers_file_cleanup_to_outbox(self):
+        c         = Client()
+        s3_client = FakeS3Client(fail_keys=['board_file/3.jpg'])
+        user      = User.objects.filter(name='fcfargo').first()
+        token     = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header    = {'HTTP_Authorization' : token} 
+        body      = {
+            "post_id": 1,
+            "password": "gns7201ok!",
+        }
+        for i in range(20):
+            FileUpload.objects.create(post_id=1, path=f'https://bucket.s3.region.amazonaws.com/board_file/{i}.jpg')
+
+        # 요청 경로에서는 S3를 호출하지 않고 outbox 에만 기록
+        with patch('boards.views.create_s3_client', side_effect=AssertionError):
+            response = c.post('/boards/board-delete', json.dumps(body), content_type='applications/json', **header)
+
+        self.assertContains(response=response, text='SUCCESS', status_code=200)
+        self.assertEqual(FileDeleteOutbox.objects.count(), 21)
+
+        # drain 은 delete_objects 한 번으로 처리하고 실패한 key 만 재시도 대상으로 남김
+        self.assertEqual(drain_file_outbox(s3_client=s3_client), (20, 1))
+        self.assertEqual(s3_client.delete_calls, 1)
+
+        outbox = FileDeleteOutbox.objects.get()
+        self.assertEqual((outbox.key, outbox.attempts), ('board_file/3.jpg', 1))
+        self.assertIn('AccessDenied', outbox.last_error)
+        self.assertEqual(drain_file_outbox(s3_client=s3_client), (0, 0))
+
+    def test_drain_file_outbox_keeps_keys_in_use(self):
+        s3_client         = FakeS3Client()
+        s3_client.objects = {'board_file/shared.jpg' : b'a', 'board_file/old.jpg' : b'b'}
+        FileUpload.objects.create(post_id=1, path=key_url('board_file/shared.jpg'))
+        enqueue_file_deletes(['board_file/shared.jpg', 'board_file/old.jpg'])
+
+        # 다른 첨부 파일 행이 아직 쓰는 key 는 S3에서 지우지 않고 outbox 에서만 뺌
+        self.assertEqual(drain_file_outbox(s3_client=s3_client), (2, 0))
+        self.assertEqual(set(s3_client.objects), {'board_file/shared.jpg'})
+        self.assertFalse(FileDeleteOutbox.objects.exists())
+
 class BoardListTest(TestCase):
     def setUp(self):
+        cache.clear()
         password          = '1234'
         hashed_password   = bcrypt.hashpw(
                 password.encode('UTF-8'), bcrypt.gensalt()
@@ -417,6 +861,135 @@ class BoardListTest(TestCase):
         BoardCategory.objects.all().delete()
         PostCategory.objects.all().delete()
 
+    def test_board_list_tag_filter(self):
+        # 기존 글의 tag 문자열은 마이그레이션 백필로 옮겨짐
+        self.assertEqual(backfill_post_tags(Post, Tag, PostTag), 1)
+        self.assertEqual(sorted(Tag.objects.values_list('name', flat=True)), ['배송날짜', '배송문의'])
+
+        posts = insert_posts([(Post(
+            board_category_id = 1,
+            user_id           = 1,
+            post_category_id  = 1,
+            title             = f'이벤트 {i}',
+            content           = '이벤트 안내',
+            password          = 'password',
+            tag               = 'Event, 이벤트 ,event'
+        ), []) for i in range(20)])
+        reply = insert_reply(1, user_id=1, post_category_id=2, title='답글', content='답글', password='password', tag='배송문의')
+
+        c        = Client()
+        response = c.get('/boards/board-list', {'tag' : '배송문의'})
+        self.assertEqual([post['id'] for post in json.loads(response.content)['result']], [1, reply.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            first = json.loads(c.get('/boards/board-list', {'tag' : ' EVENT', 'cursor' : ''}).content)
+        # post_tags 인덱스에서 한 페이지 id 를 고르는 쿼리 + 그 글들을 읽는 쿼리
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertIn('"post_tags"', queries.captured_queries[0]['sql'])
+
+        second = json.loads(c.get('/boards/board-list', {'tag' : 'event', 'cursor' : first['next_cursor']}).content)
+        self.assertEqual(
+            [post['id'] for post in first['result'] + second['result']],
+            sorted((post.id for post in posts), reverse=True)
+        )
+        self.assertIsNone(second['next_cursor'])
+
+        response = c.get('/boards/board-list', {'tag' : '없는태그'})
+        self.assertEqual(json.loads(response.content)['result'], [])
+
+    def test_board_list_tag_follows_rewrite(self):
+        backfill_post_tags(Post, Tag, PostTag)
+        update_post(Post.objects.get(id=1), [], tag='교환문의')
+        cache.clear()
+
+        c        = Client()
+        self.assertEqual(json.loads(c.get('/boards/board-list', {'tag' : '배송문의'}).content)['result'], [])
+        self.assertEqual([post['id'] for post in json.loads(c.get('/boards/board-list', {'tag' : '교환문의'}).content)['result']], [1])
+
+    def test_board_list_board_filter(self):
+        BoardCategory.objects.create(id=2, name='자유 게시판')
+        other = insert_posts([(Post(
+            board_category_id = 2,
+            user_id           = 1,
+            post_category_id  = 1,
+            title             = f'자유 글 {i}',
+            content           = '자유 글',
+            password          = 'password',
+        ), []) for i in range(20)])
+
+        c        = Client()
+        response = c.get('/boards/board-list', {'board_category_id' : 1})
+        self.assertEqual([post['id'] for post in json.loads(response.content)['result']], [1])
+
+        with CaptureQueriesContext(connection) as queries:
+            first = json.loads(c.get('/boards/board-list', {'board_category_id' : 2, 'cursor' : ''}).content)
+        # posts_board_list_order_idx 에서 한 페이지 id 를 고르는 쿼리 + 그 글들을 읽는 쿼리 + 게시판 글 수
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertEqual((first['total_count'], first['total_pages']), (20, 2))
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries.captured_queries[0]['sql'])
+            self.assertIn('posts_board_list_order_idx', str(cursor.fetchall()))
+
+        second = json.loads(c.get('/boards/board-list', {'board_category_id' : 2, 'cursor' : first['next_cursor']}).content)
+        self.assertEqual(
+            [post['id'] for post in first['result'] + second['result']],
+            sorted((post.id for post in other), reverse=True)
+        )
+
+        response = c.get('/boards/board-list', {'board_category_id' : 99})
+        self.assertEqual(response.status_code, 401)
+        response = c.get('/boards/board-list', {'board_category_id' : 'a'})
+        self.assertEqual(json.loads(response.content), {'message' : 'INVALID_BOARD_CATEGORY_ID'})
+
+    def test_board_post_counts(self):
+        BoardCategory.objects.create(id=2, name='자유 게시판')
+        self.assertEqual(reconcile_post_counts(), {1 : (0, 1)})
+
+        posts = insert_posts([(Post(
+            board_category_id = 2,
+            user_id           = 1,
+            post_category_id  = 1,
+            title             = f'자유 글 {i}',
+            content           = '자유 글',
+            password          = 'password',
+        ), []) for i in range(3)])
+        insert_reply(posts[0].id, user_id=1, post_category_id=2, title='답글', content='답글', password='password')
+        delete_post(posts[1])
+        self.assertEqual((post_count(1), post_count(2), post_count()), (1, 3, 4))
+
+        # 집계를 거치지 않고 지운 글은 주기 작업이 맞춤
+        Post.objects.filter(id=posts[2].id).delete()
+        call_command('reconcile_post_counts', stdout=io.StringIO())
+        self.assertEqual(post_count(2), 2)
+
+        response = Client().get('/boards/board-list', {'board_category_id' : 2})
+        self.assertEqual((response.json()['total_count'], response.json()['total_pages']), (2, 1))
+
+    def test_reconcile_post_counts_with_concurrent_post(self):
+        reconcile_post_counts()
+        filter_posts = Post.objects.filter
+        written      = []
+
+        def write_post_then_filter(*args, **kwargs):
+            # 맞추는 도중(저장된 값을 읽은 뒤 글 수를 세기 전)에 다른 요청이 글을 써서 커밋함
+            if not written:
+                written.extend(insert_posts([(Post(
+                    board_category_id = 1,
+                    user_id           = 1,
+                    post_category_id  = 1,
+                    title             = '동시에 쓴 글',
+                    content           = '동시에 쓴 글',
+                    password          = 'password',
+                ), [])]))
+            return filter_posts(*args, **kwargs)
+
+        with patch.object(Post.objects, 'filter', side_effect=write_post_then_filter):
+            self.assertEqual(reconcile_post_counts(), {})
+
+        # 새 글은 작성 트랜잭션에서 한 번만 더해짐
+        self.assertEqual(len(written), 1)
+        self.assertEqual(post_count(1), 2)
+
     def test_board_list_value_error(self):
         c        = Client()
         post     = Post.objects.filter(id=1).first()
@@ -432,6 +1005,8 @@ class BoardListTest(TestCase):
     def test_board_list_success(self):
         c        = Client()
         post     = Post.objects.filter(id=1).first()
+        # setUp 의 글은 Post.objects.create 로 만들어 글 수 집계를 거치지 않았으므로 맞춰둠
+        reconcile_post_counts()
 
         param    = {
             "page" : 1
@@ -447,19 +1022,291 @@ class BoardListTest(TestCase):
             'final_updated' : post.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
             'views'         : post.views,
             'group_id'      : post.group_id,
-            'group_order'   : post.group_order,
+            'thread_path'   : post.thread_path,
             'group_depth'   : post.group_depth
         }]
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(),
                 {
-                    "result"   : result
+                    "result"      : result,
+                    "next_cursor" : None,
+                    "total_count" : 1,
+                    "total_pages" : 1
                 }
             )
 
+    def test_board_list_invalid_cursor(self):
+        c        = Client()
+
+        response = c.get('/boards/board-list', {"cursor" : 'not-a-cursor'})
+
+        self.assertContains(response=response, text='INVALID_CURSOR', status_code=400)
+
+    def test_board_list_cursor_matches_page(self):
+        c        = Client()
+        PostCategory.objects.create(id=3, name='공지')
+        for i in range(2, 40):
+            Post.objects.create(
+                id                = i,
+                board_category_id = 1,
+                user_id           = 1,
+                post_category_id  = 3 if i % 10 == 0 else 1,
+                title             = f"문의 드립니다. {i}",
+                content           = "상품 배송 예정일은 언제인가요?",
+                password          = 'gns7201ok!',
+                group_id          = i
+            )
+
+        page_ids   = []
+        for page in range(1, 4):
+            response = c.get('/boards/board-list', {"page" : page})
+            page_ids += [post['id'] for post in response.json()['result']]
+
+        cursor_ids = []
+        cursor     = ''
+        while cursor is not None:
+            response    = c.get('/boards/board-list', {"cursor" : cursor})
+            cursor_ids += [post['id'] for post in response.json()['result']]
+            cursor      = response.json()['next_cursor']
+
+        self.assertEqual(len(cursor_ids), 39)
+        self.assertEqual(cursor_ids, page_ids)
+        self.assertEqual(cursor_ids[:3], [30, 20, 10])
+
+    def test_board_list_query_count(self):
+        c        = Client()
+        for i in range(2, 31):
+            User.objects.create(
+                id            = i,
+                name          = f'user{i}',
+                email         = f'user{i}@gmail.com',
+                password      = 'password',
+                nickname      = f'닉네임{i}'
+            )
+            Post.objects.create(
+                id                = i,
+                board_category_id = 1,
+                user_id           = i,
+                post_category_id  = i % 2 + 1,
+                title             = f"문의 드립니다. {i}",
+                content           = "상품 배송 예정일은 언제인가요?",
+                password          = 'gns7201ok!',
+                group_id          = i
+            )
+
+        # 글 수와 무관하게 페이지 하나는 JOIN 쿼리 한 번 + board_post_counts 에서 전체 글 수 읽기 한 번
+        with self.assertNumQueries(2):
+            response = c.get('/boards/board-list', {"page" : 2})
+
+        self.assertEqual(len(response.json()['result']), 15)
+        self.assertEqual(response.json()['result'][0]['writer'], '닉네임15')
+
+    def test_board_list_page_cache(self):
+        c        = Client()
+        user     = User.objects.filter(name='fcfargo').first()
+        token    = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header   = {'HTTP_Authorization' : token} 
+        body     = {
+            "board_category_id": 1,
+            "post_category_id": 1,
+            "title": "새 글입니다.",
+            "content": "상품 배송 예정일은 언제인가요?",
+            "password": "gns7201ok!",
+        }
+
+        c.get('/boards/board-list', {"page" : 1})
+        with self.assertNumQueries(0):
+            response = c.get('/boards/board-list', {"page" : 1})
+        self.assertEqual(len(response.json()['result']), 1)
+
+        # 글 작성으로 세대 번호가 올라가면 같은 페이지도 다시 DB에서 읽음
+        c.post('/boards/board-write', {"json":json.dumps(body)}, **header)
+        response = c.get('/boards/board-list', {"page" : 1})
+
+        self.assertEqual(response.json()['result'][0]['title'], "새 글입니다.")
+        self.assertEqual(cache_stats()['list_hit'], 1)
+        self.assertEqual(cache_stats()['list_miss'], 2)
+
+    def test_board_list_notice_flag_backfill(self):
+        PostCategory.objects.create(id=3, name='공지')
+        for i in range(2, 12):
+            Post.objects.create(
+                id                = i,
+                board_category_id = 1,
+                user_id           = 1,
+                post_category_id  = 1,
+                title             = f"문의 드립니다. {i}",
+                content           = "상품 배송 예정일은 언제인가요?",
+                password          = 'gns7201ok!',
+                group_id          = i
+            )
+        # save()를 거치지 않은 과거 데이터처럼 플래그가 어긋난 상태를 만듦
+        Post.objects.filter(id__in=[3, 7]).update(post_category_id=3)
+        Post.objects.filter(id=1).update(is_notice=True)
+
+        updated = backfill_notice_flag(Post, batch_size=3)
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(list(Post.objects.filter(is_notice=True).order_by('id').values_list('id', flat=True)), [3, 7])
+
+class BoardSearchTest(TestCase):
+    def setUp(self):
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = 'password',
+            nickname      = '침착맨'
+           )
+        BoardCategory.objects.create(id=1, name='고객 문의 게시판')
+        PostCategory.objects.create(id=1, name='일반 글')
+
+    def create_posts(self, *posts):
+        return insert_posts([(Post(
+            board_category_id = 1,
+            user_id           = 1,
+            post_category_id  = 1,
+            title             = title,
+            content           = content,
+            password          = 'password',
+        ), []) for title, content in posts])
+
+    def test_tokenize_ngram(self):
+        self.assertEqual(query_tokens('배송문의 Q&A'), ['a', 'q', '문의', '배송', '송문'])
+        self.assertEqual(query_tokens('   '), [])
+
+    def test_board_search_ranking(self):
+        in_title, in_content, partial = self.create_posts(
+            ('배송 문의', '언제 오나요?'),
+            ('질문 있습니다', '배송 문의 드립니다'),
+            ('배송', '택배 언제 오나요?'),
+        )
+        c        = Client()
+        response = c.get('/boards/search', {'q' : '배송 문의'})
+
+        self.assertEqual(response.status_code, 200)
+        result   = json.loads(response.content)['result']
+        # 검색어 토큰을 모두 가진 글만, 제목에 있는 글이 먼저
+        self.assertEqual([post['id'] for post in result], [in_title.id, in_content.id])
+        self.assertGreater(result[0]['score'], result[1]['score'])
+
+    def test_board_search_cursor(self):
+        posts    = self.create_posts(*[(f'공지 {i}', '적립금 안내') for i in range(20)])
+        c        = Client()
+
+        first    = json.loads(c.get('/boards/search', {'q' : '적립금'}).content)
+        second   = json.loads(c.get('/boards/search', {'q' : '적립금', 'cursor' : first['next_cursor']}).content)
+
+        self.assertEqual(len(first['result']), 15)
+        self.assertEqual(len(second['result']), 5)
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(
+            [post['id'] for post in first['result'] + second['result']],
+            sorted((post.id for post in posts), reverse=True)
+        )
+
+    def test_board_search_index_follows_changes(self):
+        post, = self.create_posts(('교환 문의', '사이즈가 맞지 않아요'))
+
+        update_post(post, [], title='환불 문의', content='사이즈가 맞지 않아요')
+        c        = Client()
+        self.assertEqual(json.loads(c.get('/boards/search', {'q' : '교환'}).content)['result'], [])
+        self.assertEqual(len(json.loads(c.get('/boards/search', {'q' : '환불'}).content)['result']), 1)
+
+        delete_post(post)
+        self.assertFalse(PostToken.objects.exists())
+
+    def test_board_search_invalid_query(self):
+        c        = Client()
+
+        self.assertEqual(json.loads(c.get('/boards/search', {'q' : ' '}).content), {'message' : 'ENTER search_query'})
+        self.assertEqual(json.loads(c.get('/boards/search', {'q' : '배송', 'cursor' : 'abc'}).content), {'message' : 'INVALID_CURSOR'})
+
+class TrendingTagsTest(TestCase):
+    def setUp(self):
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = 'password',
+            nickname      = '침착맨'
+           )
+        BoardCategory.objects.create(id=1, name='고객 문의 게시판')
+        PostCategory.objects.create(id=1, name='일반 글')
+
+    def create_posts(self, *tags):
+        return insert_posts([(Post(
+            board_category_id = 1,
+            user_id           = 1,
+            post_category_id  = 1,
+            title             = '문의',
+            content           = '문의 드립니다',
+            password          = 'password',
+            tag               = tag
+        ), []) for tag in tags])
+
+    def test_trending_tags_order(self):
+        self.create_posts('배송, 교환', '배송', '배송, 환불', '교환')
+        c        = Client()
+        # 처음 조회할 때 기간 경계 행을 만듦
+        top_tags('24h')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = c.get('/boards/trending-tags', {'window' : '24h', 'limit' : 2})
+        # 경계 확인 + trending_tags 상위 N 개 (post_tags 를 세지 않음)
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertEqual(json.loads(response.content), {
+            'window' : '24h',
+            'result' : [{'tag' : '배송', 'count' : 3}, {'tag' : '교환', 'count' : 2}],
+        })
+
+    def test_trending_tags_follow_changes(self):
+        first, second = self.create_posts('배송', '배송, 교환')
+
+        update_post(first, [], tag='교환')
+        self.assertEqual(top_tags('24h'), [{'tag' : '교환', 'count' : 2}, {'tag' : '배송', 'count' : 1}])
+
+        delete_post(second)
+        self.assertEqual(top_tags('7d'), [{'tag' : '교환', 'count' : 1}])
+
+    def test_trending_tags_rollover(self):
+        self.create_posts('배송')
+        later = timezone.now() + timedelta(hours=25)
+
+        self.assertEqual(top_tags('24h', now=later), [])
+        self.assertEqual(top_tags('7d', now=later), [{'tag' : '배송', 'count' : 1}])
+        self.assertFalse(TrendingTag.objects.filter(window='24h').exists())
+
+    def test_trending_tags_rollover_purges_old_buckets(self):
+        self.create_posts('배송')
+        later = timezone.now() + timedelta(days=8)
+
+        # 7d 기간은 아직 이 구간을 합계에서 빼지 않았으므로 남겨둠
+        self.assertEqual(top_tags('24h', now=later), [])
+        self.assertTrue(TagCountBucket.objects.exists())
+
+        self.assertEqual(top_tags('7d', now=later), [])
+        self.assertFalse(TagCountBucket.objects.exists())
+
+    def test_rebuild_tag_counts(self):
+        self.create_posts('배송', '배송, 교환')
+        TrendingTag.objects.update(count=100)
+
+        rebuild_tag_counts()
+        self.assertEqual(top_tags('24h'), [{'tag' : '배송', 'count' : 2}, {'tag' : '교환', 'count' : 1}])
+
+    def test_trending_tags_invalid_params(self):
+        c        = Client()
+
+        self.assertEqual(json.loads(c.get('/boards/trending-tags', {'window' : '1y'}).content), {'message' : 'INVALID_WINDOW'})
+        self.assertEqual(json.loads(c.get('/boards/trending-tags', {'limit' : 'a'}).content), {'message' : 'INVALID_LIMIT'})
+
+# 백그라운드 flush 스레드가 테스트 트랜잭션 밖에서 UPDATE 하지 않도록 flush() 를 직접 부를 때만 반영
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=None)
 class BoardDetailTest(TestCase):
     def setUp(self):
+        cache.clear()
         password          = '1234'
         hashed_password   = bcrypt.hashpw(
                 password.encode('UTF-8'), bcrypt.gensalt()
@@ -540,6 +1387,78 @@ class BoardDetailTest(TestCase):
                 }
             )
 
+    def test_board_detail_views_write_behind(self):
+        c        = Client()
+        view_counts.clear()
+        updated_at = Post.objects.get(id=1).updated_at
+
+        for _ in range(3):
+            c.get('/boards/1')
+
+        # 요청 경로에서는 DB의 views가 바뀌지 않고, 목록에는 대기 중인 증가분이 더해져 보임
+        self.assertEqual(Post.objects.get(id=1).views, 0)
+        response = c.get('/boards/board-list', {"page" : 1})
+        self.assertEqual(response.json()['result'][0]['views'], 3)
+
+        with self.assertNumQueries(1):
+            view_counts.flush()
+
+        post = Post.objects.get(id=1)
+        self.assertEqual(post.views, 3)
+        self.assertEqual(post.updated_at, updated_at)
+        self.assertEqual(view_counts.pending([1]), {})
+
+    def test_board_detail_views_flush_failure(self):
+        c        = Client()
+        view_counts.clear()
+        c.get('/boards/1')
+
+        # 조회 요청은 버퍼에 더하기만 하므로 조회수 반영이 실패해도 응답에 영향이 없음
+        with self.assertNumQueries(0), patch('boards.counters.Post.objects.filter', side_effect=DatabaseError):
+            view_counts.incr(1)
+            with self.assertRaises(DatabaseError):
+                view_counts.flush()
+
+        # 반영하지 못한 증가분은 버퍼에 남아 다음 flush 에서 반영됨
+        self.assertEqual(view_counts.pending([1]), {1 : 2})
+        view_counts.flush()
+        self.assertEqual(Post.objects.get(id=1).views, 2)
+
+    def test_board_detail_cache(self):
+        c        = Client()
+
+        c.get('/boards/1')
+        with self.assertNumQueries(0):
+            response = c.get('/boards/1')
+
+        self.assertEqual(response.json()['result'][0]['title'], "문의 드립니다.")
+        self.assertEqual(cache_stats()['detail_hit'], 1)
+        self.assertEqual(cache_stats()['detail_miss'], 1)
+
+        stats    = c.get('/boards/cache-stats')
+        self.assertEqual(stats.json()['result']['detail_hit'], 1)
+
+    def test_board_detail_cache_invalidated_by_rewrite(self):
+        c        = Client()
+        user     = User.objects.filter(name='fcfargo').first()
+        token    = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header   = {'HTTP_Authorization' : token} 
+        body     = {
+            "post_id": 1,
+            "title": "문의 드립니다. real 문의",
+            "content": "상품 배송 예정일은 언제인가요????????",
+            "password": "gns7201ok!",
+            "tag_names": "배송날짜, 배송문의, 재입고문의"
+        }
+
+        c.get('/boards/1')
+        with patch('boards.views.create_s3_client'):
+            c.post('/boards/board-rewrite', {'json' : json.dumps(body)}, **header)
+        response = c.get('/boards/1')
+
+        self.assertEqual(response.json()['result'][0]['title'], "문의 드립니다. real 문의")
+        self.assertEqual(cache_stats()['detail_miss'], 2)
+
 class BoardReplyTest(TestCase):
     def setUp(self):
         password          = '1234'
@@ -588,7 +1507,7 @@ class BoardReplyTest(TestCase):
             ip_address        = '127.0.0.1',
             password          = hashed_password,  
             group_id          = 1,
-            group_order       = 1,
+            thread_path       = 'zzzz',
             group_depth       = 1,
             tag               = '배송날짜, 배송문의'
         )
@@ -639,8 +1558,284 @@ class BoardReplyTest(TestCase):
         current_post = Post.objects.filter(id=3).first()
         child_post   = Post.objects.filter(id=2).first()      
 
-        if current_post.group_order == child_post.group_order -1:
+        if current_post.thread_path < child_post.thread_path:
             self.assertContains(response=response, text='SUCCESS', status_code=200)
 
+    def test_board_reply_thread_order(self):
+        c        = Client()
+        cache.clear()
+        user     = User.objects.filter(name='fcfargo').first()
+        token    = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+        header   = {'HTTP_Authorization' : token} 
+
+        # 1 ─ 2(기존 답글) 상태에서 1에 답글 3, 2에 답글 4, 1에 답글 5 작성
+        for post_id in [1, 2, 1]:
+            body     = {
+                "post_id": post_id,
+                "title": "답글입니다",
+                "content": "답글 내용",
+                "password": "gns7201ok!"
+            }
+            response = c.post('/boards/board-reply', {'json': json.dumps(body)}, **header)
+            self.assertEqual(response.status_code, 200)
+
+        # 기존 group_order 방식과 같이 최신 답글이 부모 바로 아래, 자손은 부모 바로 뒤에 옴
+        response = c.get('/boards/board-list', {"page" : 1})
+        self.assertEqual([post['id'] for post in response.json()['result']], [1, 5, 3, 2, 4])
+        self.assertEqual([post['group_depth'] for post in response.json()['result']], [0, 1, 1, 1, 2])
+        # 답글을 달아도 기존 글의 경로는 바뀌지 않음
+        self.assertEqual(Post.objects.get(id=2).thread_path, 'zzzz')
+
+    def test_board_thread_fetch(self):
+        c        = Client()
+        insert_reply(2, user_id=1, post_category_id=2, title='답글의 답글', content='내용', password='password')
+        insert_reply(1, user_id=1, post_category_id=2, title='새 답글', content='새 내용', password='password')
+
+        with self.assertNumQueries(1):
+            response = c.get('/boards/threads/1', {'include_content' : 'true'})
+            body     = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post['id'] for post in body['result']], [1, 4, 2, 3])
+        self.assertEqual([post['group_depth'] for post in body['result']], [0, 1, 1, 2])
+        self.assertEqual(body['result'][1]['content'], '새 내용')
+
+        response = c.get('/boards/threads/1')
+        body     = json.loads(b''.join(response.streaming_content))
+        self.assertNotIn('content', body['result'][0])
+
+        # 긴 묶음은 배치마다 (thread_path, id) 다음 구간을 짧은 쿼리로 이어 읽음 (4개를 2개씩 -> 마지막 빈 배치까지 3번)
+        with patch('boards.views.THREAD_PAGE_SIZE', 2), self.assertNumQueries(3):
+            response = c.get('/boards/threads/1')
+            body     = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([post['id'] for post in body['result']], [1, 4, 2, 3])
+
+    def test_board_thread_invalid_group_id(self):
+        c        = Client()
+
+        response = c.get('/boards/threads/3')
+
+        self.assertContains(response=response, text='INVALID_GROUP_ID', status_code=401)
+
+    def test_build_thread_paths_keeps_group_order(self):
+        # group_order 순서의 (id, group_depth): 1 ─ 5 ─ 6, 3, 2 ─ 4
+        rows  = [(1, 0), (5, 1), (6, 2), (3, 1), (2, 1), (4, 2)]
+        paths = build_thread_paths(rows)
+
+        self.assertEqual(sorted(paths, key=paths.get), [1, 5, 6, 3, 2, 4])
+        self.assertEqual(paths[2], 'zzzz')
+        self.assertEqual(paths[4], 'zzzzzzzz')
+
+    def test_repair_thread_paths_after_rolling_deploy(self):
+        # 배포 전 답글 2 는 group_order 1, 배포 중 이전 버전 서버가 2에 답글 3, 1에 답글 4 를 thread_path 없이 씀
+        Post.objects.filter(id=2).update(group_order=2)
+        for post_id, group_order, group_depth in [(3, 3, 2), (4, 1, 1)]:
+            Post.objects.create(
+                id                = post_id,
+                board_category_id = 1,
+                user_id           = 1,
+                post_category_id  = 2,
+                title             = '이전 버전 답글',
+                content           = '내용',
+                password          = 'password',
+                group_id          = 1,
+                group_order       = group_order,
+                group_depth       = group_depth,
+            )
+        insert_reply(1, user_id=1, post_category_id=2, title='새 답글', content='내용', password='password')
+
+        out = io.StringIO()
+        call_command('repair_thread_paths', stdout=out)
+        self.assertIn('repaired replies : 2', out.getvalue())
+        self.assertEqual(Post.objects.get(id=3).thread_path, 'zzzzzzzz')
+
+        paths = dict(Post.objects.filter(group_id=1).values_list('id', 'thread_path'))
+        self.assertEqual(sorted(paths, key=paths.get), [1, 4, 5, 2, 3])
+        self.assertEqual(len(set(paths.values())), 5)
+        self.assertEqual(repair_thread_paths(), 0)
+
+class BoardReplyConcurrencyTest(TransactionTestCase):
+    def setUp(self):
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = 'password',
+            nickname      = '침착맨'
+           )
+        BoardCategory.objects.create(
+            id            = 1,
+            name          = '고객 문의 게시판',
+           )
+        PostCategory.objects.create(id=1, name='일반 글')
+        PostCategory.objects.create(id=2, name='답글')
+        Post.objects.create(
+            id                = 1,
+            board_category_id = 1,
+            user_id           = 1,
+            post_category_id  = 1,
+            title             = "문의 드립니다.",
+            content           = "상품 배송 예정일은 언제인가요?",
+            password          = 'password',
+            group_id          = 1
+        )
+
+    @override_settings(REPLY_MAX_ATTEMPTS=100)
+    def test_board_reply_concurrent_inserts(self):
+        thread_count   = 8
+        reply_count    = 200
+        post_ids       = [1]
+        errors         = []
+        lock           = threading.Lock()
+        start          = threading.Barrier(thread_count)
+
+        def worker(index):
+            try:
+                start.wait()
+                for i in range(reply_count // thread_count):
+                    # 절반은 원글에, 나머지는 이미 달린 답글 중 하나에 몰아서 답글을 닮
+                    with lock:
+                        mother_post_id = 1 if i % 2 == 0 else post_ids[(index + i) % len(post_ids)]
+                    reply = insert_reply(
+                        mother_post_id,
+                        user_id          = 1,
+                        post_category_id = 2,
+                        title            = f'답글 {index}-{i}',
+                        content          = '답글 내용',
+                        password         = 'password'
+                    )
+                    with lock:
+                        post_ids.append(reply.id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+        posts  = list(Post.objects.filter(group_id=1).order_by('thread_path').values('id', 'thread_path', 'group_depth'))
+        paths  = [post['thread_path'] for post in posts]
+        self.assertEqual(len(posts), reply_count + 1)
+        self.assertEqual(len(set(paths)), len(paths))
+
+        children = {}
+        for post in posts[1:]:
+            parent_path = post['thread_path'][:-SEGMENT_WIDTH]
+            # 부모가 존재하고 깊이가 경로 길이와 맞아야 함
+            self.assertIn(parent_path, paths)
+            self.assertEqual(post['group_depth'], len(post['thread_path']) // SEGMENT_WIDTH)
+            children.setdefault(parent_path, []).append(decode_segment(post['thread_path'][-SEGMENT_WIDTH:]))
+
+        # 같은 부모의 자식 구간 값은 SEGMENT_MAX 부터 빈틈없이 하나씩 줄어듦
+        for segments in children.values():
+            self.assertEqual(sorted(segments), list(range(SEGMENT_MAX - len(segments) + 1, SEGMENT_MAX + 1)))
+
+class FileBodyAsyncClient(AsyncClient):
+    # Django 3.2 AsyncClient 는 남은 길이보다 크게 읽으면 AssertionError 를 내는 FakePayload 를 본문으로 넘기므로
+    # 실제 ASGI 서버처럼 파일 객체로 바꿔 넘김 (멀티파트 파서는 64KB 단위로 읽음)
+    async def request(self, **request):
+        if '_body_file' in request:
+            body                  = request['_body_file']
+            request['_body_file'] = io.BytesIO(body.read(len(body)))
+        return await super().request(**request)
+
+# async 뷰는 동기 뷰의 처리를 별도 스레드(별도 DB 연결)에서 실행하므로 테스트 데이터를 커밋해두는 TransactionTestCase 를 씀
+# ASGI 요청(AsyncClient)은 board.middleware 가 board.asgi_urls 로 연결함
+@override_settings(BCRYPT_ROUNDS=4)
+class AsyncBoardViewsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = 'password',
+            nickname      = '침착맨'
+           )
+        BoardCategory.objects.create(id=1, name='고객 문의 게시판')
+        PostCategory.objects.create(id=1, name='일반 글')
+        PostCategory.objects.create(id=2, name='답글')
+        self.token = jwt.encode({"user_id" : 1}, my_settings.SECRET['secret'], algorithm="HS256")
+
+    async def test_async_board_views(self):
+        c         = FileBodyAsyncClient()
+        s3_client = FakeS3Client()
+        body      = {
+            "board_category_id": 1,
+            "post_category_id": 1,
+            "title": "문의 드립니다.",
+            "content": "상품 배송 예정일은 언제인가요?",
+            "password": "gns7201ok!",
+        }
+
+        with patch('boards.views.create_s3_client', return_value=s3_client):
+            files    = [SimpleUploadedFile('a.txt', b'a', content_type='text/plain')]
+            response = await c.post('/boards/board-write', {"json":json.dumps(body), "filename": files}, authorization=self.token)
+            self.assertEqual(json.loads(response.content), {'message' : 'SUCCESS'})
+            self.assertEqual(response.asgi_request.urlconf, 'board.asgi_urls')
+
+            post_id  = (await sync_to_async(Post.objects.get)()).id
+            reply    = dict(body, post_id=post_id, title='답글')
+            response = await c.post('/boards/board-reply', {"json":json.dumps(reply)}, authorization=self.token)
+            self.assertEqual(json.loads(response.content), {'message' : 'SUCCESS'})
+
+            rewrite  = dict(body, post_id=post_id, title='수정', password='wrong')
+            response = await c.post('/boards/board-rewrite', {"json":json.dumps(rewrite)}, authorization=self.token)
+            self.assertEqual(response.status_code, 401)
+
+            files    = [SimpleUploadedFile('b.txt', b'b', content_type='text/plain')]
+            rewrite  = dict(body, post_id=post_id, title='수정')
+            response = await c.post('/boards/board-rewrite', {"json":json.dumps(rewrite), "filename": files}, authorization=self.token)
+            self.assertEqual(json.loads(response.content), {'message' : 'SUCCESS'})
+
+        # 묶음 조회는 배치마다 짧은 쿼리로 이어 읽으며 스트리밍 (배치 크기 1 이면 글마다 한 번)
+        with patch('boards.views.THREAD_PAGE_SIZE', 1):
+            response = await c.get(f'/boards/threads/{post_id}')
+            self.assertIsInstance(response, AsyncStreamingHttpResponse)
+            content  = b''.join([chunk async for chunk in response])
+        self.assertEqual([post['title'] for post in json.loads(content)['result']], ['수정', '답글'])
+
+        # board/asgi.py 의 핸들러는 async 스트리밍 응답을 이벤트 루프에서 조각마다 보냄
+        messages = []
+
+        async def receive():
+            return {'type' : 'http.request', 'body' : b'', 'more_body' : False}
+
+        async def send(message):
+            messages.append(message)
+
+        with patch('boards.views.THREAD_PAGE_SIZE', 1):
+            await BoardASGIHandler()({
+                'type' : 'http', 'method' : 'GET', 'path' : f'/boards/threads/{post_id}', 'query_string' : b'', 'headers' : [],
+            }, receive, send)
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertEqual(b''.join(message.get('body', b'') for message in messages[1:]), content)
+        self.assertGreater(len(messages), 3)
+        self.assertEqual(
+            await sync_to_async(list)(FileUpload.objects.filter(post_id=post_id).values_list('path', flat=True)),
+            ['https://bucket.s3.ap-northeast-2.amazonaws.com/board_file/b.txt']
+        )
+
+        response = await c.post('/boards/board-delete', json.dumps({"post_id" : post_id, "password" : "gns7201ok!"}), content_type='application/json', authorization=self.token)
+        self.assertEqual(json.loads(response.content), {'message' : 'SUCCESS'})
+        self.assertFalse(await sync_to_async(Post.objects.filter(id=post_id).exists)())
+        self.assertEqual(
+            await sync_to_async(list)(FileDeleteOutbox.objects.order_by('id').values_list('key', flat=True)),
+            ['board_file/a.txt', 'board_file/b.txt']
+        )
+
+    async def test_async_board_write_unknown_user(self):
+        c        = FileBodyAsyncClient()
+        token    = jwt.encode({"user_id" : 2}, my_settings.SECRET['secret'], algorithm="HS256")
+        response = await c.post('/boards/board-write', {"json":json.dumps({})}, authorization=token)
+
+        self.assertEqual(json.loads(response.content), {'message' : 'UNKNOWN_USER'})
+
 if __name__=='__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+# 답글 정렬용 경로(thread_path)
+# 글마다 부모 경로 뒤에 고정 길이(4자리, 36진수) 구간을 붙인 문자열을 저장하고 묶음 안에서는 이 문자열 순서로 정렬함
+#   - 부모 경로는 자식 경로의 접두어이므로 부모 바로 뒤에 자손들이 이어짐
+#   - 같은 부모의 자식끼리는 최신 답글이 더 작은 구간 값을 받아 위에 옴 (기존 group_order 방식과 같은 순서)
+# 새 답글은 부모 바로 다음 행(=가장 최신 자식) 하나만 읽고 경로를 정하므로 다른 행을 다시 번호 매길 일이 없음
+from django.conf import settings
+
+from .models    import Post, FileUpload
+from .modules   import atomic_with_retry
+from .posts     import reserve_post_ids
+from .search    import index_posts
+from .tags      import set_post_tags
+from .trending  import record_tag_changes
+from .counts    import record_post_counts
+
+SEGMENT_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+SEGMENT_WIDTH  = 4
+SEGMENT_MAX    = len(SEGMENT_DIGITS) ** SEGMENT_WIDTH - 1
+MAX_PATH_LEN   = 255
+
+class ThreadPathError(Exception):
+    pass
+
+def encode_segment(value):
+    digits = []
+    for _ in range(SEGMENT_WIDTH):
+        value, remainder = divmod(value, len(SEGMENT_DIGITS))
+        digits.append(SEGMENT_DIGITS[remainder])
+    return ''.join(reversed(digits))
+
+def decode_segment(segment):
+    value = 0
+    for digit in segment:
+        value = value * len(SEGMENT_DIGITS) + SEGMENT_DIGITS.index(digit)
+    return value
+
+def child_path(parent_path, newest_child_path=None):
+    # 가장 최신 자식보다 구간 값이 1 작은 경로를 새 자식에게 줌
+    if newest_child_path is None:
+        value = SEGMENT_MAX
+    else:
+        value = decode_segment(newest_child_path[len(parent_path):len(parent_path)+SEGMENT_WIDTH]) - 1
+
+    if value < 0:
+        raise ThreadPathError('MAX_REPLIES_EXCEEDED')
+    if len(parent_path) + SEGMENT_WIDTH > MAX_PATH_LEN:
+        raise ThreadPathError('MAX_DEPTH_EXCEEDED')
+    return parent_path + encode_segment(value)
+
+def next_reply_path(mother_post):
+    # 경로 순서상 부모 바로 다음 행이 부모의 자손이라면 그 행이 가장 최신 자식 (group_id, thread_path 인덱스 한 번 탐색)
+    next_path = Post.objects.filter(
+        group_id=mother_post.group_id, thread_path__gt=mother_post.thread_path
+    ).order_by('thread_path').values_list('thread_path', flat=True).first()
+
+    if next_path is None or not next_path.startswith(mother_post.thread_path):
+        next_path = None
+    return child_path(mother_post.thread_path, next_path)
+
+def build_thread_paths(rows):
+    # 기존 (group_order, group_depth) 순서의 한 묶음 글 목록으로부터 같은 순서를 내는 경로를 계산
+    # rows: group_order 순으로 정렬된 (id, group_depth) 목록, 반환: {id: thread_path}
+    parents  = {}
+    children = {}
+    stack    = []
+    for post_id, depth in rows:
+        while stack and stack[-1][1] >= depth:
+            stack.pop()
+        parent_id         = stack[-1][0] if stack else None
+        parents[post_id]  = parent_id
+        children.setdefault(parent_id, []).append(post_id)
+        stack.append((post_id, depth))
+
+    positions = {}
+    for siblings in children.values():
+        for position, post_id in enumerate(siblings):
+            positions[post_id] = position
+
+    paths = {}
+    for post_id, _ in rows:
+        parent_id = parents[post_id]
+        if parent_id is None:
+            paths[post_id] = ''
+            continue
+        # 먼저 나오는(최신) 자식일수록 작은 값, 가장 오래된 자식이 SEGMENT_MAX
+        value          = SEGMENT_MAX - (len(children[parent_id]) - 1) + positions[post_id]
+        paths[post_id] = paths[parent_id] + encode_segment(value)
+    return paths
+
+def insert_reply(mother_post_id, file_urls=(), **fields):
+    # 같은 부모에 동시에 달리는 답글이 같은 최신 자식을 읽고 같은 경로를 받지 않도록
+    # 트랜잭션 안에서 부모 행을 잠근 뒤 다시 읽고 경로를 정함
+    # (경로는 부모 아래에서만 겹칠 수 있으므로 묶음 전체가 아니라 부모 행 하나만 잠그면 됨)
+    # id 는 원글과 같은 시퀀스에서 재시도 전에 한 번만 받아둠
+    max_attempts = getattr(settings, 'REPLY_MAX_ATTEMPTS', 3)
+    post_id      = atomic_with_retry(lambda: reserve_post_ids(1)[0], max_attempts=max_attempts)
+
+    def insert():
+        mother_post  = Post.objects.select_for_update().get(id=mother_post_id)
+        current_post = Post(
+            id                = post_id,
+            board_category_id = mother_post.board_category_id,
+            group_id          = mother_post.group_id,
+            thread_path       = next_reply_path(mother_post),
+            group_depth       = mother_post.group_depth+1,
+            **fields
+        )
+        current_post.save(force_insert=True)
+
+        FileUpload.objects.bulk_create([FileUpload(post_id=current_post.id, path=file_url) for file_url in file_urls])
+        index_posts([current_post])
+        record_tag_changes(set_post_tags([current_post]))
+        record_post_counts([current_post.board_category_id])
+        return current_post
+
+    return atomic_with_retry(insert, max_attempts=max_attempts)
+
+def repair_thread_paths():
+    # 배포 중 이전 버전 서버가 쓴 답글은 group_order 만 채우고 thread_path 가 '' 로 남아 원글처럼 정렬되므로 배포 뒤 경로를 채움
+    # 이전 버전은 답글에 group_order = 부모 + 1 을 주고 뒤의 행을 한 칸씩 밀었으므로
+    # group_order 순서에서 앞쪽으로 가장 가까운 한 단계 얕은 행이 부모 (새 버전이 쓴 답글은 group_order 가 0 이라 후보에서 뺌)
+    # 답글마다 부모를 잠그고 가장 최신 자식 경로를 받으므로 insert_reply 와 같이 돌아도 경로가 겹치지 않음
+    # 부모를 찾을 수 없으면(새 버전 답글에 단 답글) 원글 바로 아래 답글로 붙임
+    # 부모가 먼저 고쳐지도록 id(작성) 순서로 처리, 고칠 행만 골라 처리하므로 여러 번 실행해도 됨
+    # 반환값 : 경로를 채운 답글 수
+    repaired = 0
+    for post_id in list(Post.objects.filter(group_depth__gt=0, thread_path='').order_by('id').values_list('id', flat=True)):
+        def repair():
+            post = Post.objects.select_for_update().get(id=post_id)
+            if post.thread_path:
+                return 0
+
+            mother_post_id = Post.objects.filter(
+                group_id        = post.group_id,
+                group_depth     = post.group_depth - 1,
+                group_order__lt = post.group_order,
+            ).exclude(group_depth__gt=0, group_order=0).order_by('-group_order').values_list('id', flat=True).first()
+            if mother_post_id is None:
+                mother_post_id = post.group_id
+
+            mother_post      = Post.objects.select_for_update().get(id=mother_post_id)
+            post.thread_path = next_reply_path(mother_post)
+            post.group_depth = mother_post.group_depth + 1
+            post.save(update_fields=['thread_path', 'group_depth'])
+            return 1
+
+        repaired += atomic_with_retry(repair)
+    return repaired
@@ -0,0 +1,160 @@
+# 인기 태그 집계 : 글 작성/수정/삭제 때 증감만 기록해 조회 시 post_tags 전체를 세지 않음
+#   - tag_count_buckets : 태그별 1시간 구간(글 작성 시각 기준) 글 수
+#   - trending_tags     : 기간(24h, 7d)별 태그 글 수 합계, 조회는 이 표에서 count 순으로 상위 N 개만 읽음
+#   - trending_windows  : 기간별로 합계에서 이미 뺀 구간의 경계 (expired_before 이전 구간은 합계에 없음)
+# 시간이 지나 기간 밖으로 밀려난 구간은 조회할 때 rollover() 가 구간 합계만큼 빼고 경계를 옮김 (모든 기간 밖의 구간은 지움)
+# 어긋난 집계는 rebuild_tag_counts 명령으로 post_tags 에서 다시 계산
+from collections                import defaultdict
+from datetime                   import timedelta
+
+from django.db                  import transaction, IntegrityError
+from django.db.models           import Sum, Min, Count
+from django.db.models.functions import TruncHour
+from django.utils               import timezone
+
+from .models                    import PostTag, TagCountBucket, TrendingTag, TrendingWindow
+from .modules                   import add_count
+
+BUCKET_SIZE      = timedelta(hours=1)
+TRENDING_WINDOWS = {
+    '24h' : timedelta(hours=24),
+    '7d'  : timedelta(days=7),
+}
+
+def bucket_of(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def window_cutoff(window, now=None):
+    # 기간에 들어가는 가장 이른 구간의 시작 (현재 구간 포함 24개/168개 구간)
+    return bucket_of(now or timezone.now()) - TRENDING_WINDOWS[window] + BUCKET_SIZE
+
+def lock_window(window, now=None):
+    # 기간 경계 행을 잠가 읽음, 처음이면 남아 있는 가장 이른 구간부터 rollover 하도록 만듦
+    state = TrendingWindow.objects.select_for_update().filter(name=window).first()
+    if state is not None:
+        return state
+
+    cutoff   = window_cutoff(window, now)
+    earliest = TagCountBucket.objects.aggregate(earliest=Min('bucket_start'))['earliest']
+    try:
+        with transaction.atomic():
+            TrendingWindow.objects.create(name=window, expired_before=min(earliest or cutoff, cutoff))
+    except IntegrityError:
+        pass
+    return TrendingWindow.objects.select_for_update().get(name=window)
+
+@transaction.atomic
+def record_tag_changes(changes, now=None):
+    # changes : (tag_id, 글 작성 시각, 증감) 목록, 글 변경과 같은 트랜잭션 안에서 불림
+    bucket_deltas = defaultdict(int)
+    for tag_id, created_at, delta in changes:
+        bucket_deltas[(tag_id, bucket_of(created_at))] += delta
+    bucket_deltas = {key : delta for key, delta in bucket_deltas.items() if delta}
+    if not bucket_deltas:
+        return
+
+    now = now or timezone.now()
+    # 잠금 순서를 맞춰 교착을 피함
+    for (tag_id, bucket_start), delta in sorted(bucket_deltas.items()):
+        add_count(TagCountBucket, {'tag_id' : tag_id, 'bucket_start' : bucket_start}, delta)
+
+    for window in TRENDING_WINDOWS:
+        # 다음 구간 전환 전에 기간 밖으로 밀려날 수 있는 오래된 구간을 고칠 때만 경계 행을 잠가 rollover 와 순서를 맞춤
+        # (새 글은 항상 현재 구간이므로 잠그지 않음)
+        safe_after = window_cutoff(window, now) + BUCKET_SIZE
+        if any(bucket_start < safe_after for _, bucket_start in bucket_deltas):
+            expired_before = lock_window(window, now).expired_before
+        else:
+            expired_before = None
+
+        window_deltas = defaultdict(int)
+        for (tag_id, bucket_start), delta in bucket_deltas.items():
+            if expired_before is None or bucket_start >= expired_before:
+                window_deltas[tag_id] += delta
+
+        for tag_id, delta in sorted(window_deltas.items()):
+            if delta:
+                add_count(TrendingTag, {'window' : window, 'tag_id' : tag_id}, delta)
+
+def removed_tag_changes(post_ids):
+    # 글을 지우기 전에 불러 붙어 있던 태그마다 -1 (post_tags 는 FK CASCADE 로 지워짐)
+    return [
+        (tag_id, created_at, -1)
+        for tag_id, created_at in PostTag.objects.filter(post_id__in=post_ids).values_list('tag_id', 'post__created_at')
+    ]
+
+def rollover(window, now=None):
+    # 기간 밖으로 밀려난 구간을 합계에서 뺌, 경계가 최신이면 잠그지 않고 바로 돌아감
+    now    = now or timezone.now()
+    cutoff = window_cutoff(window, now)
+    state  = TrendingWindow.objects.filter(name=window).first()
+    if state is not None and state.expired_before >= cutoff:
+        return
+
+    with transaction.atomic():
+        state = lock_window(window, now)
+        if state.expired_before >= cutoff:
+            return
+
+        expired = TagCountBucket.objects.filter(
+            bucket_start__gte = state.expired_before,
+            bucket_start__lt  = cutoff,
+        ).values('tag_id').annotate(total=Sum('count')).order_by('tag_id')
+        for row in expired:
+            if row['total']:
+                add_count(TrendingTag, {'window' : window, 'tag_id' : row['tag_id']}, -row['total'])
+
+        TrendingTag.objects.filter(window=window, count__lte=0).delete()
+        state.expired_before = cutoff
+        state.save(update_fields=['expired_before'])
+
+        # 모든 기간의 합계에서 이미 빠졌고 가장 긴 기간보다도 오래된 구간은 다시 읽지 않으므로 지움 (tag_count_buckets 가 계속 늘지 않도록)
+        # 아직 경계 행이 없는 기간은 남은 구간을 처음부터 빼야 하므로 그때까지 지우지 않음
+        expired_before = dict(TrendingWindow.objects.values_list('name', 'expired_before'))
+        if set(TRENDING_WINDOWS) <= set(expired_before):
+            purge_before = min(
+                [expired_before[name] for name in TRENDING_WINDOWS] + [window_cutoff(name, now) for name in TRENDING_WINDOWS]
+            )
+            TagCountBucket.objects.filter(bucket_start__lt=purge_before).delete()
+
+def top_tags(window, limit=10, now=None):
+    rollover(window, now)
+    return [
+        {'tag' : row['tag__name'], 'count' : row['count']}
+        for row in TrendingTag.objects.filter(window=window, count__gt=0).order_by('-count', 'tag_id').values(
+            'tag__name', 'count'
+        )[:limit]
+    ]
+
+@transaction.atomic
+def rebuild_tag_counts(now=None):
+    # post_tags 와 글 작성 시각에서 가장 긴 기간만큼의 구간과 기간 합계를 다시 계산 (그보다 오래된 구간은 지움)
+    now            = now or timezone.now()
+    windows        = {window : lock_window(window, now) for window in sorted(TRENDING_WINDOWS)}
+    cutoffs        = {window : window_cutoff(window, now) for window in TRENDING_WINDOWS}
+    earliest       = min(cutoffs.values())
+
+    buckets        = PostTag.objects.filter(post__created_at__gte=earliest).annotate(
+        bucket_start = TruncHour('post__created_at'),
+    ).values('tag_id', 'bucket_start').annotate(total=Count('id')).order_by()
+
+    TagCountBucket.objects.all().delete()
+    TrendingTag.objects.all().delete()
+
+    totals         = defaultdict(int)
+    bucket_objects = []
+    for row in buckets:
+        bucket_objects.append(TagCountBucket(tag_id=row['tag_id'], bucket_start=row['bucket_start'], count=row['total']))
+        for window, cutoff in cutoffs.items():
+            if row['bucket_start'] >= cutoff:
+                totals[(window, row['tag_id'])] += row['total']
+
+    TagCountBucket.objects.bulk_create(bucket_objects, batch_size=1000)
+    TrendingTag.objects.bulk_create([
+        TrendingTag(window=window, tag_id=tag_id, count=count) for (window, tag_id), count in totals.items()
+    ], batch_size=1000)
+
+    for window, state in windows.items():
+        state.expired_before = cutoffs[window]
+        state.save(update_fields=['expired_before'])
+    return len(bucket_objects)
@@ -1,7 +1,8 @@
 from django.urls    import path, include
 from .views         import (
     BoardWriteView, BoardRewriteView, BoardDeleteView,
-    BoardListView, BoardDetailView, BoardReplyView,
+    BoardListView, BoardDetailView, BoardSearchView, TrendingTagsView, BoardReplyView,
+    BoardThreadView, CacheStatsView, FileUploadUrlView,
 )
 
 urlpatterns = [
@@ -9,6 +10,11 @@ urlpatterns = [
     path('/board-rewrite', BoardRewriteView.as_view()),
     path('/board-delete', BoardDeleteView.as_view()),
     path('/board-list', BoardListView.as_view()),
+    path('/search', BoardSearchView.as_view()),
+    path('/trending-tags', TrendingTagsView.as_view()),
     path('/<int:post_id>', BoardDetailView.as_view()),
-    path('/board-reply', BoardReplyView.as_view())
+    path('/board-reply', BoardReplyView.as_view()),
+    path('/threads/<int:group_id>', BoardThreadView.as_view()),
+    path('/cache-stats', CacheStatsView.as_view()),
+    path('/upload-urls', FileUploadUrlView.as_view())
 ]
\ No newline at end of file
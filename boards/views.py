@@ -1,25 +1,43 @@
 import boto3
-import bcrypt
 import json
 from datetime             import datetime
 
-from django.http.response import JsonResponse
-from django.db            import transaction
-from django.db.models     import Case, When, Value
+from django.http.response import JsonResponse, StreamingHttpResponse
 from django.views         import View
-from django.db.models     import F
+from django.db.models     import Q
 
-from .models              import Post, FileUpload
+from .models              import Post, PostTag, BoardCategory
 
 from users.models         import User
 from users.decorators     import login_required
-from .modules             import get_client_ip, create_s3_client
+from users.hashers        import hash_password, check_password
+from .counters            import view_counts
+from .threads             import insert_reply, ThreadPathError
+from .posts               import insert_posts, update_post, delete_post
+from .search              import query_tokens, search_posts
+from .tags                import parse_tag_names
+from .trending            import TRENDING_WINDOWS, top_tags
+from .counts              import post_count
+from .caches              import (
+    get_post_detail, set_post_detail, invalidate_post_detail,
+    get_list_page, set_list_page, bump_list_generation, cache_stats,
+)
+from .modules             import (
+    get_client_ip, create_s3_client, upload_files, FileUploadError,
+    create_upload_urls, verify_uploaded_files, UploadedFileNotFoundError,
+    use_streaming_upload, discard_streamed_files_on_error,
+    encode_cursor, decode_cursor, InvalidCursorError,
+)
 import my_settings
 
 class BoardWriteView(View):
     @login_required
+    @discard_streamed_files_on_error
     def post(self, request):
         try:
+            # ?upload_mode=stream 이면 첨부 파일을 임시 파일에 모으지 않고 받는 대로 S3 멀티파트 업로드로 넘김
+            use_streaming_upload(request, create_s3_client)
+
             data              = json.loads(request.POST.get('json'))           
             board_category_id = data['board_category_id']
             post_category_id  = data['post_category_id']
@@ -29,49 +47,29 @@ class BoardWriteView(View):
             tag_names         = data.get('tag_names')
             ip_address        = get_client_ip(self, request)
             files             = request.FILES.getlist('filename')
+            uploaded_files    = data.get('uploaded_files', [])
 
+            file_urls         = []
             if files:
-                s3_client     = create_s3_client()
-                bucket_name   = my_settings.BUCKET_NAME                   # AWS s3 버킷 이름
-                aws_region    = my_settings.AWS_REGION                    # AWS s3 리전 
-                file_urls     = []
-
-                for file in files:
-                    s3_client.upload_fileobj(                                
-                        file,
-                        bucket_name,
-                        'board_file/' + file.name,
-                        ExtraArgs={
-                            "ContentType": file.content_type
-                        }
-                    )
-                    file_endpoint = file.name.replace(" ", "")
-                    file_url = f'https://{bucket_name}.s3.{aws_region}.amazonaws.com/board_file/{file_endpoint}'
-                    file_urls.append(file_url)
-
-            with transaction.atomic():
-                post = Post(
-                    board_category_id = board_category_id,
-                    user_id           = request.user.id,
-                    post_category_id  = post_category_id,
-                    title             = title,
-                    content           = content,
-                    ip_address        = ip_address,
-                    password          = bcrypt.hashpw(password.encode('UTF-8'), bcrypt.gensalt()).decode('UTF-8'),
-                    tag               = tag_names 
-                )
-                post.save()
-
-                post.group_id = post.id
-                post.save()
-
-                if files:
-                    for file_url in file_urls:
-                        fileupload = FileUpload(
-                            post_id           = post.id,
-                            path              = file_url
-                        )
-                        fileupload.save()
+                # 첨부 파일은 스레드 풀에서 동시에 업로드 (실패 시 이미 올라간 파일은 삭제됨)
+                file_urls    += upload_files(files, create_s3_client())
+            if uploaded_files:
+                # presigned URL 로 S3에 직접 올린 파일은 존재 여부만 확인하고 기록
+                file_urls    += verify_uploaded_files(uploaded_files, request.user.id, create_s3_client())
+
+            # id 를 미리 받아 group_id 까지 채운 채로 INSERT 한 번에 기록하고 첨부 파일 행은 bulk_create 로 한 번에 기록
+            insert_posts([(Post(
+                board_category_id = board_category_id,
+                user_id           = request.user.id,
+                post_category_id  = post_category_id,
+                title             = title,
+                content           = content,
+                ip_address        = ip_address,
+                password          = hash_password(password),
+                tag               = tag_names 
+            ), file_urls)])
+
+            bump_list_generation(board_category_id)
 
             return JsonResponse({'message' : 'SUCCESS'}, status=200)
 
@@ -79,11 +77,19 @@ class BoardWriteView(View):
             return JsonResponse({'message' : 'KeyError'}, status = 400)
         except json.JSONDecodeError:
             return JsonResponse({'message' : 'JSONDecodeError'}, status = 400)
+        except UploadedFileNotFoundError:
+            return JsonResponse({'message' : 'UPLOADED_FILE_NOT_FOUND'}, status = 400)
+        except FileUploadError:
+            return JsonResponse({'message' : 'FILE_UPLOAD_ERROR'}, status = 500)
 
 class BoardRewriteView(View):
     @login_required
+    @discard_streamed_files_on_error
     def post(self, request):
         try:
+            # ?upload_mode=stream 이면 첨부 파일을 임시 파일에 모으지 않고 받는 대로 S3 멀티파트 업로드로 넘김
+            use_streaming_upload(request, create_s3_client)
+
             data                = json.loads(request.POST.get('json'))  
             post_id             = data['post_id']         
             title               = data['title']
@@ -91,61 +97,26 @@ class BoardRewriteView(View):
             password            = data['password']
             tag_names           = data.get('tag_names')
             files               = request.FILES.getlist('filename')
+            uploaded_files      = data.get('uploaded_files', [])
 
             post                = Post.objects.get(id=post_id)
 
-            fileupload_list     = post.fileupload_set.all()
-
-            if not bcrypt.checkpw(password.encode('UTF-8'), post.password.encode('UTF-8')):
+            if not check_password(password, post.password):
                 return JsonResponse({'message' : 'INVALID_POST_PASSWORD'}, status=401)
 
-            if fileupload_list:
-                s3_client       = create_s3_client()
-                bucket_name     = my_settings.BUCKET_NAME                   # AWS s3 버킷 이름
-                aws_region      = my_settings.AWS_REGION                    # AWS s3 리전 
+            file_urls           = []
+            if files:
+                # 첨부 파일은 스레드 풀에서 동시에 업로드 (실패 시 이미 올라간 파일은 삭제됨)
+                file_urls      += upload_files(files, create_s3_client())
+            if uploaded_files:
+                # presigned URL 로 S3에 직접 올린 파일은 존재 여부만 확인하고 기록
+                file_urls      += verify_uploaded_files(uploaded_files, request.user.id, create_s3_client())
 
-                for obj in fileupload_list:
-                    s3_client.delete_object(
-                        Bucket  = bucket_name,
-                        Key     = str(obj.path).split('amazonaws.com/')[-1]
-                    )
+            # 글 수정, 기존 첨부 파일 outbox 기록, 새 첨부 파일 행 기록을 한 트랜잭션으로 처리
+            update_post(post, file_urls, title=title, content=content, tag=tag_names)
 
-            if files:
-                s3_client         = create_s3_client()
-                bucket_name       = my_settings.BUCKET_NAME
-                aws_region        = my_settings.AWS_REGION
-                file_urls         = []
-
-                for file in files:
-                    s3_client.upload_fileobj(                                
-                        file,
-                        bucket_name,
-                        'board_file/' + file.name,
-                        ExtraArgs={
-                            "ContentType": file.content_type
-                        }
-                    )
-
-                    file_endpoint = file.name.replace(" ", "")
-                    file_url = f'https://{bucket_name}.s3.{aws_region}.amazonaws.com/board_file/{file_endpoint}'
-                    file_urls.append(file_url)
-
-            with transaction.atomic():
-                fileupload_list.delete()
-
-                post.title      = title
-                post.content    = content
-                post.tag        = tag_names
-                                
-                post.save()
-
-                if files:
-                    for file_url in file_urls:
-                        fileupload = FileUpload(
-                            post_id           = post.id,
-                            path              = file_url
-                        )
-                        fileupload.save()
+            invalidate_post_detail(post.id)
+            bump_list_generation(post.board_category_id)
 
             return JsonResponse({'message' : 'SUCCESS'}, status=200)
 
@@ -153,6 +124,10 @@ class BoardRewriteView(View):
             return JsonResponse({'message' : 'KeyError'}, status = 400)
         except json.JSONDecodeError:
             return JsonResponse({'message' : 'JSONDecodeError'}, status = 400)
+        except UploadedFileNotFoundError:
+            return JsonResponse({'message' : 'UPLOADED_FILE_NOT_FOUND'}, status = 400)
+        except FileUploadError:
+            return JsonResponse({'message' : 'FILE_UPLOAD_ERROR'}, status = 500)
         except Post.DoesNotExist:
             return JsonResponse({'message' : 'INVALID_POST_ID'}, status=401)
 
@@ -166,23 +141,14 @@ class BoardDeleteView(View):
 
             post     = Post.objects.get(id=post_id)
 
-            fileupload_list     = post.fileupload_set.all()
-
-            if not bcrypt.checkpw(password.encode('UTF-8'), post.password.encode('UTF-8')):
+            if not check_password(password, post.password):
                 return JsonResponse({'message' : 'INVALID_POST_PASSWORD'}, status=401)
 
-            if fileupload_list:
-                s3_client       = create_s3_client()
-                bucket_name     = my_settings.BUCKET_NAME                   # AWS s3 버킷 이름
-                aws_region      = my_settings.AWS_REGION                    # AWS s3 리전 
+            # 첨부 파일은 outbox 에 기록만 하고 drain_file_outbox 가 나중에 삭제 (응답은 S3를 기다리지 않음)
+            delete_post(post)
 
-                for obj in fileupload_list:
-                    s3_client.delete_object(
-                        Bucket  = bucket_name,
-                        Key     = str(obj.path).split('amazonaws.com/')[-1]
-                    )
-            
-            post.delete()
+            invalidate_post_detail(post_id)
+            bump_list_generation(post.board_category_id)
         
             return JsonResponse({'message' : 'SUCCESS'}, status=200)
             
@@ -193,75 +159,340 @@ class BoardDeleteView(View):
         except Post.DoesNotExist:
             return JsonResponse({'message' : 'INVALID_POST_ID'}, status=401)
 
+LIST_FIELDS = (
+    'id', 'title', 'post_category__name', 'user__nickname', 'updated_at',
+    'views', 'is_notice', 'group_id', 'thread_path', 'group_depth',
+)
+
+THREAD_FIELDS = (
+    'id', 'title', 'post_category__name', 'user__nickname', 'updated_at',
+    'views', 'thread_path', 'group_depth',
+)
+
+class FileUploadUrlView(View):
+    @login_required
+    def post(self, request):
+        # 첨부 파일을 S3에 바로 올릴 presigned URL 발급, 업로드 후 글 작성/수정/답글 요청의 uploaded_files 에 key 를 담아 보냄
+        try:
+            data        = json.loads(request.body)
+            upload_urls = create_upload_urls(data['files'], request.user.id, create_s3_client())
+
+            return JsonResponse({'result' : upload_urls}, status=200)
+
+        except KeyError:
+            return JsonResponse({'message' : 'KeyError'}, status = 400)
+        except json.JSONDecodeError:
+            return JsonResponse({'message' : 'JSONDecodeError'}, status = 400)
+        except FileUploadError:
+            return JsonResponse({'message' : 'INVALID_FILE_NAME'}, status = 400)
+
+def list_order_after(cursor_values, id_field='id'):
+    # 목록 정렬(is_notice 내림차순, group_id 내림차순, thread_path, id)에서 커서 위치 다음 행들의 조건
+    is_notice, group_id, thread_path, post_id = cursor_values
+    return (
+        Q(is_notice__lt=is_notice) |
+        Q(is_notice=is_notice, group_id__lt=group_id) |
+        Q(is_notice=is_notice, group_id=group_id, thread_path__gt=thread_path) |
+        Q(is_notice=is_notice, group_id=group_id, thread_path=thread_path, **{f'{id_field}__gt' : post_id})
+    )
+
 class BoardListView(View):
     def get(self, request):
         # 정렬: 내림차순, 공지 게시글 항상 위
-        # 페이지 당 15개씩 가져오기
+        # 페이지 당 15개씩 가져오기
+        # ?cursor= 가 주어지면 offset 대신 직전 페이지 마지막 글의 정렬 키부터 이어서 읽음 (빈 값이면 첫 페이지)
+        # ?tag= 가 주어지면 그 태그가 달린 글만 같은 정렬로 보여줌
+        # ?board_category_id= 가 주어지면 그 게시판의 글만 같은 정렬로 보여줌 (캐시도 게시판별 세대 번호를 씀)
         try:
-            page_num  = int(request.GET.get('page', 1))
-            limit     = 15
-            start     = (page_num-1) * limit
-            end       = page_num     * limit
-
-            post_type_ordering = Case(When(
-                post_category_id=3, then=1),
-                default=2
-            )
-            
-            post_list = Post.objects.all().annotate(ordering=post_type_ordering).order_by(
-                'ordering',
-                '-group_id',
-                'group_order'
-            )[start:end] 
-
-            result    = [{
-                'id'            : post.id,
-                'title'         : post.title,
-                'post_category' : post.post_category.name,
-                'writer'        : post.user.nickname,
-                'final_updated' : post.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'views'         : post.views,
-                'group_id'      : post.group_id,
-                'group_order'   : post.group_order,
-                'group_depth'   : post.group_depth
-            } for post in post_list]
-
-            return JsonResponse({'result' : result}, status=200)
+            cursor            = request.GET.get('cursor')
+            tag               = request.GET.get('tag')
+            board_category_id = request.GET.get('board_category_id')
+            limit             = 15
+
+            if board_category_id is not None:
+                try:
+                    board_category_id = int(board_category_id)
+                except ValueError:
+                    return JsonResponse({'message' : 'INVALID_BOARD_CATEGORY_ID'}, status=400)
+
+            if cursor is not None:
+                cursor_values = decode_cursor(cursor, (bool, int, str, int)) if cursor else None
+                page_key      = f'cursor:{cursor}'
+            else:
+                page_num      = int(request.GET.get('page', 1))
+                page_key      = f'page:{page_num}'
+
+            if tag is not None:
+                # 저장할 때와 같은 규칙(공백 제거, 소문자)으로 맞춤
+                tag_names     = parse_tag_names(tag)
+                tag           = tag_names[0] if tag_names else ''
+                page_key      = f'tag:{tag}:{page_key}'
+
+            # 같은 페이지는 글 쓰기/수정/삭제/답글로 세대 번호가 바뀌기 전까지 캐시에서 응답
+            page, generation = get_list_page(board_category_id, page_key)
+
+            if page is None:
+                if tag is not None:
+                    # 태그 목록은 post_tags_list_order_idx 에서 같은 정렬 순서로 한 페이지 분량의 글 id 만 고른 뒤 그 글들만 읽음
+                    post_list = PostTag.objects.filter(tag__name=tag).order_by(
+                        '-is_notice',
+                        '-group_id',
+                        'thread_path',
+                        'post_id'
+                    ).values_list('post_id', flat=True)
+                    if board_category_id is not None:
+                        post_list = post_list.filter(post__board_category_id=board_category_id)
+                    id_field  = 'post_id'
+                elif board_category_id is not None:
+                    # 게시판 목록은 posts_board_list_order_idx 의 게시판 구간만 읽어 id 를 고름 (정렬 키와 id 가 모두 인덱스에 있어 테이블을 읽지 않음)
+                    # 다른 게시판 글이 아무리 많아도 읽는 범위는 이 게시판의 페이지 분량뿐
+                    post_list = Post.objects.filter(board_category_id=board_category_id).order_by(
+                        '-is_notice',
+                        '-group_id',
+                        'thread_path',
+                        'id'
+                    ).values_list('id', flat=True)
+                    id_field  = 'id'
+                else:
+                    # is_notice 는 저장된 컬럼이라 posts_list_order_idx 인덱스 순서 그대로 읽힘 (filesort 없음)
+                    # 목록에 필요한 컬럼만 카테고리/작성자 JOIN 한 번으로 가져옴 (content, password 제외)
+                    post_list = Post.objects.order_by(
+                        '-is_notice',
+                        '-group_id',
+                        'thread_path',
+                        'id'
+                    ).values(*LIST_FIELDS)
+                    id_field  = 'id'
+
+                if cursor is not None:
+                    if cursor_values:
+                        post_list = post_list.filter(list_order_after(cursor_values, id_field))
+                    post_list = list(post_list[:limit+1])
+                else:
+                    start     = (page_num-1) * limit
+                    end       = page_num     * limit
+                    post_list = list(post_list[start:end+1])
+
+                if tag is not None or board_category_id is not None:
+                    posts     = {post['id'] : post for post in Post.objects.filter(id__in=post_list).values(*LIST_FIELDS)}
+                    post_list = [posts[post_id] for post_id in post_list if post_id in posts]
+
+                if not post_list and board_category_id is not None and not BoardCategory.objects.filter(id=board_category_id).exists():
+                    return JsonResponse({'message' : 'INVALID_BOARD_CATEGORY_ID'}, status=401)
+
+                # limit+1 번째 글이 있을 때만 다음 커서를 내려줌
+                next_cursor = None
+                if len(post_list) > limit:
+                    post_list   = post_list[:limit]
+                    last_post   = post_list[-1]
+                    next_cursor = encode_cursor([last_post['is_notice'], last_post['group_id'], last_post['thread_path'], last_post['id']])
+
+                result    = [{
+                    'id'            : post['id'],
+                    'title'         : post['title'],
+                    'post_category' : post['post_category__name'],
+                    'writer'        : post['user__nickname'],
+                    'final_updated' : post['updated_at'].strftime('%Y-%m-%d %H:%M:%S'),
+                    'views'         : post['views'],
+                    'group_id'      : post['group_id'],
+                    'thread_path'   : post['thread_path'],
+                    'group_depth'   : post['group_depth']
+                } for post in post_list]
+
+                # 전체 글 수는 board_post_counts 에서 읽음 (COUNT(*) 없음), 태그 목록은 세지 않음
+                total_count = post_count(board_category_id) if tag is None else None
+                page = {
+                    'result'      : result,
+                    'next_cursor' : next_cursor,
+                    'total_count' : total_count,
+                    'total_pages' : -(-total_count // limit) if total_count is not None else None,
+                }
+                set_list_page(board_category_id, generation, page_key, page)
+
+            # 아직 반영되지 않은 조회수 증가분을 더해서 보여줌 (캐시에는 DB 값만 저장)
+            pending_views = view_counts.pending([post['id'] for post in page['result']])
+            result        = [
+                dict(post, views=post['views'] + pending_views[post['id']]) if post['id'] in pending_views else post
+                for post in page['result']
+            ]
+
+            return JsonResponse({
+                'result'      : result,
+                'next_cursor' : page['next_cursor'],
+                'total_count' : page.get('total_count'),
+                'total_pages' : page.get('total_pages'),
+            }, status=200)
+        except InvalidCursorError:
+            return JsonResponse({'message' : "INVALID_CURSOR"}, status=400)
         except ValueError:
             return JsonResponse({'message' : "ENTER page_number"}, status=400)
 
+class BoardSearchView(View):
+    def get(self, request):
+        # 제목/본문 검색 : post_tokens 역색인에서 검색어 토큰을 모두 가진 글을 점수 순으로 15개씩
+        # ?cursor= 는 직전 페이지 마지막 글의 (점수, id), 빈 값이면 첫 페이지
+        try:
+            tokens    = query_tokens(request.GET.get('q', ''))
+            cursor    = request.GET.get('cursor')
+            limit     = 15
+
+            if not tokens:
+                return JsonResponse({'message' : 'ENTER search_query'}, status=400)
+
+            cursor_values = decode_cursor(cursor, (int, int)) if cursor else None
+
+            matches       = search_posts(tokens, cursor_values, limit+1)
+            next_cursor   = None
+            if len(matches) > limit:
+                matches     = matches[:limit]
+                post_id, score = matches[-1]
+                next_cursor    = encode_cursor([score, post_id])
+
+            post_list     = {post['id'] : post for post in Post.objects.filter(id__in=[post_id for post_id, _ in matches]).values(*LIST_FIELDS)}
+            pending_views = view_counts.pending(list(post_list))
+            result        = []
+            for post_id, score in matches:
+                post = post_list.get(post_id)
+                if post is None:
+                    # 색인을 읽은 뒤 글이 삭제된 경우
+                    continue
+                result.append({
+                    'id'            : post['id'],
+                    'title'         : post['title'],
+                    'post_category' : post['post_category__name'],
+                    'writer'        : post['user__nickname'],
+                    'final_updated' : post['updated_at'].strftime('%Y-%m-%d %H:%M:%S'),
+                    'views'         : post['views'] + pending_views.get(post['id'], 0),
+                    'group_id'      : post['group_id'],
+                    'thread_path'   : post['thread_path'],
+                    'group_depth'   : post['group_depth'],
+                    'score'         : score
+                })
+
+            return JsonResponse({'result' : result, 'next_cursor' : next_cursor}, status=200)
+        except InvalidCursorError:
+            return JsonResponse({'message' : "INVALID_CURSOR"}, status=400)
+
 class BoardDetailView(View):
     def get(self, request, post_id=None):
         try:
             if not post_id:
                 return JsonResponse({'message' : "ENTER post_id"}, status=400)
 
-            post       = Post.objects.select_related('post_category', 'user').prefetch_related('fileupload_set').get(id=post_id)
-            
-            # views 업데이트 쿼리
-            post.views = F('views')+1
-            post.save()
-
-            post_info =[{
-                "post_category" : post.post_category.name,
-                "writer"        : post.user.nickname,
-                "title"         : post.title,
-                "content"       : post.content,
-                "ip_address"    : post.ip_address,
-                "tag"           : post.tag.replace(" ", "").split(',') if post.tag else None,
-                "updated_at"    : post.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                "file_uploads"  : [str(obj.path).split('/board_file/')[-1] for obj in post.fileupload_set.all()] if post.fileupload_set.all() else None
-            }]
+            # 캐시에 있으면 DB를 거치지 않고 응답 (수정/삭제/답글 작성 시 무효화)
+            post_info = get_post_detail(post_id)
+
+            if post_info is None:
+                post       = Post.objects.select_related('post_category', 'user').prefetch_related('fileupload_set').get(id=post_id)
+
+                post_info =[{
+                    "post_category" : post.post_category.name,
+                    "writer"        : post.user.nickname,
+                    "title"         : post.title,
+                    "content"       : post.content,
+                    "ip_address"    : post.ip_address,
+                    "tag"           : post.tag.replace(" ", "").split(',') if post.tag else None,
+                    "updated_at"    : post.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    "file_uploads"  : [str(obj.path).split('/board_file/')[-1] for obj in post.fileupload_set.all()] if post.fileupload_set.all() else None
+                }]
+                set_post_detail(post_id, post_info)
+
+            # 조회수는 버퍼에 쌓아두고 주기적으로 views 컬럼만 일괄 반영 (updated_at 변경 없음)
+            view_counts.incr(post_id)
 
             return JsonResponse({'result' : post_info}, status=200)
 
         except Post.DoesNotExist:
             return JsonResponse({'message' : 'INVALID_POST_ID'}, status=401)
 
+def thread_post_info(post, include_content=False):
+    post_info = {
+        'id'            : post['id'],
+        'title'         : post['title'],
+        'post_category' : post['post_category__name'],
+        'writer'        : post['user__nickname'],
+        'final_updated' : post['updated_at'].strftime('%Y-%m-%d %H:%M:%S'),
+        'views'         : post['views'] + view_counts.pending([post['id']]).get(post['id'], 0),
+        'thread_path'   : post['thread_path'],
+        'group_depth'   : post['group_depth']
+    }
+    if include_content:
+        post_info['content'] = post['content']
+    return post_info
+
+THREAD_PAGE_SIZE = 500
+
+def thread_page(group_id, fields, after=None, limit=THREAD_PAGE_SIZE):
+    # 묶음의 글을 (thread_path, id) 순서로 after(직전 배치의 마지막 글) 다음부터 limit 개 읽음
+    # 서버 커서를 열어두지 않고 배치마다 이 짧은 쿼리로 이어 읽음 ((group_id, thread_path) 인덱스 구간 탐색)
+    # (MySQL 드라이버는 iterator() 로 읽어도 결과 전체를 클라이언트 메모리에 받아두므로 긴 묶음을 한 쿼리로 읽지 않음)
+    post_list = Post.objects.filter(group_id=group_id)
+    if after is not None:
+        post_list = post_list.filter(
+            Q(thread_path__gt=after['thread_path']) | Q(thread_path=after['thread_path'], id__gt=after['id'])
+        )
+    return list(post_list.order_by('thread_path', 'id').values(*fields)[:limit])
+
+def thread_chunks(group_id, fields, first_page, include_content=False):
+    # 묶음 조회 응답 본문 : THREAD_PAGE_SIZE 개씩 다음 배치를 읽으며 배치마다 JSON 조각 하나를 내보냄
+    # 동기 뷰는 StreamingHttpResponse 로, async 뷰는 조각마다 sync_to_async 로 꺼내서 보냄 (같은 구현, DB 읽기는 이벤트 루프 밖)
+    yield '{"group_id": %d, "result": [' % group_id
+    page      = first_page
+    separator = ''
+    while page:
+        yield separator + ', '.join(json.dumps(thread_post_info(post, include_content)) for post in page)
+        separator = ', '
+        if len(page) < THREAD_PAGE_SIZE:
+            break
+        page = thread_page(group_id, fields, after=page[-1], limit=THREAD_PAGE_SIZE)
+    yield ']}'
+
+class BoardThreadView(View):
+    def get(self, request, group_id=None):
+        # 한 묶음(group_id)의 원글과 모든 답글을 (group_id, thread_path) 인덱스 순서대로 내려줌
+        # 긴 묶음도 메모리에 모으지 않도록 THREAD_PAGE_SIZE 개씩 읽으며 JSON을 이어 붙여 스트리밍
+        include_content = request.GET.get('include_content', '').lower() in ('1', 'true')
+
+        fields     = THREAD_FIELDS + (('content',) if include_content else ())
+        first_page = thread_page(group_id, fields, limit=THREAD_PAGE_SIZE)
+
+        if not first_page:
+            return JsonResponse({'message' : 'INVALID_GROUP_ID'}, status=401)
+
+        return StreamingHttpResponse(
+            thread_chunks(group_id, fields, first_page, include_content), content_type='application/json', status=200
+        )
+
+TRENDING_TAGS_MAX_LIMIT = 50
+
+class TrendingTagsView(View):
+    def get(self, request):
+        # 기간(24h, 7d) 동안 작성된 글에 많이 붙은 태그 : trending_tags 합계에서 상위 limit 개만 읽음
+        try:
+            window = request.GET.get('window', '24h')
+            limit  = min(int(request.GET.get('limit', 10)), TRENDING_TAGS_MAX_LIMIT)
+
+            if window not in TRENDING_WINDOWS:
+                return JsonResponse({'message' : 'INVALID_WINDOW'}, status=400)
+            if limit <= 0:
+                return JsonResponse({'message' : 'INVALID_LIMIT'}, status=400)
+
+            return JsonResponse({'window' : window, 'result' : top_tags(window, limit)}, status=200)
+        except ValueError:
+            return JsonResponse({'message' : 'INVALID_LIMIT'}, status=400)
+
+class CacheStatsView(View):
+    def get(self, request):
+        return JsonResponse({'result' : cache_stats()}, status=200)
+
 class BoardReplyView(View):
     @login_required
+    @discard_streamed_files_on_error
     def post(self, request):
         try:
+            # ?upload_mode=stream 이면 첨부 파일을 임시 파일에 모으지 않고 받는 대로 S3 멀티파트 업로드로 넘김
+            use_streaming_upload(request, create_s3_client)
+
             data              = json.loads(request.POST.get('json'))
             post_id           = data['post_id']         
             title             = data['title']
@@ -271,64 +502,34 @@ class BoardReplyView(View):
             ip_address        = get_client_ip(self,request)
             post_category_id  = 2
             files             = request.FILES.getlist('filename')
+            uploaded_files    = data.get('uploaded_files', [])
 
             mother_post       = Post.objects.get(id=post_id)
 
-            child_post_list   = Post.objects.filter(
-                group_id=mother_post.group_id, group_order__gt=mother_post.group_order 
-            )
-
+            file_urls         = []
             if files:
-                s3_client     = create_s3_client()
-                bucket_name   = my_settings.BUCKET_NAME                   # AWS s3 버킷 이름
-                aws_region    = my_settings.AWS_REGION                    # AWS s3 리전 
-                file_urls     = []
-
-                for file in files:
-                    s3_client.upload_fileobj(                                
-                        file,
-                        bucket_name,
-                        'board_file/' + file.name,
-                        ExtraArgs={
-                            "ContentType": file.content_type
-                        }
-                    )
-                    file_endpoint = file.name.replace(" ", "")
-                    file_url = f'https://{bucket_name}.s3.{aws_region}.amazonaws.com/board_file/{file_endpoint}'
-                    file_urls.append(file_url)
+                # 첨부 파일은 스레드 풀에서 동시에 업로드 (실패 시 이미 올라간 파일은 삭제됨)
+                file_urls    += upload_files(files, create_s3_client())
+            if uploaded_files:
+                # presigned URL 로 S3에 직접 올린 파일은 존재 여부만 확인하고 기록
+                file_urls    += verify_uploaded_files(uploaded_files, request.user.id, create_s3_client())
             
-            with transaction.atomic():
-                current_post = Post(
-                    board_category_id = mother_post.board_category.id,
-                    user_id           = request.user.id,
-                    post_category_id  = post_category_id,
-                    title             = title,
-                    content           = content,
-                    ip_address        = ip_address,
-                    password          = bcrypt.hashpw(password.encode('UTF-8'), bcrypt.gensalt()).decode('UTF-8'),
-                    group_id          = mother_post.group_id,
-                    group_order       = mother_post.group_order+1, # current_post의 group_order 지정
-                    group_depth       = mother_post.group_depth+1, # current_post의 group_depth 지정
-                    tag               = tag_names
-                )
-
-                # child_post_list의 group_order 업데이트
-                if child_post_list:
-                    child_post_list.update(
-                        group_order=F('group_order')+1, 
-                    ) 
-                    
-                # current_post가 child_post_list에 포함되어 group_order 값이 1 가산되는 것을 막기 위해 .save()를 .update() 이후에 배치함
-                current_post.save()
-
-                # 파일 URL 저장
-                if files:
-                    for file_url in file_urls:
-                        fileupload = FileUpload(
-                            post_id           = current_post.id,
-                            path              = file_url
-                        )
-                        fileupload.save()               
+            # 부모 경로 뒤에 최신 자식보다 앞서는 구간을 붙여 경로를 정함 (뒤쪽 답글들의 순서 값은 건드리지 않음)
+            # 부모 행을 잠근 트랜잭션 안에서 경로 계산, 글/파일 URL 저장까지 처리하고 데드락 시 재시도
+            insert_reply(
+                mother_post.id,
+                file_urls         = file_urls,
+                user_id           = request.user.id,
+                post_category_id  = post_category_id,
+                title             = title,
+                content           = content,
+                ip_address        = ip_address,
+                password          = hash_password(password),
+                tag               = tag_names
+            )
+
+            invalidate_post_detail(mother_post.id)
+            bump_list_generation(mother_post.board_category_id)
 
             return JsonResponse({'message' : 'SUCCESS'}, status=200)
 
@@ -336,5 +537,11 @@ class BoardReplyView(View):
             return JsonResponse({'message' : 'KeyError'}, status = 400)
         except json.JSONDecodeError:
             return JsonResponse({'message' : 'JSONDecodeError'}, status = 400)
+        except UploadedFileNotFoundError:
+            return JsonResponse({'message' : 'UPLOADED_FILE_NOT_FOUND'}, status = 400)
+        except FileUploadError:
+            return JsonResponse({'message' : 'FILE_UPLOAD_ERROR'}, status = 500)
         except Post.DoesNotExist:
-            return JsonResponse({'message' : 'INVALID_POST_ID'}, status=401)
\ No newline at end of file
+            return JsonResponse({'message' : 'INVALID_POST_ID'}, status=401)
+        except ThreadPathError as e:
+            return JsonResponse({'message' : str(e)}, status=400)
\ No newline at end of file
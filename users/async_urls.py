@@ -0,0 +1,8 @@
+from django.urls    import path
+
+from .async_views   import AsyncSignupView, AsyncSigninView
+
+urlpatterns = [
+    path('/signup', AsyncSignupView.as_view()),
+    path('/signin', AsyncSigninView.as_view())
+]
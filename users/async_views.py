@@ -0,0 +1,11 @@
+from board.async_view     import AsyncView
+from .views               import SignupView, SigninView
+
+# ASGI(board/asgi.py)로 띄울 때 쓰는 회원가입/로그인 뷰
+# 동기 뷰의 처리를 그대로 쓰고, 요청마다 별도 스레드에서 실행해 bcrypt 를 계산하는 동안 이벤트 루프를 막지 않음
+# (async 전용 해시 함수 없이 hash_password / check_password 를 그 스레드에서 부름)
+class AsyncSignupView(AsyncView, SignupView):
+    pass
+
+class AsyncSigninView(AsyncView, SigninView):
+    pass
@@ -0,0 +1,23 @@
+from django.conf          import settings
+from django.core.cache    import cache
+
+from .models              import User
+
+# login_required 가 요청마다 users 를 조회하지 않도록 인증된 사용자 정보를 캐시에 둠
+# 비밀번호 해시는 캐시에 넣지 않고 지연 로딩 필드로 남겨둠 (접근하면 그때 DB에서 읽음)
+CACHED_USER_FIELDS = ('id', 'name', 'email', 'nickname', 'created_at')
+
+def _user_key(user_id):
+    return f'users:user:{user_id}'
+
+def get_cached_user(user_id):
+    # 캐시에 없으면 DB에서 읽어 채움, 없는 사용자면 User.DoesNotExist
+    values = cache.get(_user_key(user_id))
+    if values is None:
+        values = User.objects.values_list(*CACHED_USER_FIELDS).get(id=user_id)
+        cache.set(_user_key(user_id), values, timeout=getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+    return User.from_db('default', CACHED_USER_FIELDS, values)
+
+def invalidate_user(*user_ids):
+    # 사용자 정보가 바뀌거나 삭제되면 바로 지움 (queryset.update() 처럼 시그널이 없는 경로는 직접 호출)
+    cache.delete_many([_user_key(user_id) for user_id in user_ids])
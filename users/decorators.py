@@ -3,15 +3,18 @@ import jwt
 from django.http.response import JsonResponse
 
 from .models              import User
+from .caches              import get_cached_user
 import my_settings
 
 def login_required(func):
     def decorator(self, request, *args, **kwargs):
         try:
             access_token  = request.headers['Authorization']
+            # exp 가 있는 토큰은 만료 시각이 지나면 ExpiredSignatureError
             decoded_token = jwt.decode(access_token, my_settings.SECRET['secret'], algorithms='HS256')
 
-            user = User.objects.get(id=decoded_token['user_id'])
+            # 캐시에 있으면 DB 조회 없이 사용자 정보를 붙임
+            user = get_cached_user(decoded_token['user_id'])
             
             request.user = user
             return func(self, request)
@@ -22,6 +25,9 @@ def login_required(func):
         except KeyError:
             return JsonResponse({'message':'KEY_ERROR'}, status=400)
 
+        except jwt.ExpiredSignatureError:
+            return JsonResponse({'message':'EXPIRED_TOKEN'}, status=401)
+
         except jwt.DecodeError:
             return JsonResponse({'message':'INVALID_TOKEN'}, status=400)
             
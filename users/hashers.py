@@ -0,0 +1,84 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures   import ProcessPoolExecutor
+
+import bcrypt
+from django.conf          import settings
+
+# 글/답글/수정/삭제 비밀번호, 회원가입/로그인 비밀번호의 bcrypt 해시/검증
+# bcrypt 는 한 번에 수백 ms 의 CPU 를 쓰므로 PASSWORD_HASHER_MODE 로 실행 위치를 고름
+#   - 'inline'  : 요청 스레드에서 바로 계산 (기본값)
+#   - 'process' : 프로세스 풀에서 계산하고 요청 스레드는 결과만 기다림
+#                 워커 프로세스마다 동시에 맡길 수 있는 해시 수를 PASSWORD_HASHER_MAX_PENDING 으로 제한함
+# async 뷰도 동기 뷰의 처리를 별도 스레드에서 실행하므로(board.async_view.run_in_thread) 같은 hash_password / check_password 를 씀
+INLINE  = 'inline'
+PROCESS = 'process'
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('UTF-8')
+
+def _checkpw(password, hashed_password):
+    return bcrypt.checkpw(password, hashed_password)
+
+def bcrypt_rounds():
+    return getattr(settings, 'BCRYPT_ROUNDS', 12)
+
+def hasher_mode():
+    return getattr(settings, 'PASSWORD_HASHER_MODE', INLINE)
+
+
+# 프로세스 풀은 처음 쓸 때 만들고 프로세스 안에서 공유
+# 부모의 DB 연결/락을 물려받지 않도록 자식 프로세스는 spawn 으로 띄움
+_pool         = None
+_pool_pending = None
+_pool_lock    = threading.Lock()
+
+def get_hasher_pool():
+    global _pool, _pool_pending
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers       = getattr(settings, 'PASSWORD_HASHER_WORKERS', None) or os.cpu_count()
+                _pool_pending = threading.BoundedSemaphore(getattr(settings, 'PASSWORD_HASHER_MAX_PENDING', None) or workers * 2)
+                _pool         = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+def shutdown_hasher_pool():
+    global _pool, _pool_pending
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool, _pool_pending = None, None
+
+def reset_hasher_pool():
+    # fork 된 자식 프로세스는 부모의 풀을 쓸 수 없으므로 새로 만들게 함
+    global _pool, _pool_pending, _pool_lock
+    _pool, _pool_pending = None, None
+    _pool_lock           = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_hasher_pool)
+
+def _run(func, *args):
+    if hasher_mode() != PROCESS:
+        return func(*args)
+
+    pool    = get_hasher_pool()
+    pending = _pool_pending
+    # 풀이 밀려 있으면 요청 스레드가 여기서 대기 (워커당 대기열 길이 제한)
+    with pending:
+        return pool.submit(func, *args).result()
+
+def hash_password(password):
+    return _run(_hashpw, password.encode('UTF-8'), bcrypt_rounds())
+
+def check_password(password, hashed_password):
+    return _run(_checkpw, password.encode('UTF-8'), hashed_password.encode('UTF-8'))
+
+def needs_rehash(hashed_password):
+    # 저장된 해시의 cost 가 현재 BCRYPT_ROUNDS 와 다르면 True ($2b$12$... 형식)
+    try:
+        return int(hashed_password.split('$')[2]) != bcrypt_rounds()
+    except (IndexError, ValueError):
+        return True
@@ -0,0 +1,52 @@
+import json
+import time
+from concurrent.futures          import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils           import override_settings
+
+from users.hashers               import hash_password, check_password, shutdown_hasher_pool, INLINE, PROCESS
+
+class Command(BaseCommand):
+    help = 'bcrypt 해시 실행 모드(inline/process)별 처리량 비교 (요청 스레드 수를 바꿔가며 해시+검증 1쌍씩 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pairs', type=int, default=32)
+        parser.add_argument('--rounds', type=int, default=12)
+        parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        results = []
+        for mode in (INLINE, PROCESS):
+            for threads in options['threads']:
+                with override_settings(
+                    BCRYPT_ROUNDS           = options['rounds'],
+                    PASSWORD_HASHER_MODE    = mode,
+                    PASSWORD_HASHER_WORKERS = options['workers'],
+                ):
+                    if mode == PROCESS:
+                        # 풀 기동 시간은 측정에서 뺌
+                        check_password('warmup', hash_password('warmup'))
+                    results.append(self.measure(mode, threads, options['pairs']))
+                    shutdown_hasher_pool()
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def measure(self, mode, threads, pairs):
+        def signin(index):
+            password = f'password-{index}'
+            return check_password(password, hash_password(password))
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            assert all(executor.map(signin, range(pairs)))
+        elapsed = time.monotonic() - started
+
+        return {
+            'mode'          : mode,
+            'threads'       : threads,
+            'pairs'         : pairs,
+            'seconds'       : round(elapsed, 2),
+            'pairs_per_sec' : round(pairs / elapsed, 1),
+        }
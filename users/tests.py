@@ -1,3 +1,141 @@
-from django.test import TestCase
+import json
+import jwt
+import bcrypt
+from datetime           import datetime, timedelta, timezone
 
-# Create your tests here.
+from django.test        import Client, AsyncClient, TestCase, TransactionTestCase, RequestFactory, override_settings
+from django.test.utils  import CaptureQueriesContext
+from django.db          import connection
+from django.core.cache  import cache
+from django.http        import JsonResponse
+from asgiref.sync       import sync_to_async
+
+from .models            import User
+from .decorators        import login_required
+from .caches            import get_cached_user
+from .hashers           import (
+    hash_password, check_password, needs_rehash, shutdown_hasher_pool,
+)
+import my_settings
+
+class LoginRequiredTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = bcrypt.hashpw('gns7201ok!'.encode('UTF-8'), bcrypt.gensalt()).decode('UTF-8'),
+            nickname      = '침착맨'
+           )
+        self.factory = RequestFactory()
+
+        class View:
+            @login_required
+            def get(self, request):
+                return JsonResponse({'user_id' : request.user.id, 'nickname' : request.user.nickname}, status=200)
+        self.view = View()
+
+    def request(self, payload):
+        token = jwt.encode(payload, my_settings.SECRET['secret'], algorithm="HS256")
+        return self.view.get(self.factory.get('/', HTTP_AUTHORIZATION=token))
+
+    def test_login_required_cached_user_query_savings(self):
+        # 캐시 없이는 요청마다 users 조회 1번 -> 첫 요청만 1번, 이후 0번
+        with CaptureQueriesContext(connection) as queries:
+            responses = [self.request({"user_id" : 1}) for _ in range(10)]
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(len(queries.captured_queries), 1)
+
+    def test_login_required_invalidated_on_user_change(self):
+        self.request({"user_id" : 1})
+
+        user          = User.objects.get(id=1)
+        user.nickname = '주호민'
+        user.save()
+
+        response = self.request({"user_id" : 1})
+        self.assertEqual(json.loads(response.content)['nickname'], '주호민')
+
+        User.objects.filter(id=1).delete()
+        response = self.request({"user_id" : 1})
+        self.assertEqual(json.loads(response.content), {'message' : 'UNKNOWN_USER'})
+
+    def test_login_required_password_not_cached(self):
+        self.request({"user_id" : 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            cached_user = get_cached_user(1)
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertIn('password', cached_user.get_deferred_fields())
+        self.assertTrue(bcrypt.checkpw('gns7201ok!'.encode('UTF-8'), cached_user.password.encode('UTF-8')))
+
+    def test_login_required_expired_token(self):
+        expired  = datetime.now(timezone.utc) - timedelta(seconds=1)
+        response = self.request({"user_id" : 1, "exp" : expired})
+
+        self.assertEqual(json.loads(response.content), {'message' : 'EXPIRED_TOKEN'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_signin_token_expires(self):
+        c        = Client()
+        response = c.post('/users/signin', json.dumps({"name" : 'fcfargo', "password" : 'gns7201ok!'}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        decoded_token = jwt.decode(json.loads(response.content)['token'], my_settings.SECRET['secret'], algorithms='HS256')
+        self.assertEqual(decoded_token['user_id'], 1)
+        self.assertGreater(decoded_token['exp'], datetime.now(timezone.utc).timestamp())
+
+@override_settings(BCRYPT_ROUNDS=4)
+class PasswordHasherTest(TestCase):
+    def tearDown(self):
+        shutdown_hasher_pool()
+
+    def test_hash_password_rounds(self):
+        hashed_password = hash_password('gns7201ok!')
+
+        self.assertTrue(hashed_password.startswith('$2b$04$'))
+        self.assertTrue(check_password('gns7201ok!', hashed_password))
+        self.assertFalse(check_password('wrong', hashed_password))
+        self.assertFalse(needs_rehash(hashed_password))
+        with override_settings(BCRYPT_ROUNDS=5):
+            self.assertTrue(needs_rehash(hashed_password))
+
+    @override_settings(PASSWORD_HASHER_MODE='process', PASSWORD_HASHER_WORKERS=2)
+    def test_hash_password_process_pool(self):
+        hashed_password = hash_password('gns7201ok!')
+
+        self.assertTrue(check_password('gns7201ok!', hashed_password))
+
+    def test_signin_rehash_on_rounds_change(self):
+        User.objects.create(
+            id            = 1,
+            name          = 'fcfargo',
+            email         = 'test@gmail.com',
+            password      = bcrypt.hashpw('gns7201ok!'.encode('UTF-8'), bcrypt.gensalt(5)).decode('UTF-8'),
+            nickname      = '침착맨'
+           )
+
+        c        = Client()
+        response = c.post('/users/signin', json.dumps({"name" : 'fcfargo', "password" : 'gns7201ok!'}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(id=1).password.startswith('$2b$04$'))
+
+# async 뷰는 동기 뷰의 처리를 별도 스레드(별도 DB 연결)에서 실행하므로 TransactionTestCase 를 씀
+@override_settings(BCRYPT_ROUNDS=4)
+class AsyncUserViewsTest(TransactionTestCase):
+    async def test_async_signup_signin(self):
+        c        = AsyncClient()
+        response = await c.post('/users/signup', json.dumps({
+            "name" : 'fcfargo', "password" : 'gns7201ok!', "email" : 'test@gmail.com', "nickname" : '침착맨'
+        }), content_type='application/json')
+        self.assertEqual(json.loads(response.content), {'message' : 'SUCCESS'})
+
+        response = await c.post('/users/signin', json.dumps({"name" : 'fcfargo', "password" : 'wrong'}), content_type='application/json')
+        self.assertEqual(json.loads(response.content), {'message' : 'INVALID_USER_PASSWORD'})
+
+        response = await c.post('/users/signin', json.dumps({"name" : 'fcfargo', "password" : 'gns7201ok!'}), content_type='application/json')
+        decoded_token = jwt.decode(json.loads(response.content)['token'], my_settings.SECRET['secret'], algorithms='HS256')
+        self.assertEqual(decoded_token['user_id'], (await sync_to_async(User.objects.get)(name='fcfargo')).id)
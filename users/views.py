@@ -1,13 +1,20 @@
 import jwt
-import bcrypt
 import json
+from datetime             import datetime, timedelta, timezone
 
+from django.conf          import settings
 from django.http.response import JsonResponse
 from django.views         import View
 
 from .models              import User
+from .hashers             import hash_password, check_password, needs_rehash
 import my_settings
 
+def issue_token(user_id):
+    # 만료 시각(exp)을 넣어 발급, 만료된 토큰은 login_required 에서 거절됨
+    expires = datetime.now(timezone.utc) + timedelta(seconds=settings.JWT_EXPIRES_SECONDS)
+    return jwt.encode({"user_id" : user_id, "exp" : expires}, my_settings.SECRET['secret'], algorithm="HS256")
+
 class SignupView(View):
     def post(self, request):
         try:
@@ -35,7 +42,7 @@ class SignupView(View):
             if User.objects.filter(email=email).exists():
                 return JsonResponse({'message' : 'DUPLICATE_EMAIL_ERROR'}, status = 400)
 
-            hashed_password = bcrypt.hashpw(password.encode('UTF-8'), bcrypt.gensalt()).decode('UTF-8')
+            hashed_password = hash_password(password)
 
             user = User(
                 name     = name,
@@ -63,10 +70,15 @@ class SigninView(View):
             if not user:
                 return JsonResponse({'message' : 'INVALID_USER_ID'}, status = 401)
 
-            if not bcrypt.checkpw(password.encode('UTF-8'), user.password.encode('UTF-8')):
+            if not check_password(password, user.password):
                 return JsonResponse({'message' : 'INVALID_USER_PASSWORD'}, status = 401)
 
-            token    = jwt.encode({"user_id" : user.id}, my_settings.SECRET['secret'], algorithm="HS256")
+            # BCRYPT_ROUNDS 가 바뀐 뒤 처음 로그인하면 새 cost 로 다시 해시해 저장
+            if needs_rehash(user.password):
+                user.password = hash_password(password)
+                user.save(update_fields=['password'])
+
+            token    = issue_token(user.id)
 
             return JsonResponse({'message' : 'SUCCESS', 'token' : token}, status = 200)
 